@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""End-to-end load test of the joystick → Modbus control path.
+
+A real :class:`plc_comm.udp_listener_node.UDPJoystickListener` is pointed at a
+:class:`plc_comm.sim_plc.SimulatedPLC` on localhost and fed by a UDP joystick
+generator.  Each scenario varies packet rate, burst size, loss, reordering and
+sender clock skew.  Every packet carries a distinct ``joystick_forward`` value
+(``turn = 0`` so D10 == D11 == forward), which lets the script match each
+D10 write on the PLC back to the packet that caused it.
+
+Reported per scenario (JSON):
+
+* ``latency_ms``    – command-to-register latency percentiles
+* ``applied``       – share of distinct commands that reached D10
+* ``modbus_rps``    – Modbus requests per second seen by the PLC
+* ``failsafe_ms``   – time from the last packet (or the first stale packet in
+  the ``skew`` scenario) until D10 is forced to 0
+
+Usage::
+
+    python3 benchmarks/bench_control_path.py [--scenario nominal] [--out result.json]
+    python3 benchmarks/bench_control_path.py --scenario custom --rate 100 --loss 0.2
+
+Requires rclpy and pymodbus; no robot hardware.
+"""
+
+import argparse
+import json
+import random
+import socket
+import sys
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+for pkg in ("plc_comm", "robot_common"):
+    sys.path.insert(0, str(SRC / pkg))
+
+import rclpy  # noqa: E402
+from rclpy.executors import SingleThreadedExecutor  # noqa: E402
+
+from plc_comm.sim_plc import REG_LEFT, SimulatedPLC  # noqa: E402
+from plc_comm.udp_listener_node import UDPJoystickListener  # noqa: E402
+
+
+@dataclass
+class Scenario:
+    rate_hz: float = 50.0
+    duration_s: float = 5.0
+    burst: int = 1          # packets sent back-to-back per period
+    loss: float = 0.0       # probability a packet is dropped
+    reorder: float = 0.0    # probability a packet is held back behind the next one
+    skew_ms: int = 0        # added to the sender timestamp
+    seed: int = 1
+
+
+SCENARIOS = {
+    "nominal": Scenario(),
+    "burst": Scenario(rate_hz=20.0, burst=10),
+    "lossy": Scenario(loss=0.3),
+    "reorder": Scenario(reorder=0.2),
+    "abusive": Scenario(rate_hz=1000.0, duration_s=3.0),
+    "skew": Scenario(duration_s=2.0, skew_ms=-5000),
+}
+
+
+def percentiles(values, points=(50, 90, 99)):
+    if not values:
+        return {f"p{p}": None for p in points} | {"max": None}
+    ordered = sorted(values)
+    out = {f"p{p}": round(ordered[min(len(ordered) - 1, len(ordered) * p // 100)], 2)
+           for p in points}
+    out["max"] = round(ordered[-1], 2)
+    return out
+
+
+def free_udp_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def generate(sc: Scenario, port: int):
+    """Send the scenario's traffic; return ``{value: [send times]}`` and first/last send."""
+    rng = random.Random(sc.seed)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sent = defaultdict(list)
+    held = None
+    first = last = None
+    period = 1.0 / sc.rate_hz
+    n = 0
+    t_next = time.perf_counter()
+    t_end = t_next + sc.duration_s
+    while t_next < t_end:
+        for _ in range(sc.burst):
+            value = n % 100 + 1
+            n += 1
+            if rng.random() < sc.loss:
+                continue
+            packet = json.dumps({
+                "ts": int(time.time() * 1000) + sc.skew_ms,
+                "joystick_forward": value, "joystick_turn": 0, "brush1": 0, "brush2": 0,
+            }).encode()
+            if held is None and rng.random() < sc.reorder:
+                held = (value, packet)
+                continue
+            for v, p in ((value, packet),) + ((held,) if held else ()):
+                t = time.perf_counter()
+                sock.sendto(p, ("127.0.0.1", port))
+                sent[v].append(t)
+                first = t if first is None else first
+                last = t
+            held = None
+        t_next += period
+        time.sleep(max(0.0, t_next - time.perf_counter()))
+    sock.close()
+    return sent, first, last
+
+
+def run_scenario(name: str, sc: Scenario, plc: SimulatedPLC):
+    udp_port = free_udp_port()
+    listener = UDPJoystickListener(udp_port=udp_port, plc_ip="127.0.0.1", plc_port=plc.port)
+    executor = SingleThreadedExecutor()
+    executor.add_node(listener)
+    spin = threading.Thread(target=executor.spin, daemon=True)
+    spin.start()
+    try:
+        time.sleep(0.5)  # first control tick connects Modbus
+        t0 = time.perf_counter()
+        req0 = plc.requests
+        sent, first, last = generate(sc, udp_port)
+        t1 = time.perf_counter()
+        time.sleep(1.0)  # let the 3-tick timeout fire
+        writes = plc.writes_since(t0)
+    finally:
+        executor.shutdown()
+        listener.destroy_node()
+
+    # Fail-safe anchor: the last packet, or the first one when every packet is stale.
+    anchor = first if sc.skew_ms else last
+    latencies = []
+    applied = set()
+    failsafe_ms = None
+    for t, kind, addr, values in writes:
+        if kind != "reg" or addr != REG_LEFT:
+            continue
+        value = values[0]
+        if value == 0:
+            if failsafe_ms is None and anchor is not None and t >= anchor:
+                failsafe_ms = (t - anchor) * 1000
+            continue
+        times = sent.get(value)
+        i = bisect_right(times, t) if times else 0
+        if i:
+            latencies.append((t - times[i - 1]) * 1000)
+            applied.add((value, i))
+
+    total = sum(len(v) for v in sent.values())
+    return {
+        "scenario": name,
+        "config": asdict(sc),
+        "packets_sent": total,
+        "latency_ms": percentiles(latencies),
+        "applied": round(len(applied) / total, 3) if total else 0.0,
+        "modbus_rps": round((plc.requests - req0) / (t1 - t0), 1),
+        "failsafe_ms": None if failsafe_ms is None else round(failsafe_ms, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", action="append",
+                        choices=sorted(SCENARIOS) + ["custom", "all"])
+    for field, typ in (("rate", float), ("duration", float), ("burst", int),
+                       ("loss", float), ("reorder", float), ("skew_ms", int)):
+        parser.add_argument(f"--{field.replace('_', '-')}", dest=field, type=typ)
+    parser.add_argument("--plc-delay-ms", type=float, default=0.0,
+                        help="artificial PLC response time per write")
+    parser.add_argument("--out", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    names = args.scenario or ["all"]
+    if "all" in names:
+        names = list(SCENARIOS)
+    custom = {k: v for k, v in (("rate_hz", args.rate), ("duration_s", args.duration),
+                                ("burst", args.burst), ("loss", args.loss),
+                                ("reorder", args.reorder), ("skew_ms", args.skew_ms))
+              if v is not None}
+
+    rclpy.init()
+    plc = SimulatedPLC(response_delay_s=args.plc_delay_ms / 1000).start()
+    try:
+        results = [run_scenario(n, replace(SCENARIOS.get(n, Scenario()), **custom), plc)
+                   for n in names]
+    finally:
+        plc.stop()
+        rclpy.shutdown()
+
+    text = json.dumps({"control_path": results}, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Compare start-up time and memory of the multi-process and gateway layouts.
+
+The script launches each layout the same way ``scripts/run_all.sh`` and
+``robot_bringup.gateway`` would, waits until every endpoint is listening
+(checked through ``/proc/net/{tcp,udp}`` so no client connects and wakes the
+camera) and then samples the resident set size of all started processes.
+
+Usage::
+
+    python3 benchmarks/bench_gateway_footprint.py [--layout both] [--out result.json]
+
+The result is printed as JSON::
+
+    {"multi": {"startup_ms": ..., "rss_kib": ..., "processes": 4}, "gateway": {...}}
+
+A layout whose endpoints never come up (missing hardware libraries, port in
+use ...) reports ``"startup_ms": null`` together with the exit codes.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+WS_ROOT = Path(__file__).resolve().parents[1]
+
+MULTI_PROCESS_MODULES = [
+    "battery_streamer.battery_udp_node",
+    "commcheck.commcheck",
+    "oak_streamer.oak_streamer_node",
+    "plc_comm.udp_listener_node",
+]
+GATEWAY_MODULE = "robot_bringup.gateway"
+
+TCP_PORTS = (5000, 5001, 5002)
+UDP_PORTS = (8888,)
+
+
+def workspace_env():
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    roots = [str(p) for p in sorted((WS_ROOT / "src").iterdir()) if p.is_dir()]
+    env["PYTHONPATH"] = os.pathsep.join(roots + [env.get("PYTHONPATH", "")])
+    return env
+
+
+def listening_ports(kind):
+    """Return local ports in LISTEN (tcp) or bound (udp) state."""
+    ports = set()
+    for name in (kind, kind + "6"):
+        try:
+            with open(f"/proc/net/{name}") as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    port = int(fields[1].rsplit(":", 1)[1], 16)
+                    if kind == "udp" or fields[3] == "0A":  # 0A == TCP_LISTEN
+                        ports.add(port)
+        except FileNotFoundError:
+            pass
+    return ports
+
+
+def rss_kib(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except FileNotFoundError:
+        pass
+    return 0
+
+
+def measure(modules, timeout_s):
+    env = workspace_env()
+    t0 = time.monotonic()
+    procs = [
+        subprocess.Popen([sys.executable, "-m", m], env=env, cwd=WS_ROOT,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for m in modules
+    ]
+    startup_ms = None
+    try:
+        while time.monotonic() - t0 < timeout_s:
+            if (set(TCP_PORTS) <= listening_ports("tcp")
+                    and set(UDP_PORTS) <= listening_ports("udp")):
+                startup_ms = (time.monotonic() - t0) * 1000
+                break
+            if all(p.poll() is not None for p in procs):
+                break
+            time.sleep(0.01)
+        time.sleep(0.5)  # Let lazy allocations settle before sampling.
+        rss = sum(rss_kib(p.pid) for p in procs)
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            try:
+                p.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                p.kill()
+    return {
+        "startup_ms": None if startup_ms is None else round(startup_ms, 1),
+        "rss_kib": rss,
+        "processes": len(procs),
+        "exit_codes": [p.returncode for p in procs],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--layout", choices=("multi", "gateway", "both"), default="both")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--out", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    result = {}
+    if args.layout in ("multi", "both"):
+        result["multi"] = measure(MULTI_PROCESS_MODULES, args.timeout)
+    if args.layout in ("gateway", "both"):
+        result["gateway"] = measure([GATEWAY_MODULE], args.timeout)
+
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
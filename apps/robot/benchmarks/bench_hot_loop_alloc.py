@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Steady-state allocation rate and GC pauses of the camera hot loop.
+
+Synthetic 720p mono frames go through ``oak_streamer_node.process_frame`` at a
+paced frame rate (30 fps by default) exactly as in ``start_server``, minus the
+device and the socket.  Two passes are made:
+
+* a timing pass, reporting per-frame processing time and every garbage
+  collection (generation, pause) seen through ``gc.callbacks``;
+* a ``tracemalloc`` pass, reporting per frame the transient allocation peak
+  (``peak - start``, i.e. the largest amount of memory the frame had
+  allocated at once) and the retained growth.
+
+Usage::
+
+    python3 benchmarks/bench_hot_loop_alloc.py [--seconds 10] [--fps 30]
+        [--scene static|moving] [--no-tracking] [--no-gate] [--protocol 2]
+        [--out result.json]
+
+Requires numpy and OpenCV; no camera.
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+for pkg in ("oak_streamer", "robot_common"):
+    sys.path.insert(0, str(SRC / pkg))
+
+import numpy as np  # noqa: E402
+
+from oak_streamer import oak_streamer_node as oak  # noqa: E402
+from oak_streamer.detection import HogDetector  # noqa: E402
+from oak_streamer.motion import GatedDetector, MotionGate  # noqa: E402
+
+
+def percentiles(values, points=(50, 99)):
+    if not values:
+        return {f"p{p}": None for p in points} | {"max": None}
+    ordered = sorted(values)
+    out = {f"p{p}": round(ordered[min(len(ordered) - 1, len(ordered) * p // 100)], 3)
+           for p in points}
+    out["max"] = round(ordered[-1], 3)
+    return out
+
+
+class Scene:
+    """A noisy static background with an optional bright block walking across."""
+
+    def __init__(self, moving: bool, shape=(720, 1280)) -> None:
+        rng = np.random.default_rng(1)
+        self.background = rng.integers(0, 255, shape, dtype=np.uint8)
+        self.moving = moving
+        self.n = 0
+
+    def next(self):
+        # getCvFrame() returns a fresh array per frame; so does this.
+        frame = self.background.copy()
+        if self.moving:
+            x = (self.n * 8) % (frame.shape[1] - 120)
+            frame[300:540, x:x + 120] = 230
+        self.n += 1
+        return frame
+
+
+class GcWatch:
+    def __init__(self) -> None:
+        self.pauses = []
+        self._t0 = 0.0
+
+    def __call__(self, phase, info) -> None:
+        if phase == "start":
+            self._t0 = time.perf_counter()
+        else:
+            self.pauses.append((info["generation"], (time.perf_counter() - self._t0) * 1000))
+
+    def summary(self):
+        per_gen = {}
+        for gen, ms in self.pauses:
+            per_gen.setdefault(gen, []).append(ms)
+        return {
+            "collections": {str(g): len(v) for g, v in sorted(per_gen.items())},
+            "pause_ms": percentiles([ms for _, ms in self.pauses]),
+            "pause_total_ms": round(sum(ms for _, ms in self.pauses), 3),
+        }
+
+
+def make_stream(args):
+    settings = oak.StreamSettings(tracking=args.tracking, depth=False)
+    settings.protocol = args.protocol
+    detector = HogDetector()
+    if args.gate:
+        detector = GatedDetector(detector, MotionGate(pool=settings.buffers))
+    return settings, detector
+
+
+def run(args, frames, traced):
+    settings, detector = make_stream(args)
+    scene = Scene(args.scene == "moving")
+    period = 1.0 / args.fps
+    for _ in range(args.warmup):
+        oak.process_frame(scene.next(), settings, detector)
+
+    frame_ms, transient, retained = [], [], []
+    watch = GcWatch()
+    gc.callbacks.append(watch)
+    if traced:
+        tracemalloc.start()
+    start_mem = tracemalloc.get_traced_memory()[0] if traced else 0
+    t_next = time.perf_counter()
+    try:
+        for _ in range(frames):
+            frame = scene.next()
+            if traced:
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+            t0 = time.perf_counter()
+            packet = oak.process_frame(frame, settings, detector)
+            frame_ms.append((time.perf_counter() - t0) * 1000)
+            if traced:
+                current, peak = tracemalloc.get_traced_memory()
+                transient.append((peak - before) / 1024)
+            del packet, frame
+            t_next += period
+            time.sleep(max(0.0, t_next - time.perf_counter()))
+        if traced:
+            retained.append((tracemalloc.get_traced_memory()[0] - start_mem) / 1024)
+    finally:
+        gc.callbacks.remove(watch)
+        if traced:
+            tracemalloc.stop()
+    result = {"frame_ms": percentiles(frame_ms), "gc": watch.summary(),
+              "pool_allocations": settings.buffers.allocations}
+    if traced:
+        mean_kib = sum(transient) / len(transient)
+        result["alloc"] = {
+            "transient_kib_per_frame": percentiles(transient) | {"mean": round(mean_kib, 1)},
+            "transient_mib_per_s": round(mean_kib * args.fps / 1024, 2),
+            "retained_kib": round(retained[0], 1),
+        }
+    if isinstance(detector, GatedDetector):
+        result["motion_gate"] = detector.gate.stats()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--scene", choices=("static", "moving"), default="moving")
+    parser.add_argument("--no-tracking", dest="tracking", action="store_false")
+    parser.add_argument("--no-gate", dest="gate", action="store_false")
+    parser.add_argument("--protocol", type=int, choices=(1, 2), default=2)
+    parser.add_argument("--out", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    frames = int(args.seconds * args.fps)
+    config = {k: v for k, v in vars(args).items() if k != "out"}
+    result = {"config": config, "timing": run(args, frames, traced=False),
+              "tracemalloc": run(args, frames, traced=True)}
+    text = json.dumps({"hot_loop": result}, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Cold-start import profile of every robot node based on ``-X importtime``.
+
+Each node module is imported in a fresh interpreter with ``-X importtime``;
+the script reports the wall-clock time of the interpreter, the cumulative
+import time of the node module itself and its heaviest transitive imports.
+Running it before and after a change shows what a new top-level import costs.
+
+Usage::
+
+    python3 benchmarks/bench_import_time.py [--repeat 5] [--top 10] [--out result.json]
+
+Output (JSON, medians over ``--repeat`` runs)::
+
+    {"oak_streamer.oak_streamer_node": {"wall_ms": ..., "import_ms": ...,
+                                        "top": [["numpy", 48.1], ...]}, ...}
+
+A module that fails to import reports ``"error"`` with the last stderr line.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+WS_ROOT = Path(__file__).resolve().parents[1]
+
+NODE_MODULES = [
+    "battery_streamer.battery_udp_node",
+    "commcheck.commcheck",
+    "oak_streamer.oak_streamer_node",
+    "plc_comm.udp_listener_node",
+    "robot_bringup.gateway",
+]
+
+
+def workspace_env():
+    env = dict(os.environ)
+    roots = [str(p) for p in sorted((WS_ROOT / "src").iterdir()) if p.is_dir()]
+    env["PYTHONPATH"] = os.pathsep.join(roots + [env.get("PYTHONPATH", "")])
+    return env
+
+
+def parse_importtime(stderr):
+    """Return ``{module: cumulative_us}`` from ``-X importtime`` output."""
+    result = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        result[name.strip()] = int(cumulative_us)
+    return result
+
+
+def profile_once(module, env):
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - t0) * 1000
+    if proc.returncode != 0:
+        lines = [ln for ln in proc.stderr.splitlines() if not ln.startswith("import time:")]
+        return {"error": lines[-1] if lines else f"exit code {proc.returncode}"}
+    return {"wall_ms": wall_ms, "imports": parse_importtime(proc.stderr)}
+
+
+def profile(module, repeat, top, env):
+    runs = [profile_once(module, env) for _ in range(repeat)]
+    if "error" in runs[0]:
+        return runs[0]
+    last = runs[-1]["imports"]
+    # Rank top-level packages by cumulative time.
+    heaviest = sorted(((name, us) for name, us in last.items() if "." not in name),
+                      key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "wall_ms": round(statistics.median(r["wall_ms"] for r in runs), 1),
+        "import_ms": round(statistics.median(r["imports"].get(module, 0) for r in runs) / 1000,
+                           1),
+        "top": [[name, round(us / 1000, 1)] for name, us in heaviest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--module", action="append", help="profile only these modules")
+    parser.add_argument("--out", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    env = workspace_env()
+    result = {m: profile(m, args.repeat, args.top, env) for m in (args.module or NODE_MODULES)}
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Frame delivery latency: in-process bus vs ROS 2 topic vs the TCP stream.
+
+The same synthetic JPEG-sized payload is pushed at a paced frame rate through
+each transport the camera node offers, and the time from ``submit`` to the
+consumer having the complete frame is measured:
+
+* ``bus`` – :class:`oak_streamer.publishing.FrameBus`, a direct call
+* ``ros`` – :class:`oak_streamer.publishing.RosPublisher` to a
+  ``CompressedImage`` subscription on a second node, spun by its own
+  executor thread (rclpy has no intra-process path, so this goes through
+  the RMW layer and serialises like a remote subscriber would)
+* ``tcp`` – a version 2 packet of :mod:`oak_streamer.protocol` over a
+  localhost socket, read back by a thread exactly as the Flutter app does
+
+Frames are matched by ``capture_us``, which carries the frame number.
+
+Usage::
+
+    python3 benchmarks/bench_ros_vs_tcp.py [--frames 300] [--fps 30]
+        [--size-kb 60] [--transport bus --transport tcp] [--out result.json]
+
+``ros`` is skipped when rclpy is not installed; no camera is needed.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+for pkg in ("oak_streamer", "robot_common"):
+    sys.path.insert(0, str(SRC / pkg))
+
+from oak_streamer import protocol as proto  # noqa: E402
+from oak_streamer import publishing  # noqa: E402
+from oak_streamer.oak_streamer_node import StreamSettings  # noqa: E402
+
+TRANSPORTS = ("bus", "ros", "tcp")
+
+
+def percentiles(values, points=(50, 90, 99)):
+    if not values:
+        return {f"p{p}": None for p in points} | {"max": None}
+    ordered = sorted(values)
+    out = {f"p{p}": round(ordered[min(len(ordered) - 1, len(ordered) * p // 100)], 3)
+           for p in points}
+    out["max"] = round(ordered[-1], 3)
+    return out
+
+
+class Probe:
+    """Send times by frame number, and the latencies of the frames received."""
+
+    def __init__(self) -> None:
+        self.sent = {}
+        self.latency_ms = []
+
+    def received(self, n: int) -> None:
+        t = time.perf_counter()
+        if n in self.sent:
+            self.latency_ms.append((t - self.sent.pop(n)) * 1000)
+
+
+def drive(sink, probe: Probe, args) -> None:
+    payload = b"\xff\xd8" + os.urandom(args.size_kb * 1024 - 4) + b"\xff\xd9"
+    period = 1.0 / args.fps
+    t_next = time.perf_counter()
+    for n in range(1, args.frames + 1):
+        probe.sent[n] = time.perf_counter()
+        sink.submit(payload, seq=n, capture_us=n, encode_us=n, width=1280, height=720,
+                    boxes=[(600, 200, 120, 300, 900)], distance_m=1.5,
+                    track_state=proto.TRACK_LOCKED)
+        t_next += period
+        time.sleep(max(0.0, t_next - time.perf_counter()))
+    time.sleep(0.5)  # stragglers
+
+
+def run_bus(args, probe: Probe) -> None:
+    bus = publishing.FrameBus()
+    bus.subscribe(lambda jpeg, meta: probe.received(meta["capture_us"]))
+    drive(bus, probe, args)
+
+
+def run_ros(args, probe: Probe) -> None:
+    import rclpy
+    from rclpy.executors import SingleThreadedExecutor
+    from rclpy.node import Node
+    from rclpy.qos import QoSProfile, ReliabilityPolicy
+    from sensor_msgs.msg import CompressedImage
+
+    rclpy.init()
+    pub_node = Node("bench_oak_pub")
+    sub_node = Node("bench_oak_sub")
+    sub_node.create_subscription(
+        CompressedImage, "camera/image/compressed",
+        lambda msg: probe.received(msg.header.stamp.nanosec // 1000),
+        QoSProfile(depth=1, reliability=ReliabilityPolicy.BEST_EFFORT),
+    )
+    executor = SingleThreadedExecutor()
+    executor.add_node(sub_node)
+    spin = threading.Thread(target=executor.spin, daemon=True)
+    spin.start()
+    try:
+        publisher = publishing.RosPublisher(pub_node, StreamSettings())
+        while not publisher.image_pub.get_subscription_count():
+            time.sleep(0.05)  # discovery
+        drive(publisher, probe, args)
+    finally:
+        executor.shutdown()
+        pub_node.destroy_node()
+        sub_node.destroy_node()
+        rclpy.shutdown()
+
+
+class TcpSink:
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+
+    def submit(self, jpeg, **meta) -> None:
+        self.sock.sendall(proto.pack_frame(jpeg, **meta))
+
+
+def run_tcp(args, probe: Probe) -> None:
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    client = socket.create_connection(server.getsockname())
+    client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    conn, _ = server.accept()
+    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def read_exact(n):
+        buf = bytearray()
+        while len(buf) < n:
+            chunk = client.recv(n - len(buf))
+            if not chunk:
+                return None
+            buf += chunk
+        return buf
+
+    def reader():
+        while True:
+            prefix = read_exact(proto.LENGTH.size)
+            if prefix is None:
+                return
+            body = read_exact(proto.LENGTH.unpack(prefix)[0])
+            if body is None:
+                return
+            header, _ = proto.unpack_frame(body)
+            probe.received(header.capture_us)
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        drive(TcpSink(conn), probe, args)
+    finally:
+        conn.close()
+        thread.join(1.0)
+        client.close()
+        server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--size-kb", type=int, default=60)
+    parser.add_argument("--transport", action="append", choices=TRANSPORTS)
+    parser.add_argument("--out", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.transport or TRANSPORTS:
+        if name == "ros" and publishing.rclpy is None:
+            print("⚠️ rclpy bulunamadı, ros atlandı", file=sys.stderr)
+            continue
+        probe = Probe()
+        globals()[f"run_{name}"](args, probe)
+        results[name] = {
+            "received": len(probe.latency_ms),
+            "lost": len(probe.sent),
+            "latency_ms": percentiles(probe.latency_ms),
+        }
+    config = {k: v for k, v in vars(args).items() if k not in ("out", "transport")}
+    text = json.dumps({"frame_delivery": {"config": config, "transports": results}},
+                      indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
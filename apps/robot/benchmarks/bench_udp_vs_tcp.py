@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Camera stream over TCP vs the fragmented UDP transport under packet loss.
+
+A paced camera produces a frame every ``1/fps`` seconds; the sender always
+sends the newest frame, skipping the ones captured while it was busy, just
+like the camera loop with its ``maxSize=1`` device queue.  Latency is
+measured from capture to the receiver having the complete frame, over real
+localhost sockets:
+
+* ``tcp`` – length-prefixed packets of :mod:`oak_streamer.protocol`, read
+  back as the Flutter app does.  Loss is injected as TCP experiences it: a
+  lost segment is sent ``--rto-ms`` late and everything behind it waits
+  (head-of-line blocking).  200 ms is Linux' minimum retransmission timeout;
+  a loss in the middle of a frame is often repaired sooner by fast
+  retransmit, so lower values bound the best case.
+* ``udp`` – :class:`oak_streamer.udp_transport.UdpFrameSender` into a
+  :class:`~oak_streamer.udp_transport.FrameAssembler`, with each datagram
+  dropped with probability ``--loss``; ``udp0`` is the same without parity.
+
+For a real lossy link instead of the model run with ``--loss 0`` under
+``tc qdisc add dev lo root netem loss 5%`` (needs the ``sch_netem`` module).
+
+Usage::
+
+    python3 benchmarks/bench_udp_vs_tcp.py [--loss 0 --loss 0.01 --loss 0.05]
+        [--frames 300] [--fps 30] [--size-kb 40] [--rto-ms 200] [--out result.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+for pkg in ("oak_streamer", "robot_common"):
+    sys.path.insert(0, str(SRC / pkg))
+
+from oak_streamer import protocol as proto  # noqa: E402
+from oak_streamer.udp_transport import FrameAssembler, UdpFrameSender  # noqa: E402
+
+TRANSPORTS = ("tcp", "udp", "udp0")
+MSS = 1448
+
+
+def percentiles(values, points=(50, 90, 99)):
+    if not values:
+        return {f"p{p}": None for p in points} | {"max": None}
+    ordered = sorted(values)
+    out = {f"p{p}": round(ordered[min(len(ordered) - 1, len(ordered) * p // 100)], 3)
+           for p in points}
+    out["max"] = round(ordered[-1], 3)
+    return out
+
+
+class Probe:
+    def __init__(self, t0: float, period: float) -> None:
+        self.t0 = t0
+        self.period = period
+        self.latency_ms = []
+
+    def received(self, n: int) -> None:
+        capture = self.t0 + n * self.period
+        self.latency_ms.append((time.perf_counter() - capture) * 1000)
+
+
+def camera(send, args, probe: Probe) -> int:
+    """Send the newest frame whenever the sender is free; returns frames skipped."""
+
+    payload = b"\xff\xd8" + os.urandom(args.size_kb * 1024 - 4) + b"\xff\xd9"
+    skipped = 0
+    last = 0
+    while last < args.frames:
+        n = min(args.frames, int((time.perf_counter() - probe.t0) / probe.period))
+        if n <= last:
+            time.sleep(probe.t0 + (last + 1) * probe.period - time.perf_counter())
+            continue
+        skipped += n - last - 1
+        last = n
+        send(proto.pack_frame(payload, seq=n, capture_us=0, encode_us=0,
+                              width=1280, height=720))
+    time.sleep(0.5)  # stragglers
+    return skipped
+
+
+class LossySocket:
+    """A UDP socket that drops each datagram with probability ``loss``."""
+
+    def __init__(self, loss: float, rng: random.Random) -> None:
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 21)
+        self.loss = loss
+        self.rng = rng
+        self.dropped = 0
+
+    def setblocking(self, flag) -> None:
+        self.sock.setblocking(flag)
+
+    def sendmsg(self, buffers, ancdata, flags, addr):
+        if self.rng.random() < self.loss:
+            self.dropped += 1
+            return 0
+        return self.sock.sendmsg(buffers, ancdata, flags, addr)
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+def run_udp(args, loss: float, probe: Probe, parity: int) -> dict:
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 22)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(0.2)
+    assembler = FrameAssembler()
+    running = True
+
+    def reader():
+        while running:
+            try:
+                datagram = receiver.recv(65536)
+            except socket.timeout:
+                continue
+            body = assembler.add(datagram)
+            if body is not None:
+                probe.received(proto.unpack_frame(body)[0].seq)
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    lossy = LossySocket(loss, random.Random(args.seed))
+    sender = UdpFrameSender(receiver.getsockname(), args.datagram, parity, sock=lossy)
+    try:
+        skipped = camera(sender.send, args, probe)
+    finally:
+        running = False
+        thread.join(1.0)
+        sender.close()
+        receiver.close()
+    return {"skipped": skipped, "datagrams_dropped": lossy.dropped,
+            "sender": sender.stats(), "receiver": assembler.stats()}
+
+
+def run_tcp(args, loss: float, probe: Probe) -> dict:
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    client = socket.create_connection(server.getsockname())
+    conn, _ = server.accept()
+    for s in (client, conn):
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    rng = random.Random(args.seed)
+    stalls = 0
+
+    def send(packet):
+        nonlocal stalls
+        view = memoryview(packet)
+        for offset in range(0, len(view), MSS):
+            if rng.random() < loss:
+                stalls += 1
+                time.sleep(args.rto_ms / 1000)   # retransmission; the stream waits
+            conn.sendall(view[offset:offset + MSS])
+
+    def read_exact(n):
+        buf = bytearray()
+        while len(buf) < n:
+            chunk = client.recv(n - len(buf))
+            if not chunk:
+                return None
+            buf += chunk
+        return buf
+
+    def reader():
+        while True:
+            prefix = read_exact(proto.LENGTH.size)
+            if prefix is None:
+                return
+            body = read_exact(proto.LENGTH.unpack(prefix)[0])
+            if body is None:
+                return
+            probe.received(proto.unpack_frame(body)[0].seq)
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        skipped = camera(send, args, probe)
+    finally:
+        conn.close()
+        thread.join(1.0)
+        client.close()
+        server.close()
+    return {"skipped": skipped, "retransmit_stalls": stalls}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--loss", type=float, action="append",
+                        help="datagram/segment loss probability (repeatable)")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--size-kb", type=int, default=40)
+    parser.add_argument("--rto-ms", type=float, default=200.0)
+    parser.add_argument("--datagram", type=int, default=1200)
+    parser.add_argument("--parity", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--transport", action="append", choices=TRANSPORTS)
+    parser.add_argument("--out", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for loss in args.loss or (0.0, 0.01, 0.05):
+        row = results[str(loss)] = {}
+        for name in args.transport or TRANSPORTS:
+            probe = Probe(time.perf_counter() + 0.05, 1.0 / args.fps)
+            if name == "tcp":
+                extra = run_tcp(args, loss, probe)
+            else:
+                extra = run_udp(args, loss, probe, args.parity if name == "udp" else 0)
+            row[name] = {
+                "delivered": len(probe.latency_ms),
+                "latency_ms": percentiles(probe.latency_ms),
+                **extra,
+            }
+    config = {k: v for k, v in vars(args).items() if k not in ("out", "transport", "loss")}
+    text = json.dumps({"camera_transport": {"config": config, "loss": results}}, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
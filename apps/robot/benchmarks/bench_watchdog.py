@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Time-to-stop of the PLC watchdog after the control node stalls.
+
+A real :class:`plc_comm.udp_listener_node.UDPJoystickListener` drives a
+:class:`plc_comm.sim_plc.SimulatedPLC` that runs the PLC side of the
+:mod:`plc_comm.watchdog` contract.  A joystick generator holds the robot at
+``forward=60`` until D10 is latched, then the node is stalled:
+
+* ``modbus_hang`` – the next Modbus write of the control loop blocks forever
+  (a hung TCP connection), while the process and its heartbeat thread live on;
+* ``crash``       – the node stops executing and its heartbeat thread is gone,
+  without a safe stop, as when the process is killed;
+* ``no_watchdog`` – ``modbus_hang`` with the heartbeat disabled: the baseline,
+  where D10 stays latched.
+
+``time_to_stop_ms`` is measured from the stall until the simulated PLC forces
+D10/D11 to zero; ``latched`` counts runs where it had not stopped after
+``--observe`` seconds.  The joystick keeps sending during the stall, so the
+node's own timeout cannot be what stops the robot.
+
+Usage::
+
+    python3 benchmarks/bench_watchdog.py [--scenario modbus_hang] [--runs 5]
+        [--heartbeat-hz 10] [--watchdog-ms 500] [--out result.json]
+
+Requires rclpy and pymodbus; no robot hardware.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+for pkg in ("plc_comm", "robot_common"):
+    sys.path.insert(0, str(SRC / pkg))
+
+import rclpy  # noqa: E402
+from rclpy.executors import SingleThreadedExecutor  # noqa: E402
+
+from plc_comm.sim_plc import REG_LEFT, SimulatedPLC  # noqa: E402
+from plc_comm.udp_listener_node import UDPJoystickListener  # noqa: E402
+
+SCENARIOS = ("modbus_hang", "crash", "no_watchdog")
+
+
+def percentiles(values, points=(50, 90, 99)):
+    if not values:
+        return {f"p{p}": None for p in points} | {"max": None}
+    ordered = sorted(values)
+    out = {f"p{p}": round(ordered[min(len(ordered) - 1, len(ordered) * p // 100)], 1)
+           for p in points}
+    out["max"] = round(ordered[-1], 1)
+    return out
+
+
+def free_udp_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Joystick(threading.Thread):
+    """Send ``forward`` at 20 Hz until stopped."""
+
+    def __init__(self, port: int, forward: int = 60) -> None:
+        super().__init__(daemon=True)
+        self.port = port
+        self.forward = forward
+        self.running = True
+
+    def run(self) -> None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        seq = 0
+        while self.running:
+            seq += 1
+            sock.sendto(json.dumps({
+                "ts": int(time.time() * 1000), "seq": seq, "joystick_forward": self.forward,
+                "joystick_turn": 0, "brush1": 1, "brush2": 0,
+            }).encode(), ("127.0.0.1", self.port))
+            time.sleep(0.05)
+        sock.close()
+
+
+def hang_modbus(listener: UDPJoystickListener, entered: list) -> threading.Event:
+    """Make the control loop's next Modbus write block until the event is set."""
+
+    release = threading.Event()
+    client = listener.client
+
+    def blocked(*args, **kwargs):
+        entered.append(time.perf_counter())
+        release.wait()
+        raise ConnectionError("released")
+
+    for name in ("write_register", "write_registers", "write_coil", "write_coils"):
+        setattr(client, name, blocked)
+    listener.last_forward = None   # the next packet writes right away
+    return release
+
+
+def run_once(scenario: str, observe_s: float) -> dict:
+    # A fresh PLC per run: a trip left by the previous node would hold the outputs off.
+    plc = SimulatedPLC(watchdog=True).start()
+    udp_port = free_udp_port()
+    listener = UDPJoystickListener(udp_port=udp_port, plc_ip="127.0.0.1", plc_port=plc.port)
+    executor = SingleThreadedExecutor()
+    executor.add_node(listener)
+    spin = threading.Thread(target=executor.spin, daemon=True)
+    spin.start()
+    joystick = Joystick(udp_port)
+    release = None
+    entered = []
+    try:
+        joystick.start()
+        deadline = time.monotonic() + 5.0
+        while plc.register(REG_LEFT) != joystick.forward:
+            if time.monotonic() > deadline:
+                raise RuntimeError("D10 never reached the commanded speed")
+            time.sleep(0.01)
+        time.sleep(0.5)   # steady state, heartbeat running
+
+        t_stall = time.perf_counter()
+        if scenario == "crash":
+            executor.shutdown(timeout_sec=0)
+            if listener.heartbeat is not None:
+                listener.heartbeat.stop()
+        else:
+            release = hang_modbus(listener, entered)
+
+        stopped_at = None
+        end = t_stall + observe_s
+        while time.perf_counter() < end:
+            if plc.watchdog_trips and plc.register(REG_LEFT) == 0:
+                stopped_at = plc.watchdog_trips[0]
+                break
+            time.sleep(0.005)
+        if entered:
+            t_stall = entered[0]   # the control loop is stuck from here on
+        return {"time_to_stop_ms": None if stopped_at is None
+                else round((stopped_at - t_stall) * 1000, 1),
+                "heartbeat": listener.heartbeat.stats() if listener.heartbeat else None}
+    finally:
+        joystick.running = False
+        if release is not None:
+            release.set()
+        executor.shutdown(timeout_sec=1.0)
+        listener.destroy_node()
+        plc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--heartbeat-hz", type=float, default=10.0)
+    parser.add_argument("--watchdog-ms", type=int, default=500)
+    parser.add_argument("--observe", type=float, default=3.0,
+                        help="seconds to wait for the stop before calling it latched")
+    parser.add_argument("--out", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    # Parameters through the node's own configuration path, never a deployed file.
+    os.environ["ROBOT_CONFIG"] = os.path.join(tempfile.mkdtemp(), "absent.json")
+    os.environ["PLC_WATCHDOG_MS"] = str(args.watchdog_ms)
+
+    rclpy.init()
+    results = []
+    try:
+        for name in args.scenario or SCENARIOS:
+            os.environ["PLC_HEARTBEAT_HZ"] = "0" if name == "no_watchdog" else str(
+                args.heartbeat_hz)
+            runs = [run_once(name, args.observe) for _ in range(args.runs)]
+            stops = [r["time_to_stop_ms"] for r in runs if r["time_to_stop_ms"] is not None]
+            results.append({
+                "scenario": name,
+                "time_to_stop_ms": percentiles(stops),
+                "latched": args.runs - len(stops),
+                "heartbeat": runs[-1]["heartbeat"],
+            })
+    finally:
+        rclpy.shutdown()
+
+    config = {k: v for k, v in vars(args).items() if k not in ("out", "scenario")}
+    text = json.dumps({"watchdog": {"config": config, "scenarios": results}}, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""Offline performance regression suite of the robot packages.
+
+One command times the hot paths of every package and compares them with the
+stored baseline of this machine:
+
+``micro.bms``
+    BMS request frame build and DID 0x90/0x93/0x94 reply parsing
+    (``battery_streamer``, needs pyserial to import the node).
+``micro.decode``
+    JSON vs binary decoding: the joystick packet as the listener parses it vs
+    the same fields in a struct, the tracked target as JSON vs
+    :mod:`robot_common.target`, and a camera frame header
+    (:func:`oak_streamer.protocol.unpack_frame`).
+``micro.mix``
+    Joystick mixing (:func:`plc_comm.mixing.mix`) over a stick sweep.
+``micro.udp_fragments``
+    Fragmenting a 40 kB frame with parity and reassembling it
+    (:mod:`oak_streamer.udp_transport`).
+``micro.modbus``
+    Batched vs per-address Modbus read-back and joystick writes against
+    :class:`plc_comm.sim_plc.SimulatedPLC` on localhost (needs pymodbus).
+``micro.tracker``
+    One :class:`oak_streamer.tracker.MultiTracker` update and target choice
+    with 2 and 5 people walking and jittering (needs numpy).
+``macro.encode`` / ``macro.detect``
+    JPEG encoding with every available backend and HOG person detection on
+    synthetic mono frames at 640x360 and 1280x720 (needs numpy and OpenCV).
+
+Every metric is a time per operation, lower is better: the best of
+``--repeat`` short rounds, each long enough (:meth:`timeit.Timer.autorange`) for
+the clock resolution not to matter.  The best round is the one least
+disturbed by the rest of the system, so it moves the least between runs.
+A case that looks slower than its baseline is measured once more and keeps
+the better value of the two runs before it counts as a regression.
+
+Baselines are per machine, ``benchmarks/baselines/<hostname>.json``; numbers
+from a laptop say nothing about the Jetson.  A metric more than
+``--threshold`` (a fraction, default 0.25) slower than its baseline is a
+regression and the command exits with status 1.  Per-metric thresholds go in
+the baseline file and survive ``--update-baseline``::
+
+    {"thresholds": {"macro.detect": 0.4, "micro.modbus.read_per_address_ms": 0.5},
+     "results": {...}}
+
+A key names a case or ``case.metric``; the most specific one wins.  Cases
+whose dependencies are missing are reported as skipped, not failed.  Nothing
+leaves the machine: the only sockets are on localhost.
+
+Usage::
+
+    python3 benchmarks/suite.py                      # run and compare
+    python3 benchmarks/suite.py --update-baseline    # accept the current numbers
+    python3 benchmarks/suite.py [--only micro] [--only macro.encode]
+        [--threshold 0.25] [--repeat 15] [--baseline FILE] [--out result.json]
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import socket
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+for pkg in ("battery_streamer", "oak_streamer", "plc_comm", "robot_common"):
+    sys.path.insert(0, str(SRC / pkg))
+
+from robot_common import lazy  # noqa: E402
+
+BASELINES = Path(__file__).resolve().parent / "baselines"
+DEFAULT_THRESHOLD = 0.25
+RESOLUTIONS = {"360p": (360, 640), "720p": (720, 1280)}
+
+
+class Skip(Exception):
+    """A case that cannot run here (missing dependency)."""
+
+
+def require(*modules: str) -> None:
+    missing = [m for m in modules if not lazy.module_available(m)]
+    if missing:
+        raise Skip(f"missing {', '.join(missing)}")
+
+
+CASES: Dict[str, Callable[[int], Dict[str, float]]] = {}
+
+
+def case(name: str):
+    def register(fn):
+        CASES[name] = fn
+        return fn
+    return register
+
+
+def per_call(fn: Callable[[], object], repeat: int, unit: float = 1e6) -> float:
+    """Best time of one ``fn()`` call, in µs (``unit=1e3``: ms)."""
+
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()          # ≥ 0.2 s
+    number = max(1, number // 4)           # many short rounds: more chances at a quiet one
+    return round(min(timer.repeat(repeat, number)) / number * unit, 3)
+
+
+# -- micro -----------------------------------------------------------------
+
+@case("micro.bms")
+def bench_bms(repeat: int) -> Dict[str, float]:
+    require("serial")
+    from battery_streamer import battery_udp_node as bms
+
+    def reply(did: int, data: List[int]) -> bytes:
+        frame = [0xA5, 0x01, did, 0x08] + data
+        return bytes(frame + [bms.checksum(frame)])
+
+    r90 = reply(bms.DID_90, [0x02, 0x0E, 0, 0, 0x75, 0x94, 0x02, 0xBC])
+    r93 = reply(bms.DID_93, [0, 0, 0, 0, 0x00, 0x01, 0x86, 0xA0])
+    r94 = reply(bms.DID_94, [16, 4, 0, 0, 0, 0, 0, 0])
+
+    def parse():
+        if bms.checksum(r90[:-1]) == r90[-1]:
+            bms.parse_did_90(r90)
+        bms.parse_did_93(r93)
+        bms.parse_did_94(r94)
+
+    return {"build_us": per_call(lambda: bms.build_frame(bms.DID_90), repeat),
+            "parse_us": per_call(parse, repeat)}
+
+
+@case("micro.decode")
+def bench_decode(repeat: int) -> Dict[str, float]:
+    import struct
+
+    from oak_streamer import protocol as proto
+    from robot_common import target
+
+    joystick = json.dumps({"ts": 1760000000000, "seq": 4242, "sid": "a1b2c3",
+                           "joystick_forward": 55, "joystick_turn": -20,
+                           "brush1": 1, "brush2": 0}).encode()
+    # Same fields packed: ts, seq, forward, turn, brush1, brush2 (sid as 6 bytes).
+    joy_struct = struct.Struct(">qI6sbbBB")
+    joy_binary = joy_struct.pack(1760000000000, 4242, b"a1b2c3", 55, -20, 1, 0)
+
+    def joystick_json():
+        payload = json.loads(joystick.decode())
+        return (int(payload.get("ts", 0)), int(payload.get("joystick_forward", 0)),
+                int(payload.get("joystick_turn", 0)), int(payload.get("brush1", 0)),
+                int(payload.get("brush2", 0)))
+
+    tracked = target.Target(812, 123456789, target.TRACK_LOCKED, 0.12, -0.3, 0.45, 3.2, False)
+    tracked_json = json.dumps(tracked._asdict()).encode()
+    tracked_binary = target.pack(tracked)
+    body = bytes(proto.pack_frame(b"\xff\xd8" + bytes(30000) + b"\xff\xd9", seq=812,
+                                  capture_us=0, encode_us=0, width=1280, height=720,
+                                  boxes=[(100, 80, 60, 180, 3, 90)] * 3, distance_m=3.2,
+                                  track_state=proto.TRACK_LOCKED, stream=0))[4:]
+
+    return {
+        "joystick_json_us": per_call(joystick_json, repeat),
+        "joystick_binary_us": per_call(lambda: joy_struct.unpack(joy_binary), repeat),
+        "target_json_us": per_call(lambda: target.Target(**json.loads(tracked_json)), repeat),
+        "target_binary_us": per_call(lambda: target.unpack(tracked_binary), repeat),
+        "frame_header_us": per_call(lambda: proto.unpack_frame(body), repeat),
+    }
+
+
+@case("micro.mix")
+def bench_mix(repeat: int) -> Dict[str, float]:
+    from plc_comm.mixing import mix
+
+    sweep = [(f, t) for f in range(-100, 101, 25) for t in range(-100, 101, 25)]
+
+    def run():
+        for forward, turn in sweep:
+            mix(forward, turn)
+
+    return {"mix_us": round(per_call(run, repeat) / len(sweep), 3)}
+
+
+@case("micro.udp_fragments")
+def bench_udp_fragments(repeat: int) -> Dict[str, float]:
+    import os
+
+    from oak_streamer import protocol as proto
+    from oak_streamer.udp_transport import FrameAssembler, UdpFrameSender
+
+    class Capture:
+        def __init__(self):
+            self.datagrams = []
+
+        def setblocking(self, flag):
+            pass
+
+        def sendmsg(self, buffers, ancdata, flags, addr):
+            self.datagrams.append(b"".join(buffers))
+
+    packet = proto.pack_frame(os.urandom(40 * 1024), seq=1, capture_us=0, encode_us=0,
+                              width=1280, height=720)
+    sock = Capture()
+    sender = UdpFrameSender(("127.0.0.1", 9), sock=sock)
+
+    def send():
+        sock.datagrams.clear()
+        sender.send(packet)
+
+    send()
+    datagrams = list(sock.datagrams)
+    lossy = datagrams[1:]   # the first fragment is rebuilt from parity
+
+    def receive(frames):
+        assembler = FrameAssembler()
+        for d in frames:
+            assembler.add(d)
+
+    return {"send_us": per_call(send, repeat),
+            "assemble_us": per_call(lambda: receive(datagrams), repeat),
+            "assemble_recover_us": per_call(lambda: receive(lossy), repeat)}
+
+
+@case("micro.modbus")
+def bench_modbus(repeat: int) -> Dict[str, float]:
+    require("pymodbus")
+    from pymodbus.client import ModbusTcpClient
+
+    from plc_comm.mixing import COIL_DRIVE, COIL_TURN, REG_LEFT, mix
+    from plc_comm.readback import (
+        WATCHED_COILS, WATCHED_REGISTERS, PlcReader, PlcState, write_values,
+    )
+    from plc_comm.sim_plc import SimulatedPLC
+
+    plc = SimulatedPLC().start()
+    client = ModbusTcpClient("127.0.0.1", port=plc.port, timeout=1.0)
+    try:
+        if not client.connect():
+            raise Skip("simulated PLC did not accept the connection")
+        state = PlcState()
+        reader = PlcReader(state)
+        drive, turn, speeds = mix(60, 30)
+        blocks = (("coil", COIL_DRIVE, drive), ("coil", COIL_TURN, turn),
+                  ("reg", REG_LEFT, speeds))
+
+        def read_per_address():
+            for address in WATCHED_COILS:
+                client.read_coils(address, count=1)
+            for address in WATCHED_REGISTERS:
+                client.read_holding_registers(address, count=1)
+
+        def write_batched():
+            for kind, start, values in blocks:
+                write_values(client, state, kind, start, values, force=True)
+
+        def write_per_address():
+            for kind, start, values in blocks:
+                for i, value in enumerate(values):
+                    if kind == "coil":
+                        client.write_coil(start + i, bool(value))
+                    else:
+                        client.write_register(start + i, value)
+
+        return {"read_batched_ms": per_call(lambda: reader.read(client), repeat, 1e3),
+                "read_per_address_ms": per_call(read_per_address, repeat, 1e3),
+                "write_batched_ms": per_call(write_batched, repeat, 1e3),
+                "write_per_address_ms": per_call(write_per_address, repeat, 1e3)}
+    finally:
+        client.close()
+        plc.stop()
+
+
+@case("micro.tracker")
+def bench_tracker(repeat: int) -> Dict[str, float]:
+    require("numpy")
+    from oak_streamer.tracker import MultiTracker
+
+    def walk(people: int, frames: int = 64):
+        # Deterministic walk with box jitter, people listed in a shuffled order.
+        out = []
+        for f in range(frames):
+            boxes = [(60 + 110 * p + 2 * f + (f * 7 + p) % 5, 80 + (f * 3 + p) % 4,
+                      50 + (f + p) % 6, 120 + (f * 5 + p) % 7) for p in range(people)]
+            out.append(boxes[f % people:] + boxes[:f % people])
+        return out
+
+    results = {}
+    for people in (2, 5):
+        frames = walk(people)
+        tracker = MultiTracker()
+
+        def run():
+            for boxes in frames:
+                tracker.update(boxes)
+                tracker.wire_boxes(tracker.target())
+
+        results[f"update_{people}_us"] = round(per_call(run, repeat) / len(frames), 2)
+    return results
+
+
+# -- macro -----------------------------------------------------------------
+
+def synthetic_frame(shape):
+    """Mono frame with a gradient, noise and a few edges, like the left camera."""
+
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    h, w = shape
+    ramp = np.linspace(0, 255, w, dtype=np.float32)[None, :]
+    frame = ramp + rng.normal(0, 12, shape).astype(np.float32)
+    frame[h // 4:h * 3 // 4, w // 3:w // 3 + w // 16] = 40    # a dark upright shape
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+@case("macro.encode")
+def bench_encode(repeat: int) -> Dict[str, float]:
+    require("numpy", "cv2")
+    from oak_streamer import encoders
+
+    result = {}
+    for name in ("opencv", "turbojpeg"):
+        if not encoders.available(name):
+            continue
+        enc = encoders.BACKENDS[name]()
+        for label, shape in RESOLUTIONS.items():
+            frame = synthetic_frame(shape)
+            result[f"{name}_{label}_ms"] = per_call(
+                lambda: enc.encode(frame, encoders.BENCH_QUALITY), repeat, 1e3)
+    return result
+
+
+@case("macro.detect")
+def bench_detect(repeat: int) -> Dict[str, float]:
+    require("numpy", "cv2")
+    from oak_streamer.detection import detect_humans
+
+    result = {}
+    for label, shape in RESOLUTIONS.items():
+        frame = synthetic_frame(shape)
+        result[f"hog_{label}_ms"] = per_call(lambda: detect_humans(frame), repeat, 1e3)
+    return result
+
+
+# -- baseline --------------------------------------------------------------
+
+def threshold_for(key: str, thresholds: Dict[str, float], default: float) -> float:
+    """Most specific of ``case.metric``, ``case``, ``micro``/``macro``, default."""
+
+    parts = key.split(".")
+    for i in range(len(parts), 0, -1):
+        value = thresholds.get(".".join(parts[:i]))
+        if value is not None:
+            return float(value)
+    return default
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: dict, default: float) -> List[dict]:
+    thresholds = baseline.get("thresholds", {})
+    old = baseline.get("results", {})
+    rows = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            key = f"{name}.{metric}"
+            ref = old.get(name, {}).get(metric)
+            limit = threshold_for(key, thresholds, default)
+            change = None if not ref else round(value / ref - 1, 3)
+            rows.append({"metric": key, "value": value, "baseline": ref, "change": change,
+                         "threshold": limit,
+                         "regression": change is not None and change > limit})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", action="append",
+                        help="run cases starting with this name (repeatable)")
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--threshold", type=float, default=None,
+                        help=f"allowed slowdown as a fraction (default {DEFAULT_THRESHOLD})")
+    parser.add_argument("--baseline", help="baseline file (default: per hostname)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store this run as the new baseline")
+    parser.add_argument("--out", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    path = Path(args.baseline or BASELINES / f"{socket.gethostname()}.json")
+    baseline = json.loads(path.read_text()) if path.exists() else {}
+    default = args.threshold if args.threshold is not None else baseline.get(
+        "default_threshold", DEFAULT_THRESHOLD)
+
+    results, skipped = {}, {}
+    for name, fn in CASES.items():
+        if args.only and not any(name.startswith(prefix) for prefix in args.only):
+            continue
+        print(f"⏱️ {name}", file=sys.stderr)
+        try:
+            results[name] = fn(args.repeat)
+        except Skip as e:
+            skipped[name] = str(e)
+            print(f"⚠️ {name} atlandı: {e}", file=sys.stderr)
+
+    rows = compare(results, baseline, default)
+    # A slow round can be a busy machine: confirm a regression with a second run.
+    for name in {row["metric"].rsplit(".", 1)[0] for row in rows if row["regression"]}:
+        print(f"🔁 {name} yeniden ölçülüyor", file=sys.stderr)
+        again = CASES[name](args.repeat)
+        results[name] = {k: min(v, again.get(k, v)) for k, v in results[name].items()}
+    if any(row["regression"] for row in rows):
+        rows = compare(results, baseline, default)
+    for row in rows:
+        change = "yeni" if row["change"] is None else f"{row['change']:+.1%}"
+        mark = "🚨 YAVAŞLADI" if row["regression"] else "✅"
+        print(f"{mark} {row['metric']:<42} {row['value']:>10.3f}  {change}", file=sys.stderr)
+    regressions = [row["metric"] for row in rows if row["regression"]]
+
+    if args.update_baseline:
+        merged = {**baseline.get("results", {}), **results}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "host": socket.gethostname(),
+            "machine": platform.machine(),
+            "python": platform.python_version(),
+            "updated": datetime.datetime.now().isoformat(timespec="seconds"),
+            "default_threshold": default,
+            "thresholds": baseline.get("thresholds", {}),
+            "results": merged,
+        }, indent=2) + "\n")
+        print(f"💾 Referans güncellendi: {path}", file=sys.stderr)
+        regressions = []
+
+    text = json.dumps({"suite": {"baseline": str(path), "results": results,
+                                 "skipped": skipped, "comparison": rows,
+                                 "regressions": regressions}}, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,21 +5,17 @@ SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 WS_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
 
 export PYTHONUNBUFFERED=1
-export PYTHONPATH="$WS_ROOT/src:${PYTHONPATH:-}"
+# Her paket kökü ayrı eklenir ki "commcheck.heartbeat" gibi paket içi importlar çözülsün.
+for pkg_dir in "$WS_ROOT"/src/*/; do
+  PYTHONPATH="${pkg_dir%/}:${PYTHONPATH:-}"
+done
+export PYTHONPATH
 
-pids=()
+# Tek süreçli gateway modu (isteğe bağlı): ROBOT_GATEWAY=1 ./run_all.sh
+if [[ "${ROBOT_GATEWAY:-0}" == "1" ]]; then
+  exec /usr/bin/python3 -m robot_bringup.gateway "$@"
+fi
 
-start_node() {
-  local module_path="$1"
-  /usr/bin/python3 "$module_path" &
-  pids+=("$!")
-}
-
-start_node "$WS_ROOT/src/battery_streamer/battery_streamer/battery_udp_node.py"
-start_node "$WS_ROOT/src/commcheck/commcheck/commcheck.py"
-start_node "$WS_ROOT/src/oak_streamer/oak_streamer/oak_streamer_node.py"
-start_node "$WS_ROOT/src/plc_comm/plc_comm/udp_listener_node.py"
-
-trap 'echo "Stopping nodes..."; kill ${pids[*]} 2>/dev/null' SIGINT SIGTERM
-
-wait
+# Varsayılan: düğümler supervisor altında ayrı süreçler olarak çalışır
+# (heartbeat ile canlılık takibi, backoff ile yeniden başlatma, CPU sabitleme).
+exec /usr/bin/python3 -m robot_bringup.supervisor "$@"
@@ -1,7 +1,11 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
-pkill -f battery_udp_node.py || true
-pkill -f commcheck.py || true
-pkill -f oak_streamer_node.py || true
-pkill -f udp_listener_node.py || true
+# Önce supervisor durdurulur, yoksa düğümleri yeniden başlatır.
+pkill -f robot_bringup.supervisor || true
+pkill -f robot_bringup.gateway || true
+
+pkill -f battery_udp_node || true
+pkill -f commcheck.commcheck || true
+pkill -f oak_streamer_node || true
+pkill -f udp_listener_node || true
@@ -10,13 +10,20 @@ import threading
 import traceback
 from typing import Dict, Any, Optional, Tuple, List
 
+from robot_common import instrumentation as instr
+from robot_common import devwatch, liveness
+from robot_common.config import SCHEMA, ConfigWatcher
+
 TCP_CONTROL_HOST = "0.0.0.0"
 TCP_CONTROL_PORT = 5001
-DEFAULT_UDP_TARGET_PORT = 8890
-SERIAL_PORT = "/dev/ttyUSB0"
+# Varsayılanlar; çalışırken robot_common.config "battery" bölümünden değiştirilebilir.
+DEFAULT_UDP_TARGET_PORT = SCHEMA["battery"]["udp_port"].default
+SERIAL_PORT = SCHEMA["battery"]["serial_port"].default
 SERIAL_BAUD = 9600
 SERIAL_TIMEOUT_S = 1.2
-READ_PERIOD_S = 1.0
+READ_PERIOD_S = SCHEMA["battery"]["read_period_s"].default
+# Port yokken yeniden deneme aralığı; hotplug olayı gelirse hemen denenir.
+REOPEN_RETRY_S = 5.0
 
 DID_90 = 0x90
 DID_93 = 0x93
@@ -158,36 +165,89 @@ def read_battery_snapshot(ser: serial.Serial) -> Dict[str, Any]:
         data["err"] = f"{type(e).__name__}: {e}"
     return data
 
+def open_serial(port: str) -> serial.Serial:
+    # ttyUSBn bir USB kesintisinden sonra numara değiştirebilir; by-id bağlantısı değişmez.
+    return serial.Serial(devwatch.stable_path(port), SERIAL_BAUD, bytesize=8, parity='N',
+                         stopbits=1, timeout=SERIAL_TIMEOUT_S)
+
+def serial_lost(ser: serial.Serial, snapshot: Dict[str, Any]) -> bool:
+    """Okuma hata verdi ve port artık aynı cihaz değil (çıkarıldı/yeniden takıldı)."""
+    if not snapshot.get("err"):
+        return False
+    try:
+        return not devwatch.same_device(ser.fileno(), ser.port)
+    except Exception:
+        return True
+
 def udp_stream_loop(stop_evt: threading.Event, target_ip: str, target_port: int):
     print(f"📤 UDP yayın başlıyor -> {target_ip}:{target_port}")
     udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     ser: Optional[serial.Serial] = None
     last_err_log_t = 0.0
+
+    def apply_config(old, new):
+        # Yeni seri port açılamazsa hata ConfigWatcher'ın geri almasını tetikler.
+        nonlocal ser
+        if new.serial_port != old.serial_port and ser is not None:
+            new_ser = open_serial(new.serial_port)
+            ser.close()
+            ser = new_ser
+            print(f"🔌 Seri port değişti: {new.serial_port}")
+
+    config = ConfigWatcher("battery", apply_config)
+    instr.gauge("config_battery", config.stats)
+    # USB seri adaptör takılınca port beklemeden yeniden açılır (robot_common.devwatch).
+    devices = devwatch.shared().subscribe(("tty",))
+    reconnect = devwatch.ReconnectTimer()
+    instr.gauge("reconnect_bms", reconnect.stats)
     try:
         while not stop_evt.is_set():
+            config.poll()  # döngü sınırı: yeni periyot / port burada devreye girer
+            serial_port = config.current.serial_port
             if ser is None or not ser.is_open:
                 try:
-                    ser = serial.Serial(SERIAL_PORT, SERIAL_BAUD, bytesize=8, parity='N',
-                                        stopbits=1, timeout=SERIAL_TIMEOUT_S)
-                    print(f"🔌 Seri porta bağlandı: {SERIAL_PORT} @ {SERIAL_BAUD}")
+                    ser = open_serial(serial_port)
+                    devices.clear()  # bu açılıştan önceki olaylar artık eski
+                    print(f"🔌 Seri porta bağlandı: {ser.port} @ {SERIAL_BAUD}")
                 except Exception as e:
+                    reconnect.lost()
                     now = time.time()
                     if now - last_err_log_t > 5.0:
                         print(f"⚠️ Seri port açılamadı: {e}")
                         last_err_log_t = now
-                    time.sleep(1.0)
+                    # Takma olayı ya da yedek süre; stop_evt beklemeyi yarıda keser.
+                    event = None
+                    deadline = time.monotonic() + (REOPEN_RETRY_S if devices.live else 1.0)
+                    while event is None and not stop_evt.is_set() and time.monotonic() < deadline:
+                        event = devices.wait(0.5, match=lambda ev: ev.action != "remove")
+                    if event is not None:
+                        reconnect.appeared(event.t)
                     continue
-            snapshot = read_battery_snapshot(ser)
+            with instr.span("serial_read"):
+                snapshot = read_battery_snapshot(ser)
+            if serial_lost(ser, snapshot):
+                print(f"⚡ Seri port kayboldu: {snapshot['err']}")
+                reconnect.lost()
+                try: ser.close()
+                except Exception: pass
+                ser = None
+                continue  # hemen yeniden açmayı dene
+            if snapshot["ok"]:
+                reconnect_ms = reconnect.recovered()
+                if reconnect_ms is not None:
+                    print(f"🔌 BMS yeniden bağlandı: ilk geçerli okuma {reconnect_ms:.0f} ms")
             payload = json.dumps(snapshot, ensure_ascii=False).encode("utf-8")
             try:
-                udp_sock.sendto(payload, (target_ip, target_port))
+                with instr.span("udp_send"):
+                    udp_sock.sendto(payload, (target_ip, target_port))
             except Exception as e:
                 now = time.time()
                 if now - last_err_log_t > 5.0:
                     print(f"⚠️ UDP send hatası: {e}")
                     last_err_log_t = now
-            stop_evt.wait(READ_PERIOD_S)
+            stop_evt.wait(config.current.read_period_s)
     finally:
+        devices.close()
         try: udp_sock.close()
         except Exception: pass
         if ser is not None:
@@ -195,31 +255,44 @@ def udp_stream_loop(stop_evt: threading.Event, target_ip: str, target_port: int)
             except Exception: pass
         print("🛑 UDP yayın durdu.")
 
+def parse_udp_port(raw: bytes, default: int = DEFAULT_UDP_TARGET_PORT) -> int:
+    """İstemcinin ilk mesajındaki "UDPPORT:<port>" bilgisini çözer."""
+    if raw:
+        try:
+            text = raw.decode("utf-8", errors="ignore").strip()
+            if text.startswith("UDPPORT:"):
+                p = int(text.split(":", 1)[1].strip())
+                if 1 <= p <= 65535:
+                    print(f"🔧 İstemciden UDP port alındı: {p}")
+                    return p
+        except Exception:
+            pass
+    return default
+
 def start_server():
     srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     srv.bind((TCP_CONTROL_HOST, TCP_CONTROL_PORT))
     srv.listen(1)
+    srv.settimeout(1.0)  # accept() uyanır ki supervisor heartbeat alsın
     print(f"🚀 Battery UDP node kontrol TCP sunucusu: {TCP_CONTROL_HOST}:{TCP_CONTROL_PORT}")
+    config = ConfigWatcher("battery")
     while True:
         print("📡 Flutter bağlantısı bekleniyor...")
-        client_sock, addr = srv.accept()
+        while True:
+            liveness.beat()
+            config.poll()
+            try:
+                client_sock, addr = srv.accept()
+                break
+            except socket.timeout:
+                continue
         client_ip, _ = addr
         print(f"✅ Flutter TCP bağlandı: {addr}")
-        target_udp_port = DEFAULT_UDP_TARGET_PORT
+        target_udp_port = config.current.udp_port
         client_sock.settimeout(1.0)
         try:
-            raw = client_sock.recv(64)
-            if raw:
-                try:
-                    text = raw.decode("utf-8", errors="ignore").strip()
-                    if text.startswith("UDPPORT:"):
-                        p = int(text.split(":", 1)[1].strip())
-                        if 1 <= p <= 65535:
-                            target_udp_port = p
-                            print(f"🔧 İstemciden UDP port alındı: {target_udp_port}")
-                except Exception:
-                    pass
+            target_udp_port = parse_udp_port(client_sock.recv(64), config.current.udp_port)
         except socket.timeout:
             pass
         except Exception as e:
@@ -232,6 +305,7 @@ def start_server():
                 hb = client_sock.recv(1)
                 if not hb:
                     break
+                liveness.beat()
         except Exception:
             pass
         print("⚡ Flutter TCP bağlantısı koptu, UDP yayını durduruluyor…")
@@ -241,6 +315,7 @@ def start_server():
         except Exception: pass
 
 def main():
+    instr.install("battery_streamer")
     try:
         start_server()
     except KeyboardInterrupt:
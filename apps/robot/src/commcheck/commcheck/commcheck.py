@@ -2,39 +2,49 @@
 
 import rclpy
 from rclpy.node import Node
-import socket
+from std_msgs.msg import String
+import asyncio
 import json
 import threading
-import time
+
+from commcheck.heartbeat import HeartbeatService
+from robot_common import liveness
+
 
 class TCPHeartbeatServer(Node):
-    def __init__(self):
+    def __init__(self, port=5002):
         super().__init__('tcp_heartbeat_server')
         self.host = '0.0.0.0'
-        self.port = 5001
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.sock.bind((self.host, self.port))
-        self.sock.listen(1)
-        self.get_logger().info(f"📡 TCP Heartbeat dinleniyor: {self.host}:{self.port}")
-
-        # Bağlantı kabulü ayrı thread'de
-        threading.Thread(target=self.accept_loop, daemon=True).start()
-
-    def accept_loop(self):
-        while True:
-            conn, addr = self.sock.accept()
-            self.get_logger().info(f"✅ Flutter bağlandı: {addr}")
-            threading.Thread(target=self.handle_client, args=(conn,), daemon=True).start()
-
-    def handle_client(self, conn):
-        try:
-            while True:
-                time.sleep(0.2)  # 200ms'de bir ACK gönder
-                ack = json.dumps({"ack": True}).encode()
-                conn.sendall(ack)
-        except Exception as e:
-            self.get_logger().warn(f"❌ Flutter bağlantısı kesildi: {e}")
-            conn.close()
+        self.port = port  # 5001 battery_streamer kontrol portu ile çakışıyordu
+
+        # Bağlantı kalitesi diğer düğümler için yayınlanır (ör. plc_comm güvenli mod).
+        self.link_pub = self.create_publisher(String, 'link_quality', 10)
+        self.service = HeartbeatService(
+            self.host, self.port,
+            on_state=self.publish_link_state,
+            log=self.get_logger().info,
+        )
+        # Tüm istemciler tek bir asyncio döngüsünde, ayrı bir thread'de
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.run_loop, daemon=True).start()
+        self.timer = self.create_timer(1.0, self.publish_periodic)
+
+    def run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.service.serve_forever())
+
+    def publish_link_state(self, state, snapshot):
+        if state == 'lost':
+            self.get_logger().warn(f"❌ Heartbeat bağlantı kalitesi: {state}")
+        else:
+            self.get_logger().info(f"📶 Heartbeat bağlantı kalitesi: {state}")
+        self.link_pub.publish(String(data=json.dumps(snapshot)))
+
+    def publish_periodic(self):
+        liveness.beat()
+        # Durum değişmese de RTT/jitter/kayıp istatistikleri saniyede bir yayınlanır.
+        self.link_pub.publish(String(data=json.dumps(self.service.snapshot())))
+
 
 def main(args=None):
     rclpy.init(args=args)
@@ -42,3 +52,7 @@ def main(args=None):
     rclpy.spin(node)
     node.destroy_node()
     rclpy.shutdown()
+
+
+if __name__ == '__main__':
+    main()
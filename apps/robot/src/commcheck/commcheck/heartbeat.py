@@ -0,0 +1,270 @@
+"""Asyncio based TCP heartbeat service with link-quality measurement.
+
+The service replaces the thread-per-client heartbeat of the original node.  All
+clients are served from a single event loop.  Every ``period_s`` seconds the
+server writes one newline terminated probe to each client::
+
+    {"ack":true,"seq":17,"t":123456}
+
+``seq`` is a per-client sequence number and ``t`` the server's monotonic clock
+in milliseconds.  Clients answer by echoing the probe back (any JSON line that
+contains ``seq`` and ``t``).  From the echoes the service derives round-trip
+time, RFC 3550 style jitter and the loss ratio over a sliding window.  Clients
+that never echo (older apps) still receive the probes and are reported with
+the ``legacy`` state.
+
+Every client's own state is part of the snapshot (``clients[i]["state"]``)
+handed to an ``on_state`` callback whenever the aggregated link state
+(``ok``, ``degraded``, ``lost`` or ``idle``: the worst client) or any client's
+state changes.  Consumers gate on the client that matters to them (the
+control node on the tablet holding the lease, see
+:func:`plc_comm.session.holder_link_lost`) so that a quiet second tablet
+does not stop the one driving; the aggregate is for display.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+# Constant part of every probe, encoded once.
+ACK_PREFIX = b'{"ack":true,"seq":'
+_ACK_SUFFIX = b'%d,"t":%d}\n'
+
+STATE_IDLE = "idle"
+STATE_OK = "ok"
+STATE_DEGRADED = "degraded"
+STATE_LOST = "lost"
+STATE_LEGACY = "legacy"
+
+# Ordering used to aggregate per-client states into a single link state.
+_SEVERITY = {STATE_IDLE: 0, STATE_LEGACY: 1, STATE_OK: 2, STATE_DEGRADED: 3, STATE_LOST: 4}
+
+
+def _now_ms() -> int:
+    return int(time.monotonic() * 1000)
+
+
+def encode_probe(seq: int, t_ms: int) -> bytes:
+    """Return the wire representation of probe ``seq`` sent at ``t_ms``."""
+    return ACK_PREFIX + _ACK_SUFFIX % (seq, t_ms)
+
+
+class LinkStats:
+    """Round-trip, jitter and loss bookkeeping for a single client."""
+
+    __slots__ = (
+        "peer", "sent", "received", "lost", "rtt_ms", "jitter_ms",
+        "last_echo_ms", "_outstanding", "_window", "_prev_rtt", "last_state",
+    )
+
+    def __init__(self, peer: str, window: int = 50) -> None:
+        self.peer = peer
+        self.sent = 0
+        self.received = 0
+        self.lost = 0
+        self.rtt_ms: Optional[float] = None
+        self.jitter_ms = 0.0
+        self.last_echo_ms: Optional[int] = None
+        self._outstanding: Dict[int, int] = {}
+        self._window: Deque[bool] = deque(maxlen=window)
+        self._prev_rtt: Optional[float] = None
+        self.last_state = STATE_LEGACY
+
+    def on_probe(self, seq: int, t_ms: int) -> None:
+        self.sent += 1
+        self._outstanding[seq] = t_ms
+
+    def on_echo(self, seq: int, now_ms: int) -> Optional[float]:
+        """Register the echo of probe ``seq``; return the RTT or ``None``."""
+        sent_ms = self._outstanding.pop(seq, None)
+        if sent_ms is None:  # Duplicate, late after expiry or forged.
+            return None
+        rtt = float(now_ms - sent_ms)
+        if self._prev_rtt is not None:
+            self.jitter_ms += (abs(rtt - self._prev_rtt) - self.jitter_ms) / 16.0
+        self._prev_rtt = rtt
+        self.rtt_ms = rtt if self.rtt_ms is None else self.rtt_ms + (rtt - self.rtt_ms) / 8.0
+        self.received += 1
+        self.last_echo_ms = now_ms
+        self._window.append(True)
+        return rtt
+
+    def expire(self, now_ms: int, timeout_ms: int) -> None:
+        """Count probes without an echo for longer than ``timeout_ms`` as lost."""
+        if not self._outstanding:
+            return
+        stale = [s for s, t in self._outstanding.items() if now_ms - t > timeout_ms]
+        for seq in stale:
+            del self._outstanding[seq]
+            self.lost += 1
+            self._window.append(False)
+
+    @property
+    def loss_ratio(self) -> float:
+        if not self._window:
+            return 0.0
+        return self._window.count(False) / len(self._window)
+
+    def state(self, now_ms: int, lost_after_ms: int, degraded_rtt_ms: float,
+              degraded_loss: float) -> str:
+        if self.last_echo_ms is None:
+            return STATE_LEGACY
+        if now_ms - self.last_echo_ms > lost_after_ms:
+            return STATE_LOST
+        if (self.rtt_ms or 0.0) > degraded_rtt_ms or self.loss_ratio > degraded_loss:
+            return STATE_DEGRADED
+        return STATE_OK
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "peer": self.peer,
+            "state": self.last_state,
+            "rtt_ms": None if self.rtt_ms is None else round(self.rtt_ms, 1),
+            "jitter_ms": round(self.jitter_ms, 1),
+            "loss": round(self.loss_ratio, 3),
+            "sent": self.sent,
+            "received": self.received,
+            "lost": self.lost,
+        }
+
+
+class HeartbeatService:
+    """Serve heartbeat probes to any number of TCP clients on one event loop.
+
+    Parameters
+    ----------
+    host, port:
+        Listening address.
+    period_s:
+        Interval between probes sent to each client.
+    lost_after_s:
+        A client that has not echoed for this long is considered ``lost``.
+    degraded_rtt_ms, degraded_loss:
+        Thresholds above which an alive client is reported as ``degraded``.
+    on_state:
+        Called as ``on_state(state, snapshot)`` from the event loop whenever
+        the aggregated link state or the state of any client changes.
+    """
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 5002,
+        *,
+        period_s: float = 0.2,
+        lost_after_s: float = 0.6,
+        degraded_rtt_ms: float = 150.0,
+        degraded_loss: float = 0.2,
+        on_state: Optional[Callable[[str, Dict[str, object]], None]] = None,
+        log: Callable[[str], None] = print,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.period_s = period_s
+        self.lost_after_ms = int(lost_after_s * 1000)
+        self.degraded_rtt_ms = degraded_rtt_ms
+        self.degraded_loss = degraded_loss
+        self.on_state = on_state
+        self.log = log
+        self.clients: Dict[Tuple[str, int], LinkStats] = {}
+        self._writers: Dict[Tuple[str, int], asyncio.StreamWriter] = {}
+        self.state = STATE_IDLE
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._monitor_task: Optional[asyncio.Future] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        sock = self._server.sockets[0]
+        self.port = sock.getsockname()[1]
+        self._monitor_task = asyncio.ensure_future(self._monitor())
+        self.log(f"📡 TCP Heartbeat dinleniyor: {self.host}:{self.port}")
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            self._monitor_task = None
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers.values()):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def snapshot(self) -> Dict[str, object]:
+        clients = [s.as_dict() for s in list(self.clients.values())]
+        return {"state": self.state, "clients": clients}
+
+    def _update_state(self) -> None:
+        now = _now_ms()
+        state = STATE_IDLE
+        changed = False
+        for stats in self.clients.values():
+            stats.expire(now, self.lost_after_ms)
+            s = stats.state(now, self.lost_after_ms, self.degraded_rtt_ms, self.degraded_loss)
+            changed |= s != stats.last_state
+            stats.last_state = s
+            if _SEVERITY[s] > _SEVERITY[state]:
+                state = s
+        if state != self.state or changed:
+            self.state = state
+            if self.on_state is not None:
+                self.on_state(state, self.snapshot())
+
+    async def _monitor(self) -> None:
+        # One pass over all clients per period keeps the per-probe path O(1).
+        while True:
+            await asyncio.sleep(self.period_s)
+            self._update_state()
+
+    async def _handle_client(self, reader: asyncio.StreamReader,
+                             writer: asyncio.StreamWriter) -> None:
+        addr = writer.get_extra_info("peername")[:2]
+        stats = LinkStats(f"{addr[0]}:{addr[1]}")
+        self.clients[addr] = stats
+        self._writers[addr] = writer
+        self.log(f"✅ Heartbeat istemcisi bağlandı: {addr}")
+        echo_task = asyncio.ensure_future(self._read_echoes(reader, stats))
+        seq = 0
+        try:
+            while not echo_task.done():
+                seq += 1
+                t = _now_ms()
+                stats.on_probe(seq, t)
+                writer.write(encode_probe(seq, t))
+                await writer.drain()
+                await asyncio.sleep(self.period_s)
+        except (ConnectionError, OSError) as e:
+            self.log(f"❌ Heartbeat bağlantısı kesildi: {addr} ({e})")
+        finally:
+            echo_task.cancel()
+            del self.clients[addr]
+            del self._writers[addr]
+            writer.close()
+            self._update_state()
+
+    async def _read_echoes(self, reader: asyncio.StreamReader, stats: LinkStats) -> None:
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                continue  # Over-long line without newline; buffer was discarded.
+            except (ConnectionError, OSError):
+                return
+            if not line:
+                return
+            try:
+                msg = json.loads(line)
+                seq = int(msg["seq"])
+            except (ValueError, KeyError, TypeError):
+                continue  # Legacy single-byte pings and garbage are ignored.
+            stats.on_echo(seq, _now_ms())
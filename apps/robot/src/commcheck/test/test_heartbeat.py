@@ -0,0 +1,78 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from commcheck.heartbeat import HeartbeatService, LinkStats, encode_probe  # noqa: E402
+
+
+def test_encode_probe_is_valid_json():
+    msg = json.loads(encode_probe(7, 1234))
+    assert msg == {"ack": True, "seq": 7, "t": 1234}
+
+
+def test_link_stats_rtt_and_loss():
+    stats = LinkStats("peer")
+    stats.on_probe(1, 0)
+    stats.on_probe(2, 100)
+    assert stats.on_echo(1, 20) == 20.0
+    assert stats.on_echo(1, 30) is None  # duplicate echo
+    stats.expire(1000, timeout_ms=500)
+    assert stats.lost == 1
+    assert stats.loss_ratio == 0.5
+
+
+def test_service_tracks_echoing_client():
+    states = []
+
+    async def scenario():
+        service = HeartbeatService("127.0.0.1", 0, period_s=0.02, lost_after_s=0.1,
+                                   on_state=lambda s, _: states.append(s), log=lambda _: None)
+        await service.start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", service.port)
+        for _ in range(5):
+            writer.write(await reader.readline())
+            await writer.drain()
+        await asyncio.sleep(0.05)
+        assert service.state == "ok"
+        snapshot = service.snapshot()["clients"][0]
+        assert snapshot["received"] >= 4
+        # Stop echoing: the link must be reported lost.
+        await asyncio.sleep(0.3)
+        assert service.state == "lost"
+        writer.close()
+        await service.close()
+
+    asyncio.run(scenario())
+    assert "ok" in states and "lost" in states
+
+
+def test_per_client_states_with_one_healthy_and_one_lost_client():
+    snapshots = []
+
+    async def echo(reader, writer, count):
+        for _ in range(count):
+            writer.write(await reader.readline())
+            await writer.drain()
+
+    async def scenario():
+        service = HeartbeatService("127.0.0.1", 0, period_s=0.02, lost_after_s=0.1,
+                                   on_state=lambda s, snap: snapshots.append(snap),
+                                   log=lambda _: None)
+        await service.start()
+        healthy = await asyncio.open_connection("127.0.0.1", service.port)
+        quiet = await asyncio.open_connection("127.0.0.1", service.port)
+        await echo(*quiet, 3)                   # echoes a little, then goes silent
+        await echo(*healthy, 20)                # keeps echoing meanwhile (~0.4 s)
+        peer = "127.0.0.1:%d" % healthy[1].get_extra_info("sockname")[1]
+        states = {c["peer"]: c["state"] for c in service.snapshot()["clients"]}
+        assert states.pop(peer) == "ok" and list(states.values()) == ["lost"]
+        for _, writer in (healthy, quiet):
+            writer.close()
+        await service.close()
+
+    asyncio.run(scenario())
+    # The consumer heard about the quiet client while the aggregate was already set.
+    assert any(sorted(c["state"] for c in snap["clients"]) == ["lost", "ok"]
+               for snap in snapshots)
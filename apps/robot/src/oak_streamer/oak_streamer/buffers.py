@@ -0,0 +1,53 @@
+"""Preallocated buffers for the per-frame hot loop.
+
+At 30 fps every temporary array or packet ``bytes`` object is 30 allocations
+per second of up to a megabyte each, which shows up as allocator time and
+page faults on the Jetson.  :class:`FramePool` hands out buffers by name and
+keeps them as long as the requested shape stays the same, so the steady-state
+loop only allocates what OpenCV itself returns (``getCvFrame``, ``imencode``).
+
+A pool is owned by one stream and used from one thread at a time; a buffer
+stays valid until the same name is requested again.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+from robot_common import lazy
+
+np = lazy.LazyModule("numpy")
+
+
+class FramePool:
+    """Named, reusable numpy arrays and packet buffers."""
+
+    def __init__(self) -> None:
+        self._arrays: Dict[str, object] = {}
+        self._bytes: Dict[str, bytearray] = {}
+        self.allocations = 0
+
+    def array(self, name: str, shape: Tuple[int, ...], dtype="uint8"):
+        """Return the array ``name``; reallocated only when shape or dtype change."""
+
+        buf = self._arrays.get(name)
+        if buf is None or buf.shape != tuple(shape) or buf.dtype != np.dtype(dtype):
+            buf = np.empty(shape, dtype=dtype)
+            self._arrays[name] = buf
+            self.allocations += 1
+        return buf
+
+    def packet(self, size: int, name: str = "packet") -> bytearray:
+        """Return a ``bytearray`` of at least ``size`` bytes.
+
+        Buffers are never resized in place (a live ``memoryview`` of the
+        previous packet would make that fail); a larger one replaces them,
+        with headroom so a growing JPEG doesn't reallocate every frame.
+        """
+
+        buf = self._bytes.get(name)
+        if buf is None or len(buf) < size:
+            buf = bytearray(size + size // 4)
+            self._bytes[name] = buf
+            self.allocations += 1
+        return buf
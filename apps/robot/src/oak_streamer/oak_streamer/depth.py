@@ -0,0 +1,103 @@
+"""Stereo depth for metric stop distances.
+
+The OAK computes depth on the device from both mono cameras; the depth map is
+aligned to the LEFT camera so a box found on the ``mono`` stream indexes the
+same pixels in the depth frame (``uint16`` millimetres, ``0`` = invalid).
+
+:func:`box_distance_m` reduces a box to one distance: the median of the valid
+depth pixels in the central part of the box (the edges of a person box are
+mostly background), sampled on a coarse grid.  With at most
+``MAX_SAMPLES``×``MAX_SAMPLES`` strided samples the median costs a few tens of
+microseconds regardless of box size.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+from robot_common import lazy
+
+np = lazy.LazyModule("numpy")
+
+MAX_SAMPLES = 32            # grid samples per axis
+MIN_VALID = 8               # fewer valid samples than this -> no estimate
+MAX_RANGE_MM = 15000        # beyond the useful range of the OAK-D baseline
+
+
+def add_stereo_depth(pipeline, dai, left, fps: int = 30, right=None):
+    """Add a StereoDepth node aligned to ``left`` (and the right mono camera).
+
+    ``right`` is an existing right MonoCamera, when it also feeds a stream of
+    its own; it must run at the resolution and rate of ``left``.  The depth
+    map is sent to the host on the ``depth`` stream.
+    """
+
+    if right is None:
+        right = pipeline.create(dai.node.MonoCamera)
+        right.setBoardSocket(dai.CameraBoardSocket.RIGHT)
+        right.setResolution(dai.MonoCameraProperties.SensorResolution.THE_720_P)
+        right.setFps(fps)
+
+    stereo = pipeline.create(dai.node.StereoDepth)
+    stereo.setDefaultProfilePreset(dai.node.StereoDepth.PresetMode.HIGH_DENSITY)
+    stereo.setLeftRightCheck(True)   # drops occluded pixels instead of guessing
+    stereo.setDepthAlign(dai.CameraBoardSocket.LEFT)
+    left.out.link(stereo.left)
+    right.out.link(stereo.right)
+
+    xout_depth = pipeline.create(dai.node.XLinkOut)
+    xout_depth.setStreamName("depth")
+    stereo.depth.link(xout_depth.input)
+    return stereo
+
+
+class DepthReader:
+    """Most recent depth frame from the ``depth`` XLink queue.
+
+    Depth and mono frames are produced at the same rate but read from separate
+    queues; the latest depth frame is reused until a newer one arrives.
+    """
+
+    def __init__(self, queue) -> None:
+        self.queue = queue
+        self._frame = None
+
+    def latest(self):
+        msg = self.queue.tryGet()
+        if msg is not None:
+            self._frame = msg.getFrame()
+        return self._frame
+
+
+def box_distance_m(
+    depth,
+    box: Tuple[int, int, int, int],
+    frame_shape: Optional[Tuple[int, ...]] = None,
+    inset: float = 0.25,
+) -> Optional[float]:
+    """Return the distance to the object in ``box`` in metres, or ``None``.
+
+    ``box`` is ``(x, y, w, h)`` in pixels of a frame of ``frame_shape``
+    (defaults to the depth frame's own shape) and is rescaled when the depth
+    map has a different resolution.  ``inset`` trims that fraction of the box
+    from each side before sampling.
+    """
+
+    dh, dw = depth.shape[:2]
+    fh, fw = (frame_shape or depth.shape)[:2]
+    x, y, w, h = box
+    sx, sy = dw / fw, dh / fh
+    x0 = max(0, int((x + w * inset) * sx))
+    x1 = min(dw, int((x + w * (1 - inset)) * sx))
+    y0 = max(0, int((y + h * inset) * sy))
+    y1 = min(dh, int((y + h * (1 - inset)) * sy))
+    if x1 <= x0 or y1 <= y0:
+        return None
+
+    step_x = max(1, (x1 - x0) // MAX_SAMPLES)
+    step_y = max(1, (y1 - y0) // MAX_SAMPLES)
+    samples = depth[y0:y1:step_y, x0:x1:step_x]
+    valid = samples[(samples > 0) & (samples < MAX_RANGE_MM)]
+    if valid.size < MIN_VALID:
+        return None
+    return float(np.median(valid)) / 1000.0
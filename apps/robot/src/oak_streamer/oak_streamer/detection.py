@@ -0,0 +1,173 @@
+"""Person detection backends for the OAK streamer.
+
+Two interchangeable backends share the ``detect(frame, sensitivity)`` call that
+returns ``(x, y, w, h)`` pixel boxes, the interface of :func:`detect_humans`:
+
+``hog``
+    OpenCV's HOG people detector on the host.  Slow and fairly inaccurate on
+    the mono 720p stream, but needs nothing on the device.
+``nn``
+    A MobileNet-SSD or YOLO detection network running on the OAK itself.  The
+    host only reads the small ``ImgDetections`` message from the ``nn`` XLink
+    queue and scales the normalised boxes, so host CPU cost is negligible.
+
+The device backend only depends on a queue object with ``tryGet()`` returning
+messages with a ``detections`` list (``xmin/ymin/xmax/ymax`` normalised,
+``label``, ``confidence``), so it can be driven by a stub in tests.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import List, Optional, Tuple
+
+from robot_common import lazy
+
+cv2 = lazy.LazyModule("cv2")
+
+Box = Tuple[int, int, int, int]
+
+# Person class id of the supported networks.
+PERSON_LABELS = {"mobilenet": 15, "yolo": 0}  # VOC / COCO
+NN_INPUT_SIZES = {"mobilenet": (300, 300), "yolo": (416, 416)}
+
+
+def _build_hog():
+    hog = cv2.HOGDescriptor()
+    hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+    return hog
+
+
+# HOG descriptor for person detection, built on first use.
+hog_descriptor = lazy.Lazy(_build_hog)
+
+
+def detect_humans(frame, sensitivity: float = 0.5) -> List[Box]:
+    """Return bounding boxes of detected humans in ``frame``.
+
+    Parameters
+    ----------
+    frame:
+        Input image as a ``numpy.ndarray``.  Both grayscale and BGR images are
+        supported; grayscale frames are fed to HOG as they are (no BGR copy).
+    sensitivity:
+        Value between ``0`` and ``1`` controlling the aggressiveness of the
+        detector.  Higher values result in more detections but also more false
+        positives.  The value is mapped to the ``scale`` parameter of the HOG
+        detector.
+
+    Returns
+    -------
+    list of (x, y, w, h)
+        Bounding boxes for detected persons.
+    """
+
+    scale = max(1.05, 2 - float(sensitivity))
+    rects, _ = hog_descriptor.get().detectMultiScale(
+        frame, winStride=(8, 8), padding=(16, 16), scale=scale
+    )
+    return [(int(x), int(y), int(w), int(h)) for (x, y, w, h) in rects]
+
+
+class HogDetector:
+    """Host-side HOG backend."""
+
+    name = "hog"
+
+    def detect(self, frame, sensitivity: float = 0.5) -> List[Box]:
+        return detect_humans(frame, sensitivity)
+
+
+class DeviceDetector:
+    """Backend reading on-device network results from an XLink queue.
+
+    Detections arrive on their own queue, slightly decoupled from the frames;
+    the most recent result is reused until a newer one arrives.  Sensitivity
+    maps to the confidence threshold: ``0`` keeps only confident boxes
+    (``>= 0.8``), ``1`` keeps everything above ``0.2``.
+    """
+
+    name = "nn"
+
+    def __init__(self, queue, person_label: int = PERSON_LABELS["mobilenet"]) -> None:
+        self.queue = queue
+        self.person_label = person_label
+        self._detections: list = []
+
+    def poll(self) -> None:
+        msg = self.queue.tryGet()
+        if msg is not None:
+            self._detections = msg.detections
+
+    def detect(self, frame, sensitivity: float = 0.5) -> List[Box]:
+        self.poll()
+        height, width = frame.shape[:2]
+        threshold = 0.8 - 0.6 * min(max(float(sensitivity), 0.0), 1.0)
+        scored = []
+        for d in self._detections:
+            if d.label != self.person_label or d.confidence < threshold:
+                continue
+            x0 = int(max(0.0, d.xmin) * width)
+            y0 = int(max(0.0, d.ymin) * height)
+            x1 = int(min(1.0, d.xmax) * width)
+            y1 = int(min(1.0, d.ymax) * height)
+            if x1 > x0 and y1 > y0:
+                scored.append((d.confidence, (x0, y0, x1 - x0, y1 - y0)))
+        # Most confident first: callers follow ``boxes[0]``.
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [box for _, box in scored]
+
+
+def add_detection_network(pipeline, dai, source, kind: str, blob_path: str):
+    """Add an on-device person detection network fed by ``source`` (mono out).
+
+    The mono frame is stretched to the network input by an ``ImageManip`` node
+    (so normalised coordinates map linearly back to the full frame) and the
+    results are sent to the host on the ``nn`` stream.
+    """
+
+    if kind not in PERSON_LABELS:
+        raise ValueError(f"unknown network kind {kind!r}")
+    width, height = NN_INPUT_SIZES[kind]
+
+    manip = pipeline.create(dai.node.ImageManip)
+    manip.initialConfig.setResize(width, height)
+    manip.initialConfig.setKeepAspectRatio(False)
+    manip.initialConfig.setFrameType(dai.ImgFrame.Type.BGR888p)
+    source.link(manip.inputImage)
+
+    if kind == "mobilenet":
+        nn = pipeline.create(dai.node.MobileNetDetectionNetwork)
+    else:
+        nn = pipeline.create(dai.node.YoloDetectionNetwork)
+        nn.setNumClasses(80)
+        nn.setCoordinateSize(4)
+        nn.setIouThreshold(0.5)
+    nn.setBlobPath(blob_path)
+    nn.setConfidenceThreshold(0.2)  # host applies the sensitivity-based threshold
+    nn.input.setBlocking(False)
+    nn.input.setQueueSize(1)
+    manip.out.link(nn.input)
+
+    xout_nn = pipeline.create(dai.node.XLinkOut)
+    xout_nn.setStreamName("nn")
+    nn.out.link(xout_nn.input)
+    return nn
+
+
+def make_detector(kind: str, device=None, network: str = "mobilenet"):
+    """Return the host side of the backend ``kind`` for an open ``device``."""
+
+    if kind == "nn" and device is not None:
+        queue = device.getOutputQueue(name="nn", maxSize=1, blocking=False)
+        return DeviceDetector(queue, PERSON_LABELS[network])
+    return HogDetector()
+
+
+def resolve_backend(kind: str, blob_path: Optional[str]) -> str:
+    """Fall back to HOG when the device network cannot be built."""
+
+    if kind == "nn" and not (blob_path and os.path.isfile(blob_path)):
+        print(f"⚠️ NN blob bulunamadı ({blob_path!r}, OAK_NN_BLOB), HOG dedektörüne dönülüyor")
+        return "hog"
+    return kind
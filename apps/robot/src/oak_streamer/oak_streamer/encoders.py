@@ -0,0 +1,188 @@
+"""JPEG encoder backends for the camera stream.
+
+``opencv``
+    ``cv2.imencode``.  Always available; single-channel frames are encoded as
+    grayscale JPEGs.
+``turbojpeg``
+    libjpeg-turbo through PyTurboJPEG (optional).  Mono frames take the
+    grayscale fast path (``TJPF_GRAY``/``TJSAMP_GRAY``: no colour conversion
+    and no chroma planes) and the fast integer DCT is used.
+``passthrough``
+    Frames encoded on the OAK by its MJPEG ``VideoEncoder``; the host only
+    forwards the bytes.  It changes the device pipeline, so it is never picked
+    automatically.  The JPEGs arrive on their own queue; :class:`FramePairer`
+    matches them to the raw frames by sequence number, so the header and
+    boxes always describe the JPEG they are sent with.
+
+All backends return a byte buffer (``bytes`` or a 1-D ``uint8`` array) or
+``None`` on failure.  :func:`get_encoder` resolves a name from
+``OAK_ENCODER``; ``auto`` times every available host backend on a synthetic
+720p mono frame at start-up and keeps the fastest.
+"""
+
+from __future__ import annotations
+
+import functools
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from robot_common import lazy
+
+cv2 = lazy.LazyModule("cv2")
+np = lazy.LazyModule("numpy")
+turbojpeg = lazy.LazyModule("turbojpeg") if lazy.module_available("turbojpeg") else None
+
+BENCH_SHAPE = (720, 1280)
+BENCH_QUALITY = 20
+
+
+class OpenCVEncoder:
+    name = "opencv"
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def params(quality: int) -> List[int]:
+        """``cv2.imencode`` parameters for ``quality``; shared, do not modify."""
+        return [int(cv2.IMWRITE_JPEG_QUALITY), int(quality)]
+
+    def encode(self, frame, quality: int):
+        ok, buf = cv2.imencode(".jpg", frame, self.params(quality))
+        return buf.reshape(-1) if ok else None
+
+
+class TurboJpegEncoder:
+    name = "turbojpeg"
+
+    def __init__(self) -> None:
+        self._tj = turbojpeg.TurboJPEG()
+
+    def encode(self, frame, quality: int):
+        if frame.ndim == 2:
+            frame = frame[:, :, None]  # a view; PyTurboJPEG wants H x W x C
+            return self._tj.encode(frame, quality=quality,
+                                   pixel_format=turbojpeg.TJPF_GRAY,
+                                   jpeg_subsample=turbojpeg.TJSAMP_GRAY,
+                                   flags=turbojpeg.TJFLAG_FASTDCT)
+        return self._tj.encode(frame, quality=quality,
+                               jpeg_subsample=turbojpeg.TJSAMP_420,
+                               flags=turbojpeg.TJFLAG_FASTDCT)
+
+
+class PassthroughEncoder:
+    """Forward a frame that is already a JPEG (``ImgFrame.getData()`` of MJPEG)."""
+
+    name = "passthrough"
+
+    def encode(self, frame, quality: int):
+        return frame if getattr(frame, "ndim", 1) == 1 else None
+
+
+class FramePairer:
+    """Pair raw frames with the device JPEG of the same frame (``passthrough``).
+
+    ``raw`` and ``encoded`` are the non-blocking, size-1 DepthAI queues of
+    the mono frames and of the ``VideoEncoder`` fed by the same camera
+    output, so their ``getSequenceNum()`` match.  Either queue may drop a
+    frame; the side that is behind is read again, up to ``max_skew`` reads,
+    and a frame that finds no partner is dropped rather than sent with
+    another frame's JPEG.
+    """
+
+    def __init__(self, raw, encoded, max_skew: int = 4) -> None:
+        self.raw = raw
+        self.encoded = encoded
+        self.max_skew = max_skew
+        # Metrics
+        self.paired = 0
+        self.resyncs = 0
+        self.dropped = 0
+
+    def get(self) -> Optional[Tuple[Any, Any]]:
+        """``(raw frame, JPEG bytes)`` of one frame, ``None`` if none matched."""
+
+        frame, jpeg = self.raw.get(), self.encoded.get()
+        for attempt in range(self.max_skew + 1):
+            raw_seq, jpeg_seq = frame.getSequenceNum(), jpeg.getSequenceNum()
+            if raw_seq == jpeg_seq:
+                self.paired += 1
+                return frame, jpeg.getData()
+            if attempt == self.max_skew:
+                break
+            self.resyncs += 1
+            if raw_seq < jpeg_seq:
+                frame = self.raw.get()
+            else:
+                jpeg = self.encoded.get()   # the encoder lags the raw output
+        self.dropped += 1
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return {"paired": self.paired, "resyncs": self.resyncs, "dropped": self.dropped}
+
+
+BACKENDS: Dict[str, Callable[[], object]] = {
+    "opencv": OpenCVEncoder,
+    "turbojpeg": TurboJpegEncoder,
+    "passthrough": PassthroughEncoder,
+}
+
+
+def available(name: str) -> bool:
+    if name == "turbojpeg":
+        if turbojpeg is None:
+            return False
+        try:  # the module imports without the shared library being present
+            turbojpeg.TurboJPEG()
+        except (OSError, RuntimeError):
+            return False
+    return name in BACKENDS
+
+
+def benchmark(
+    encoders: Sequence, frame, quality: int, rounds: int = 5,
+    clock: Callable[[], float] = time.perf_counter,
+) -> Dict[str, float]:
+    """Median encode time in milliseconds of each encoder on ``frame``."""
+
+    result = {}
+    for enc in encoders:
+        enc.encode(frame, quality)  # first call may load libraries / tables
+        samples = []
+        for _ in range(rounds):
+            t0 = clock()
+            enc.encode(frame, quality)
+            samples.append((clock() - t0) * 1000)
+        result[enc.name] = statistics.median(samples)
+    return result
+
+
+def _bench_frame():
+    # Gradient plus noise: roughly the entropy of a real scene.
+    rng = np.random.default_rng(0)
+    ramp = np.linspace(0, 255, BENCH_SHAPE[1], dtype=np.float32)[None, :]
+    noise = rng.normal(0, 12, BENCH_SHAPE).astype(np.float32)
+    return np.clip(ramp + noise, 0, 255).astype(np.uint8)
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoder(name: str = "auto"):
+    """Return the encoder ``name`` (or the fastest host one for ``auto``).
+
+    An unknown or unavailable forced backend falls back to ``auto`` with a
+    warning.  Results are cached, so the self-benchmark runs once per process.
+    """
+
+    if name != "auto":
+        if available(name):
+            return BACKENDS[name]()
+        print(f"⚠️ JPEG kodlayıcı '{name}' kullanılamıyor, otomatik seçime dönülüyor")
+
+    candidates = [BACKENDS[n]() for n in ("opencv", "turbojpeg") if available(n)]
+    if len(candidates) == 1:
+        return candidates[0]
+    timings = benchmark(candidates, _bench_frame(), BENCH_QUALITY)
+    best = min(candidates, key=lambda enc: timings[enc.name])
+    summary = ", ".join(f"{n}={ms:.2f} ms" for n, ms in timings.items())
+    print(f"🏁 JPEG kodlayıcı: {best.name} ({summary})")
+    return best
@@ -7,7 +7,9 @@ this benchmark we extend the node with a very small scale human tracking
 feature implemented with OpenCV's HOG person detector.  The tracker can be
 enabled/disabled via simple text commands sent over the same TCP connection and
 allows tuning of the detection sensitivity and the distance at which the robot
-should stop following a person.  When the person is lost the node prints the
+should stop following a person.  With several people in view each one keeps
+a track id (see ``tracker.py``) and ``LOCK=<id>`` makes the node follow that
+person only.  When the person is lost the node prints the
 last seen direction which could be used by a higher level controller to rotate
 the robot back towards that direction.
 
@@ -18,68 +20,594 @@ infrastructure.  It is **not** a production ready tracker.
 
 from __future__ import annotations
 
+import functools
+import os
 import socket
-import struct
-from typing import List, Tuple
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from robot_common import instrumentation as instr
+from robot_common import devwatch, lazy, liveness
+from robot_common.config import ConfigWatcher, resolve
+
+from oak_streamer import protocol as proto
+from oak_streamer import publishing
+from oak_streamer import streams as stream_cfg
+from oak_streamer.buffers import FramePool
+from oak_streamer.encoders import FramePairer, get_encoder
+from oak_streamer.depth import DepthReader, add_stereo_depth, box_distance_m
+from oak_streamer.motion import GatedDetector, MotionGate
+from oak_streamer.recorder import Recorder
+from oak_streamer.tracker import MultiTracker
+from oak_streamer.udp_transport import UdpFrameSender
+from oak_streamer.detection import (
+    add_detection_network,
+    detect_humans,
+    hog_descriptor,
+    make_detector,
+    resolve_backend,
+)
+
+# cv2 and DepthAI are imported on first use (or by the warm-up thread started
+# in ``start_server``) so that importing this module stays cheap.
+cv2 = lazy.LazyModule("cv2")
+
+# DepthAI is optional for tests; ``dai`` is ``None`` when it is not installed.
+dai = lazy.LazyModule("depthai") if lazy.module_available("depthai") else None
+
+
+def warm_up(tracking: bool = True, encoder: Optional[str] = None):
+    """Load cv2, DepthAI and (if ``tracking``) the HOG detector in the background.
+
+    With ``encoder`` the JPEG backend is resolved too, so its start-up
+    self-benchmark is done before the first client connects.
+    """
 
-import cv2
+    items = [cv2]
+    if dai is not None:
+        items.append(dai)
+    if tracking:
+        items.append(hog_descriptor)
+    if encoder is not None:
+        items.append(lazy.Lazy(functools.partial(get_encoder, encoder)))
+    return lazy.warm_up(*items, name="oak-warm-up")
+
+
+def create_pipeline(detector: str = "hog", blob_path: Optional[str] = None,
+                    network: str = "mobilenet", depth: bool = True,
+                    mjpeg_quality: Optional[int] = None,
+                    streams: Iterable[stream_cfg.StreamConfig] = ()):
+    """Build the device pipeline.
+
+    ``detector="nn"`` adds the on-device network, ``depth`` a StereoDepth
+    node aligned to the mono stream for metric stop distances and
+    ``mjpeg_quality`` an on-device MJPEG encoder (``mjpeg`` stream) for the
+    ``passthrough`` JPEG backend.  ``streams`` are the configured camera
+    streams (see streams.py): ``left`` sets the mono camera, the others get an
+    output named after them.
+    """
 
-try:  # DepthAI is optional for tests – import lazily.
-    import depthai as dai
-except Exception:  # pragma: no cover - depthai may not be installed during tests
-    dai = None  # type: ignore
+    if dai is None:  # pragma: no cover - handled at runtime
+        raise RuntimeError("DepthAI is required to create the pipeline")
 
+    pipeline = dai.Pipeline()
+    configs = {cfg.name: cfg for cfg in streams}
+    left = configs.pop(stream_cfg.PRIMARY, stream_cfg.DEFAULTS[stream_cfg.PRIMARY])
 
-# Pre-initialised HOG descriptor for person detection.
-_hog = cv2.HOGDescriptor()
-_hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+    # Geniş açılı mono kamera (genelde LEFT)
+    cam_mono = stream_cfg.add_mono(pipeline, dai, left)
+    xout_mono = pipeline.create(dai.node.XLinkOut)
+    xout_mono.setStreamName("mono")
+    cam_mono.out.link(xout_mono.input)
 
+    if detector == "nn":
+        add_detection_network(pipeline, dai, cam_mono.out, network, blob_path)
+    cam_right = None
+    if depth:
+        right = configs.get("right")
+        if right is not None:
+            # The right camera feeds StereoDepth too and has to match the left one.
+            if (right.resolution, right.fps) != (left.resolution, left.fps):
+                print(f"⚠️ Derinlik açık: right akışı "
+                      f"{left.resolution}/{left.fps} fps çalışacak")
+            cam_right = stream_cfg.add_mono(
+                pipeline, dai, right._replace(resolution=left.resolution, fps=left.fps))
+        add_stereo_depth(pipeline, dai, cam_mono, left.fps, cam_right)
+    for cfg in configs.values():
+        stream_cfg.add_stream_output(pipeline, dai, cfg,
+                                     cam_right if cfg.name == "right" else None)
+    if mjpeg_quality is not None:
+        encoder = pipeline.create(dai.node.VideoEncoder)
+        encoder.setDefaultProfilePreset(30, dai.VideoEncoderProperties.Profile.MJPEG)
+        encoder.setQuality(mjpeg_quality)
+        cam_mono.out.link(encoder.input)
+        xout_mjpeg = pipeline.create(dai.node.XLinkOut)
+        xout_mjpeg.setStreamName("mjpeg")
+        encoder.bitstream.link(xout_mjpeg.input)
 
-def detect_humans(frame, sensitivity: float = 0.5) -> List[Tuple[int, int, int, int]]:
-    """Return bounding boxes of detected humans in ``frame``.
+    return pipeline
 
-    Parameters
-    ----------
-    frame:
-        Input image as a ``numpy.ndarray``.  Both grayscale and BGR images are
-        supported.
-    sensitivity:
-        Value between ``0`` and ``1`` controlling the aggressiveness of the
-        detector.  Higher values result in more detections but also more false
-        positives.  The value is mapped to the ``scale`` parameter of the HOG
-        detector.
 
-    Returns
-    -------
-    list of (x, y, w, h)
-        Bounding boxes for detected persons.
+def _env(name: str, default: Optional[str] = None) -> Optional[str]:
+    return os.environ.get(name) or default
+
+
+@dataclass
+class StreamSettings:
+    """Per-connection tracking options and state adjustable over the TCP link."""
+
+    stop_distance: float = 2.0  # metres, measured with stereo depth
+    sensitivity: float = 0.5
+    tracking: bool = True
+    jpeg_quality: int = 20
+    last_direction: Optional[str] = None
+    last_distance: Optional[float] = None
+    # Track ids across frames and the target, ``LOCK=<id>`` pins it (see tracker.py).
+    tracker: MultiTracker = field(default_factory=MultiTracker, repr=False)
+    # Frame format negotiated with ``PROTO=``; see protocol.py.
+    protocol: int = proto.LEGACY
+    seq: int = 0
+    # Control bytes received after the last newline (see ``feed_commands``).
+    command_buffer: bytearray = field(default_factory=bytearray, repr=False)
+    # Reused packet/frame buffers of this stream (see buffers.py).
+    buffers: FramePool = field(default_factory=FramePool, repr=False)
+    # Camera streams built into the pipeline (``OAK_STREAMS``) and the ones the
+    # client subscribed to with ``SUB=``; see streams.py.
+    streams: Dict[str, stream_cfg.StreamConfig] = field(
+        default_factory=lambda: stream_cfg.parse_streams(_env("OAK_STREAMS")))
+    subscriptions: Tuple[str, ...] = (stream_cfg.PRIMARY,)
+    stream_seq: Dict[str, int] = field(default_factory=dict, repr=False)
+    # Frames go over UDP to this port of the client after ``UDP=<port>``
+    # (see udp_transport.py); datagram size and parity group from the env.
+    udp_port: Optional[int] = None
+    udp_datagram: int = field(default_factory=lambda: int(_env("OAK_UDP_DATAGRAM", "1200")))
+    udp_parity: int = field(default_factory=lambda: int(_env("OAK_UDP_PARITY", "4")))
+    # Consumers of every encoded frame besides the TCP client: the recorder
+    # (``OAK_RECORD_DIR``), ROS publishing, the in-process bus (publishing.py).
+    sinks: List[Any] = field(default_factory=list, repr=False)
+    depth: bool = field(default_factory=lambda: _env("OAK_DEPTH", "1") != "0")
+    # Skip host detection on static scenes (see motion.py).
+    motion_gate: bool = field(default_factory=lambda: _env("OAK_MOTION_GATE", "1") != "0")
+    # JPEG backend: auto|opencv|turbojpeg|passthrough (see encoders.py).
+    encoder: str = field(default_factory=lambda: _env("OAK_ENCODER", "auto"))
+    # Detection backend: "hog" on the host or "nn" on the OAK (see detection.py).
+    detector: str = field(default_factory=lambda: _env("OAK_DETECTOR", "hog"))
+    nn_blob: Optional[str] = field(default_factory=lambda: _env("OAK_NN_BLOB"))
+    nn_network: str = field(default_factory=lambda: _env("OAK_NN_NETWORK", "mobilenet"))
+
+    def __post_init__(self) -> None:
+        left = self.streams[stream_cfg.PRIMARY]
+        if left.quality != stream_cfg.DEFAULTS[stream_cfg.PRIMARY].quality:
+            self.jpeg_quality = left.quality  # set in OAK_STREAMS
+
+
+def apply_command(cmd: str, settings: StreamSettings) -> None:
+    """Apply text control commands (``TRACK_ON``, ``SENS=0.7`` ...) to ``settings``.
+
+    Several whitespace separated commands may arrive in one read.
     """
 
-    if frame.ndim == 2:  # Convert grayscale to colour for the detector.
-        frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+    for word in cmd.split():
+        _apply_one(word, settings)
 
-    scale = max(1.05, 2 - float(sensitivity))
-    rects, _ = _hog.detectMultiScale(frame, winStride=(8, 8), padding=(16, 16), scale=scale)
-    return [(int(x), int(y), int(w), int(h)) for (x, y, w, h) in rects]
 
-def create_pipeline():
-    if dai is None:  # pragma: no cover - handled at runtime
-        raise RuntimeError("DepthAI is required to create the pipeline")
+# A longer unterminated line is garbage, not a command: it is discarded.
+MAX_COMMAND_LINE = 256
 
-    pipeline = dai.Pipeline()
 
-    # Geniş açılı mono kamera (genelde LEFT)
-    cam_mono = pipeline.create(dai.node.MonoCamera)
-    xout_mono = pipeline.create(dai.node.XLinkOut)
+def feed_commands(data: bytes, settings: StreamSettings) -> None:
+    """Apply the complete ``\\n``-terminated command lines in ``data``.
 
-    cam_mono.setBoardSocket(dai.CameraBoardSocket.LEFT)  # Geniş açılı mono için LEFT
-    cam_mono.setResolution(dai.MonoCameraProperties.SensorResolution.THE_720_P)
-    cam_mono.setFps(30)
+    TCP has no message boundaries: a read may end inside a command
+    (``UDP=50`` of ``UDP=5010``).  The unterminated tail is kept in
+    ``settings.command_buffer`` until the rest arrives.
+    """
 
-    xout_mono.setStreamName("mono")
-    cam_mono.out.link(xout_mono.input)
+    buf = settings.command_buffer
+    buf += data
+    end = buf.rfind(b"\n")
+    if end >= 0:
+        lines = bytes(buf[:end])
+        del buf[:end + 1]
+        apply_command(lines.decode(errors="ignore"), settings)
+    if len(buf) > MAX_COMMAND_LINE:
+        buf.clear()
+
+
+def reset_connection(settings: StreamSettings) -> None:
+    """Forget per-connection state; every client starts on the legacy format."""
+
+    settings.last_direction = None
+    settings.last_distance = None
+    settings.tracker.reset()
+    settings.protocol = proto.LEGACY
+    settings.seq = 0
+    settings.command_buffer.clear()
+    settings.subscriptions = (stream_cfg.PRIMARY,)
+    settings.stream_seq.clear()
+    settings.udp_port = None
+
+
+def _apply_one(cmd: str, settings: StreamSettings) -> None:
+    try:
+        if cmd == "TRACK_ON":
+            settings.tracking = True
+            if not hog_descriptor.loaded:
+                lazy.warm_up(hog_descriptor)
+        elif cmd == "TRACK_OFF":
+            settings.tracking = False
+            settings.tracker.reset()
+        elif cmd == "UNLOCK":
+            settings.tracker.unlock()
+        elif cmd.startswith("LOCK="):
+            track_id = int(cmd.split("=", 1)[1])
+            if track_id == 0:
+                settings.tracker.unlock()   # LOCK=0: back to automatic selection
+            elif not settings.tracker.lock(track_id):
+                print(f"⚠️ Kilitlenecek kişi bulunamadı (id {track_id})")
+        elif cmd.startswith("SENS="):
+            settings.sensitivity = float(cmd.split("=", 1)[1])
+        elif cmd.startswith("DIST="):
+            settings.stop_distance = float(cmd.split("=", 1)[1])
+        elif cmd.startswith("PROTO="):
+            version = int(cmd.split("=", 1)[1])
+            if version in proto.SUPPORTED:
+                settings.protocol = version
+        elif cmd.startswith("UDP="):
+            port = int(cmd.split("=", 1)[1])
+            settings.udp_port = port if 0 < port < 65536 else None  # UDP=0: back to TCP
+        elif cmd.startswith("SUB="):
+            # Legacy packets carry no stream id, so only version 2 may mix streams.
+            names = stream_cfg.parse_subscription(cmd.split("=", 1)[1], settings.streams)
+            if names is not None and settings.protocol == proto.VERSION:
+                settings.subscriptions = names
+    except ValueError:
+        pass  # Ignore malformed commands
+
+
+class OakDevice(NamedTuple):
+    """An open OAK and the host side of its output streams."""
+
+    device: Any
+    mono: Any
+    detector: Any
+    depth: Optional[DepthReader]
+    mjpeg: Optional[FramePairer] = None  # passthrough: mono frames paired with device JPEGs
+    extra: Tuple[Tuple[stream_cfg.StreamConfig, Any], ...] = ()  # right/rgb queues
+
+
+def open_device(settings: StreamSettings) -> OakDevice:
+    """Open the OAK with the configured detector backend and depth stream."""
+
+    backend = resolve_backend(settings.detector, settings.nn_blob)
+    passthrough = settings.encoder == "passthrough"
+    device = dai.Device(create_pipeline(
+        backend, settings.nn_blob, settings.nn_network, settings.depth,
+        settings.jpeg_quality if passthrough else None, settings.streams.values(),
+    ))
+    mono = device.getOutputQueue(name="mono", maxSize=1, blocking=False)
+    depth = None
+    if settings.depth:
+        depth = DepthReader(device.getOutputQueue(name="depth", maxSize=1, blocking=False))
+    detector = make_detector(backend, device, settings.nn_network)
+    if settings.motion_gate and detector.name == "hog":
+        # The device network costs the host nothing; only HOG is worth gating.
+        detector = GatedDetector(detector, MotionGate(pool=settings.buffers))
+        instr.gauge("motion_gate", detector.gate.stats)
+    mjpeg = None
+    if passthrough:
+        mjpeg = FramePairer(mono, device.getOutputQueue(name="mjpeg", maxSize=1, blocking=False))
+        instr.gauge("passthrough_pairing", mjpeg.stats)
+    extra = tuple(
+        (cfg, device.getOutputQueue(name=cfg.name, maxSize=1, blocking=False))
+        for name, cfg in settings.streams.items() if name != stream_cfg.PRIMARY
+    )
+    return OakDevice(device, mono, detector, depth, mjpeg, extra)
+
+
+def read_frame(oak: OakDevice) -> Optional[Tuple[Any, Any]]:
+    """The next mono frame and, with ``passthrough``, its device JPEG (else ``None``).
+
+    ``None`` is returned instead when the passthrough JPEG of the frame was
+    dropped: the frame is skipped rather than sent with another frame's JPEG.
+    """
+
+    if oak.mjpeg is None:
+        return oak.mono.get(), None
+    return oak.mjpeg.get()
+
+
+# USB vendor id of the OAK (Movidius/Intel), booted or not.
+OAK_VENDOR_ID = "03e7"
+# Without a hotplug event a lost OAK is looked for this often.
+REOPEN_RETRY_S = 5.0
+
+
+def is_oak_event(event: devwatch.DeviceEvent) -> bool:
+    if event.action != "add":
+        return False
+    vendor = event.props.get("ID_VENDOR_ID") or event.props.get("PRODUCT", "").split("/")[0]
+    return vendor.lower().zfill(4) == OAK_VENDOR_ID
+
+
+class DeviceMonitor:
+    """Reopen a lost OAK as soon as it is back on the bus, and time the reconnect.
+
+    After a failure (:meth:`lost`) :meth:`ready` returns ``True`` once the OAK
+    is attached again: on its hotplug event, or when DepthAI lists it.
+    :meth:`frame` is called for every frame and reports the time from the
+    device reappearing to the first frame.
+    """
+
+    def __init__(self, gauge: str = "reconnect_oak") -> None:
+        self.events = devwatch.shared().subscribe(("usb",))
+        self.reconnect = devwatch.ReconnectTimer()
+        self.scanned_at = -float("inf")
+        instr.gauge(gauge, self.reconnect.stats)
+
+    def lost(self, opening: bool = False) -> None:
+        """The OAK failed; ``opening``: while being opened, so wait for a new sign of it."""
+
+        if not self.reconnect.down:
+            self.scanned_at = -float("inf")   # it may not even be gone: look at once
+        elif opening:
+            self.reconnect.appeared_at = None
+            self.scanned_at = time.monotonic()
+        self.reconnect.lost()
+
+    def ready(self, timeout_s: float) -> bool:
+        """``True`` when opening the OAK is worth a try; waits at most ``timeout_s``."""
+
+        if not self.reconnect.down or self.reconnect.appeared_at is not None:
+            return True
+        now = time.monotonic()
+        if now - self.scanned_at >= (REOPEN_RETRY_S if self.events.live else 1.0):
+            self.scanned_at = now
+            if dai.Device.getAllAvailableDevices():
+                self.reconnect.appeared()
+                return True
+        event = self.events.wait(timeout_s, match=is_oak_event)
+        if event is None:
+            return False
+        self.reconnect.appeared(event.t)
+        return True
+
+    def opened(self) -> None:
+        # Booting the OAK re-enumerates it on the bus; those events are ours.
+        self.events.clear()
+
+    def frame(self) -> None:
+        if self.reconnect.down:
+            ms = self.reconnect.recovered()
+            print(f"📷 OAK yeniden bağlandı: ilk kare {ms:.0f} ms")
+
+
+# robot_common.config "camera" keys → StreamSettings fields.
+CONFIG_FIELDS = {
+    "jpeg_quality": "jpeg_quality",
+    "stop_distance_m": "stop_distance",
+    "sensitivity": "sensitivity",
+}
+
+
+def watch_config(settings: StreamSettings) -> ConfigWatcher:
+    """Keep the tunables of ``settings`` in step with the shared config file.
+
+    Values set in the file replace the start-up ones right away and on every
+    change; call ``poll()`` of the returned watcher between two frames.  A
+    new JPEG quality takes effect on the next frame, except for the device
+    encoder of the ``passthrough`` backend, which picks it up when the
+    device is next opened.  Clients' ``SENS=``/``DIST=`` commands still
+    apply until the file changes the same value again.
+    """
+
+    def apply(old, new):
+        for key in new.changed(old):
+            setattr(settings, CONFIG_FIELDS[key], new[key])
+
+    watcher = ConfigWatcher("camera", apply)
+    apply(resolve("camera", {}), watcher.current)  # only what the file sets
+    instr.gauge("config_camera", watcher.stats)
+    return watcher
+
+
+def start_recorder(settings: StreamSettings) -> None:
+    """Attach the recorder configured by ``OAK_RECORD_*`` (if any) to ``settings``."""
+
+    recorder = Recorder.from_env()
+    if recorder is not None:
+        print(f"⏺️ Kayıt: {recorder.directory}")
+        instr.gauge("recorder", recorder.stats)
+        settings.sinks.append(recorder)
+
+
+def process_frame(
+    frame, settings: StreamSettings, detector=None, depth=None,
+    capture_ts: Optional[float] = None, encoded=None,
+) -> Optional[memoryview]:
+    """Run tracking on ``frame`` and return the length-prefixed frame packet.
+
+    ``detector`` is a backend from :mod:`oak_streamer.detection`; the host HOG
+    detector is used when it is omitted.  ``depth`` is the depth map aligned to
+    ``frame`` (millimetres); without it no stop distance is measured.
+    ``capture_ts`` is the device timestamp of the frame on the
+    ``time.monotonic()`` clock and ``encoded`` the device-encoded JPEG of the
+    same frame when the ``passthrough`` backend is used.  The packet format follows
+    ``settings.protocol``: legacy clients get the boxes drawn into the JPEG,
+    version 2 clients get them in the header.  ``None`` is returned when
+    encoding fails, or when it was skipped because neither the client (see
+    ``settings.subscriptions``) nor a sink wants the JPEG.  This is the CPU
+    heavy part of the stream and is safe to run in a worker thread.
+
+    Every frame is also handed to ``settings.sinks`` (recorder, ROS, ...)
+    with the version 2 metadata, whatever the client negotiated.  Sinks with
+    a false ``needs_jpeg`` get ``None`` instead of the JPEG when nobody else
+    needs it.
+
+    The returned ``memoryview`` points into ``settings.buffers`` and is only
+    valid until the next call for the same stream: send it before that.
+    """
+
+    if capture_ts is None:
+        capture_ts = time.monotonic()
+    boxes: List[Tuple[int, ...]] = []
+    track_state = proto.TRACK_OFF
+    if settings.tracking:
+        with instr.span("detect"):
+            if detector is None:
+                detections = detect_humans(frame, settings.sensitivity)
+            else:
+                detections = detector.detect(frame, settings.sensitivity)
+        with instr.span("track"):
+            settings.tracker.update(detections)
+            target = settings.tracker.target()
+            boxes = settings.tracker.wire_boxes(target)
+        track_state = proto.TRACK_SEARCHING
+        if target is not None:
+            track_state = proto.TRACK_LOCKED
+            x, y, w, h = target.box
+            if settings.protocol == proto.LEGACY:
+                cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+            centre = x + w / 2
+            settings.last_direction = "left" if centre < frame.shape[1] / 2 else "right"
+            if depth is not None and not target.misses:   # not on a box carried over
+                with instr.span("depth"):
+                    settings.last_distance = box_distance_m(depth, target.box, frame.shape)
+            if settings.last_distance is not None and (
+                settings.last_distance < settings.stop_distance
+            ):
+                print(f"⛔️ Stop mesafesi aşıldı ({settings.last_distance:.2f} m)")
+        elif settings.last_direction:
+            track_state = proto.TRACK_LOST
+            print(f"🔍 Kişi kayboldu, {settings.last_direction} yönüne dönülüyor")
+            settings.last_direction = None
+            settings.last_distance = None
+
+    send = stream_cfg.PRIMARY in settings.subscriptions
+    if send or any(getattr(sink, "needs_jpeg", True) for sink in settings.sinks):
+        with instr.span("encode"):
+            # Backends return a buffer without copying; it is copied once, into the packet.
+            data = get_encoder(settings.encoder).encode(
+                frame if encoded is None else encoded, settings.jpeg_quality
+            )
+        if data is None:
+            return None
+    elif settings.sinks:
+        data = None
+    else:
+        return None
+
+    settings.seq += 1
+    legacy = settings.protocol == proto.LEGACY
+    if legacy and not settings.sinks:
+        return proto.pack_legacy(data, settings.buffers.packet)
+
+    height, width = frame.shape[:2]
+    flags = proto.FLAG_TRACKING if settings.tracking else 0
+    if legacy and track_state == proto.TRACK_LOCKED and encoded is None:
+        flags |= proto.FLAG_OVERLAY
+    meta = dict(
+        seq=settings.seq,
+        capture_us=proto.monotonic_to_epoch_us(capture_ts),
+        encode_us=proto.monotonic_to_epoch_us(time.monotonic()),
+        width=width,
+        height=height,
+        boxes=boxes,
+        distance_m=settings.last_distance if track_state == proto.TRACK_LOCKED else None,
+        track_state=track_state,
+        flags=flags,
+    )
+    for sink in settings.sinks:
+        sink.submit(data, **meta)
+    if not send:
+        return None
+    if legacy:
+        return proto.pack_legacy(data, settings.buffers.packet)
+    return proto.pack_frame(data, alloc=settings.buffers.packet, **meta)
+
+
+def process_stream_frame(
+    cfg: stream_cfg.StreamConfig, in_frame, settings: StreamSettings,
+) -> Optional[memoryview]:
+    """Encode a frame of the extra stream ``cfg`` into a version 2 packet.
+
+    The packet carries the stream id and no tracking data; it lives in its
+    own buffer of ``settings.buffers``, so it can be sent along with the
+    packet of :func:`process_frame`.
+    """
+
+    frame = in_frame.getCvFrame()
+    # The device MJPEG encoder only runs on the left stream.
+    encoder = "auto" if settings.encoder == "passthrough" else settings.encoder
+    with instr.span(f"encode_{cfg.name}"):
+        data = get_encoder(encoder).encode(frame, cfg.quality)
+    if data is None:
+        return None
+    seq = settings.stream_seq[cfg.name] = settings.stream_seq.get(cfg.name, 0) + 1
+    height, width = frame.shape[:2]
+    return proto.pack_frame(
+        data,
+        seq=seq,
+        capture_us=proto.monotonic_to_epoch_us(in_frame.getTimestamp().total_seconds()),
+        encode_us=proto.monotonic_to_epoch_us(time.monotonic()),
+        width=width,
+        height=height,
+        stream=stream_cfg.STREAM_IDS[cfg.name],
+        alloc=functools.partial(settings.buffers.packet, name=f"packet_{cfg.name}"),
+    )
+
+
+def stream_packets(oak: OakDevice, settings: StreamSettings) -> List[memoryview]:
+    """Packets of the subscribed extra streams that have a new frame.
+
+    Streams nobody subscribed to are neither read nor encoded; the device
+    queues keep only their newest frame.
+    """
+
+    packets = []
+    for cfg, queue in oak.extra:
+        if cfg.name not in settings.subscriptions:
+            continue
+        in_frame = queue.tryGet()
+        if in_frame is not None:
+            packet = process_stream_frame(cfg, in_frame, settings)
+            if packet is not None:
+                packets.append(packet)
+    return packets
+
+
+def udp_sender(settings: StreamSettings, peer_ip: str,
+               sender: Optional[UdpFrameSender]) -> Optional[UdpFrameSender]:
+    """The UDP sender the connection should use now, ``None`` for TCP.
+
+    ``sender`` is the current one; it is kept while the client's port stays
+    the same and closed when the client switches port or back to TCP.
+    """
+
+    addr = (peer_ip, settings.udp_port) if settings.udp_port else None
+    if sender is not None and sender.addr == addr:
+        return sender
+    if sender is not None:
+        sender.close()
+    if addr is None:
+        return None
+    print(f"📦 Kamera UDP ile gönderiliyor: {addr[0]}:{addr[1]}")
+    sender = UdpFrameSender(addr, settings.udp_datagram, settings.udp_parity)
+    instr.gauge("udp_sender", sender.stats)
+    return sender
+
+
+def _accept(server_socket: socket.socket, timeout_s: float) -> Optional[socket.socket]:
+    server_socket.settimeout(timeout_s)
+    try:
+        client_socket, addr = server_socket.accept()
+    except (socket.timeout, BlockingIOError):
+        return None
+    client_socket.settimeout(0.001)  # Non-blocking reads for control commands
+    print(f"✅ Flutter bağlantısı geldi: {addr}")
+    return client_socket
 
-    return pipeline
 
 def start_server(
     host: str = "0.0.0.0",
@@ -88,14 +616,34 @@ def start_server(
     stop_distance: float = 2.0,
     sensitivity: float = 0.5,
     tracking: bool = True,
+    settings: Optional[StreamSettings] = None,
 ) -> None:
     """Start the TCP server used to stream frames to the Flutter app.
 
     Parameters allow runtime adjustment of the simple human tracking behaviour.
-    ``stop_distance`` roughly corresponds to the desired distance (in arbitrary
-    units) at which the robot should stop when approaching a person.  The
-    ``sensitivity`` parameter tunes the HOG detector and ``tracking`` enables or
-    disables person detection entirely.
+    ``stop_distance`` is the distance in metres, measured with the OAK's stereo
+    depth (disable with ``OAK_DEPTH=0``), at which the robot should stop when
+    approaching a person.  The
+    ``sensitivity`` parameter tunes the detector and ``tracking`` enables or
+    disables person detection entirely.  The detector backend is chosen with
+    ``OAK_DETECTOR=hog|nn``; ``nn`` runs ``OAK_NN_BLOB`` (a MobileNet-SSD, or YOLO
+    with ``OAK_NN_NETWORK=yolo``) on the camera and falls back to HOG without it.
+    ``OAK_ENCODER`` forces a JPEG backend; by default the fastest one found by
+    a start-up self-benchmark is used.
+
+    ``settings`` replaces the three tracking arguments, for callers that set up
+    ``settings.sinks`` beforehand.  Without sinks (and no recorder) the camera
+    only runs while a client is connected; with sinks it runs continuously
+    and the TCP client is served on the side.
+
+    ``OAK_STREAMS`` adds the right mono and RGB streams (see streams.py); a
+    version 2 client picks what it receives with ``SUB=``.  Extra streams are
+    sent after the left frame they arrived with, so they run at most at the
+    left camera's rate.  ``UDP=<port>`` moves the frames to UDP datagrams
+    (see udp_transport.py); the TCP connection then only carries commands.
+
+    When the OAK fails or drops off the USB bus the client stays connected;
+    :class:`DeviceMonitor` reopens the device as soon as it is back.
     """
 
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -105,76 +653,128 @@ def start_server(
 
     print(f"🚀 TCP server başlatıldı: {host}:{port}")
 
+    if settings is None:
+        settings = StreamSettings(
+            stop_distance=stop_distance, sensitivity=sensitivity, tracking=tracking
+        )
+    warm_up(settings.tracking, settings.encoder)
+    start_recorder(settings)
+    config = watch_config(settings)
+    devices = DeviceMonitor()
+
+    oak = None
+    client_socket = None
+    sender = None
+    settings.subscriptions = ()  # nothing to encode for until a client connects
+
+    def drop_client() -> None:
+        nonlocal client_socket, sender, oak
+        print("⚡ Bağlantı koptu, yeni bağlantı bekleniyor...")
+        client_socket.close()
+        client_socket = None
+        if sender is not None:
+            sender.close()
+            sender = None
+        settings.subscriptions = ()
+        if oak is not None and not settings.sinks:  # nobody else needs the camera
+            oak.device.close()
+            oak = None
+
+    print("📡 Bağlantı bekleniyor...")
     while True:
-        print("📡 Bağlantı bekleniyor...")
-        client_socket, addr = server_socket.accept()
-        client_socket.settimeout(0.001)  # Non-blocking reads for control commands
-        print(f"✅ Flutter bağlantısı geldi: {addr}")
+        liveness.beat()
+        config.poll()  # between two frames: a change never splits a frame
+        if client_socket is None:
+            # accept() wakes up every second so the supervisor gets its heartbeat;
+            # with sinks the frame loop must not wait for a client at all.
+            client_socket = _accept(server_socket, 0.0 if settings.sinks else 1.0)
+            if client_socket is not None:
+                reset_connection(settings)
+                peer_ip = client_socket.getpeername()[0]
+            elif not settings.sinks:
+                continue
 
         try:
-            if dai is None:
-                raise RuntimeError("DepthAI is not available")
-
-            with dai.Device(create_pipeline()) as device:
-                mono = device.getOutputQueue(name="mono", maxSize=1, blocking=False)
-
-                last_direction = None
-                while True:
-                    try:
-                        cmd = client_socket.recv(32).decode().strip()
-                        if cmd == "TRACK_ON":
-                            tracking = True
-                        elif cmd == "TRACK_OFF":
-                            tracking = False
-                        elif cmd.startswith("SENS="):
-                            sensitivity = float(cmd.split("=", 1)[1])
-                        elif cmd.startswith("DIST="):
-                            stop_distance = float(cmd.split("=", 1)[1])
-                    except socket.timeout:
-                        pass
-                    except ValueError:
-                        pass  # Ignore malformed commands
-
-                    in_mono = mono.get()
-                    frame = in_mono.getCvFrame()   # Mono frame (np.uint8, tek kanal)
-
-                    if tracking:
-                        boxes = detect_humans(frame, sensitivity)
-                        if boxes:
-                            x, y, w, h = boxes[0]
-                            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-                            centre = x + w / 2
-                            last_direction = "left" if centre < frame.shape[1] / 2 else "right"
-                            distance_est = 1.0 / max(h, 1)
-                            if distance_est < stop_distance:
-                                print("⛔️ Stop mesafesi aşıldı")
-                        elif last_direction:
-                            print(f"🔍 Kişi kayboldu, {last_direction} yönüne dönülüyor")
-                            last_direction = None
-
-                    encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 20]
-                    result, img_encoded = cv2.imencode(".jpg", frame, encode_param)
-
-                    if not result:
+            if client_socket is not None:
+                try:
+                    data = client_socket.recv(32)
+                    if not data:  # closed; with UDP no send would ever fail
+                        drop_client()
                         continue
-
-                    data = img_encoded.tobytes()
-                    length = struct.pack(">I", len(data))
-
-                    try:
-                        client_socket.sendall(length + data)
-                    except (socket.error, BrokenPipeError):
-                        print("⚡ Bağlantı koptu, yeni bağlantı bekleniyor...")
-                        break
+                    feed_commands(data, settings)
+                except socket.timeout:
+                    pass
+                except OSError:
+                    drop_client()
+                    continue
+
+            if oak is None:
+                if dai is None:
+                    raise RuntimeError("DepthAI is not available")
+                if not devices.ready(1.0):
+                    continue  # unplugged: the client stays connected meanwhile
+                oak = open_device(settings)
+                devices.opened()
+
+            with instr.span("frame_get"):
+                frames = read_frame(oak)
+                if frames is not None:
+                    in_mono, encoded = frames
+                    frame = in_mono.getCvFrame()   # Mono frame (np.uint8, tek kanal)
+                    depth = oak.depth.latest() if oak.depth is not None else None
+                    capture_ts = in_mono.getTimestamp().total_seconds()
+            devices.frame()
+            if frames is None:
+                continue
+
+            packet = process_frame(frame, settings, oak.detector, depth, capture_ts, encoded)
+            if client_socket is None:
+                continue
+            packets = stream_packets(oak, settings)
+            if packet is not None:
+                packets.insert(0, packet)
+
+            sender = udp_sender(settings, peer_ip, sender)
+            try:
+                with instr.span("send"):
+                    for packet in packets:
+                        if sender is not None:
+                            sender.send(packet)  # never blocks; drops the frame instead
+                        else:
+                            client_socket.sendall(packet)
+            except (socket.error, BrokenPipeError):
+                drop_client()
 
         except Exception as e:  # pragma: no cover - runtime errors are logged
+            # The client stays: the OAK is reopened as soon as it is back on the bus.
             print(f"🚨 Hata oluştu: {e}")
+            devices.lost(opening=oak is None)
+            if oak is not None:
+                try:
+                    oak.device.close()
+                except Exception:
+                    pass
+                oak = None
+            else:
+                time.sleep(1.0)  # opening failed with the device present
 
-        finally:
-            client_socket.close()
 
 def main():
-    start_server()
+    instr.install("oak_streamer")
+    settings = StreamSettings()
+    # Follow mode of plc_comm.  A sink keeps the camera running without a client,
+    # so it is only added when follow is wanted: OAK_TARGET, else PLC_FOLLOW.
+    if _env("OAK_TARGET", _env("PLC_FOLLOW", "0")) == "1":
+        settings.sinks.append(publishing.TargetPublisher(settings))
+    # ROS topics are opt-in for the same reason (OAK_ROS=1).
+    if publishing.rclpy is not None and _env("OAK_ROS", "0") == "1":
+        from rclpy.node import Node
+
+        # Publishing needs no executor: nothing here subscribes or has timers.
+        publishing.rclpy.init()
+        settings.sinks.append(publishing.RosPublisher(Node("oak_streamer"), settings))
+    start_server(settings=settings)
+
 
 if __name__ == "__main__":
     main()
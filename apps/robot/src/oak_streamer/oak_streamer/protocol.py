@@ -0,0 +1,177 @@
+"""Wire format of the camera TCP stream.
+
+Every packet is framed as ``>I`` length + body.  Two body formats exist:
+
+version 1 (legacy)
+    The bare JPEG.  Detections are drawn into the pixels by the server.
+version 2
+    A binary header followed by the JPEG; the server does not draw and the
+    client renders the boxes itself.  A client asks for it by sending
+    ``PROTO=2`` on the control channel; until then (and for clients that never
+    ask) the server sends version 1.  The two are told apart by the first two
+    body bytes: ``FF D8`` (JPEG SOI) or the ``OF`` magic.
+
+Version 2 header (big endian, ``header_len`` bytes before the JPEG)::
+
+    magic        2s  b"OF"
+    version      B   2
+    flags        B   bit 0: overlay drawn by the server, bit 1: tracking on
+    header_len   H   bytes up to the JPEG; clients skip fields they don't know
+    seq          I   frame counter of the connection
+    capture_us   q   device capture time, Unix epoch microseconds
+    encode_us    q   time the JPEG was ready, Unix epoch microseconds
+    width        H   frame size the boxes refer to
+    height       H
+    distance_m   f   stereo distance of the target box, NaN if unknown
+    track_state  B   TRACK_* below
+    n_boxes      B
+    n_boxes x (x H, y H, w H, h H, track_id H, score B)   target box first
+                     (only with track_state LOCKED); track_id stays the same
+                     for a person across frames, score is the track
+                     confidence in percent (see :mod:`oak_streamer.tracker`)
+    stream       B   only with flag bit 2: camera stream id (0 left, 1 right,
+                     2 rgb, see :mod:`oak_streamer.streams`)
+
+``capture_us`` comes from the device clock, which DepthAI synchronises to the
+host's monotonic clock, so ``encode_us - capture_us`` is the on-robot latency
+and ``receive time - capture_us`` the glass-to-glass latency as far as the
+phone and robot wall clocks agree.
+"""
+
+from __future__ import annotations
+
+import math
+import struct
+import time
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+LEGACY = 1
+VERSION = 2
+SUPPORTED = (LEGACY, VERSION)
+
+MAGIC = b"OF"
+HEADER = struct.Struct(">2sBBHIqqHHfBB")
+BOX = struct.Struct(">HHHHHB")
+LENGTH = struct.Struct(">I")
+MAX_BOXES = 255
+
+FLAG_OVERLAY = 0x01
+FLAG_TRACKING = 0x02
+FLAG_STREAM = 0x04
+STREAM = struct.Struct(">B")
+
+TRACK_OFF = 0
+TRACK_SEARCHING = 1
+TRACK_LOCKED = 2
+TRACK_LOST = 3
+
+# (x, y, w, h, track_id, score)
+WireBox = Tuple[int, int, int, int, int, int]
+
+
+class FrameHeader(NamedTuple):
+    version: int
+    flags: int
+    seq: int
+    capture_us: int
+    encode_us: int
+    width: int
+    height: int
+    distance_m: Optional[float]
+    track_state: int
+    boxes: List[WireBox]
+    stream: int = 0
+
+
+def monotonic_to_epoch_us(t_monotonic: float) -> int:
+    """Convert a ``time.monotonic()`` reading to Unix epoch microseconds."""
+
+    return int((time.time() - time.monotonic() + t_monotonic) * 1_000_000)
+
+
+def _u16(v) -> int:
+    return min(max(int(v), 0), 0xFFFF)
+
+
+Alloc = Callable[[int], bytearray]
+
+
+def pack_legacy(jpeg, alloc: Alloc = bytearray) -> memoryview:
+    """Return the length-prefixed bare JPEG (``jpeg`` is any byte buffer).
+
+    The packet is written into ``alloc(size)`` (for example
+    :meth:`oak_streamer.buffers.FramePool.packet`) so the JPEG is copied once.
+    """
+
+    n = len(jpeg)
+    buf = alloc(LENGTH.size + n)
+    LENGTH.pack_into(buf, 0, n)
+    buf[LENGTH.size:LENGTH.size + n] = jpeg
+    return memoryview(buf)[:LENGTH.size + n]
+
+
+def pack_frame(
+    jpeg,
+    *,
+    seq: int,
+    capture_us: int,
+    encode_us: int,
+    width: int,
+    height: int,
+    boxes: Sequence[Sequence[int]] = (),
+    distance_m: Optional[float] = None,
+    track_state: int = TRACK_OFF,
+    flags: int = 0,
+    stream: Optional[int] = None,
+    alloc: Alloc = bytearray,
+) -> memoryview:
+    """Return a length-prefixed version 2 packet, written like :func:`pack_legacy`.
+
+    ``boxes`` are ``(x, y, w, h)`` or ``(x, y, w, h, track_id, score)``.
+    ``stream`` adds the stream id field (and sets ``FLAG_STREAM``).
+    """
+
+    n_boxes = min(len(boxes), MAX_BOXES)
+    header_len = HEADER.size + BOX.size * n_boxes
+    if stream is not None:
+        flags |= FLAG_STREAM
+        header_len += STREAM.size
+    body_len = header_len + len(jpeg)
+    buf = alloc(LENGTH.size + body_len)
+    LENGTH.pack_into(buf, 0, body_len)
+    HEADER.pack_into(
+        buf, LENGTH.size,
+        MAGIC, VERSION, flags, header_len, seq & 0xFFFFFFFF, capture_us, encode_us,
+        _u16(width), _u16(height),
+        math.nan if distance_m is None else distance_m,
+        track_state, n_boxes,
+    )
+    offset = LENGTH.size + HEADER.size
+    for i in range(n_boxes):
+        box = boxes[i]
+        track_id, score = (box[4], box[5]) if len(box) >= 6 else (0, 0)
+        BOX.pack_into(buf, offset, _u16(box[0]), _u16(box[1]), _u16(box[2]), _u16(box[3]),
+                      _u16(track_id), min(max(int(score), 0), 255))
+        offset += BOX.size
+    if stream is not None:
+        STREAM.pack_into(buf, offset, stream)
+        offset += STREAM.size
+    buf[offset:offset + len(jpeg)] = jpeg
+    return memoryview(buf)[:LENGTH.size + body_len]
+
+
+def unpack_frame(body: bytes) -> Tuple[Optional[FrameHeader], bytes]:
+    """Split a packet body into ``(header, jpeg)``; ``header`` is ``None`` for v1."""
+
+    if body[:2] != MAGIC:
+        return None, body
+    (_, version, flags, header_len, seq, capture_us, encode_us, width, height,
+     distance, track_state, n_boxes) = HEADER.unpack_from(body)
+    boxes = [BOX.unpack_from(body, HEADER.size + i * BOX.size) for i in range(n_boxes)]
+    stream = 0
+    if flags & FLAG_STREAM:
+        stream = STREAM.unpack_from(body, HEADER.size + n_boxes * BOX.size)[0]
+    header = FrameHeader(version, flags, seq, capture_us, encode_us, width, height,
+                         None if math.isnan(distance) else distance, track_state, boxes,
+                         stream)
+    return header, body[header_len:]
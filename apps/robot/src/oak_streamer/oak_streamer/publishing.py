@@ -0,0 +1,184 @@
+"""Frame sinks that share the camera stream with the rest of the robot.
+
+A sink is any object with ``submit(jpeg, **meta)``; ``meta`` holds the
+:func:`oak_streamer.protocol.pack_frame` fields (seq, timestamps, boxes,
+distance, track state).  ``process_frame`` calls every sink in
+``StreamSettings.sinks`` once per frame, after encoding.  Besides the
+recorder there are three sinks here:
+
+:class:`FrameBus`
+    In-process fan-out for components living in the same interpreter (the
+    gateway hosts ``plc_comm`` next to the camera).  Subscribers are called
+    with the encoder's buffer and the metadata dict, no copy and no
+    serialisation.  This is the co-located fast path: rclpy exposes neither
+    intra-process communication nor loaned messages, so a ROS topic always
+    serialises.
+:class:`RosPublisher`
+    Publishes ``sensor_msgs/CompressedImage`` on ``camera/image/compressed``
+    (best effort, depth 1) and the tracking state as JSON on
+    ``tracking_state`` (``std_msgs/String``, like ``link_quality``)::
+
+        {"seq": 12, "capture_us": ..., "state": "locked", "direction": "left",
+         "distance_m": 1.8, "stop": true, "width": 1280, "height": 720,
+         "boxes": [[x, y, w, h], ...]}
+
+    The standalone camera node adds it only with ``OAK_ROS=1``: like every
+    sink it keeps the camera running without a TCP client.
+
+:class:`TargetPublisher`
+    Sends the followed person to ``plc_comm``'s follow mode over the local
+    datagram channel of :mod:`robot_common.target`.  The camera node adds it
+    with ``OAK_TARGET=1`` (default: the ``PLC_FOLLOW`` setting); follow
+    switched on from the app (``"follow": 1``) needs it too.
+"""
+
+from __future__ import annotations
+
+import array
+import json
+import threading
+import time
+from typing import Callable, List
+
+from robot_common import lazy
+from robot_common import target as target_channel
+
+from oak_streamer import protocol as proto
+
+rclpy = lazy.LazyModule("rclpy") if lazy.module_available("rclpy") else None
+
+TRACK_STATE_NAMES = {
+    proto.TRACK_OFF: "off",
+    proto.TRACK_SEARCHING: "searching",
+    proto.TRACK_LOCKED: "locked",
+    proto.TRACK_LOST: "lost",
+}
+
+
+def tracking_state(meta, settings) -> dict:
+    """The ``tracking_state`` message body for one frame."""
+
+    distance = meta.get("distance_m")
+    return {
+        "seq": meta["seq"],
+        "capture_us": meta["capture_us"],
+        "state": TRACK_STATE_NAMES.get(meta["track_state"], "off"),
+        "direction": settings.last_direction,
+        "distance_m": None if distance is None else round(distance, 3),
+        "stop": distance is not None and distance < settings.stop_distance,
+        "width": meta["width"],
+        "height": meta["height"],
+        "boxes": [list(b[:4]) for b in meta["boxes"]],
+    }
+
+
+class FrameBus:
+    """Synchronous in-process publish/subscribe of encoded frames.
+
+    Callbacks run on the stream thread and must be quick; the buffer is only
+    valid during the call (copy it to keep it).
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: List[Callable] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable) -> Callable[[], None]:
+        """Register ``callback(jpeg, meta)``; returns an unsubscribe function."""
+
+        with self._lock:
+            self._subscribers = self._subscribers + [callback]
+
+        def unsubscribe() -> None:
+            with self._lock:
+                self._subscribers = [c for c in self._subscribers if c is not callback]
+
+        return unsubscribe
+
+    @property
+    def needs_jpeg(self) -> bool:
+        return bool(self._subscribers)
+
+    def submit(self, jpeg, **meta) -> None:
+        if jpeg is None:  # nobody was subscribed when the frame was encoded
+            return
+        for callback in self._subscribers:  # copy-on-write list, no lock needed
+            try:
+                callback(jpeg, meta)
+            except Exception as e:  # a broken consumer must not stop the stream
+                print(f"⚠️ FrameBus abonesi hata verdi: {e}")
+
+
+# Shared by everything in this process; see robot_bringup.gateway.
+bus = FrameBus()
+
+
+class RosPublisher:
+    """Publish frames and tracking state on ``node``."""
+
+    def __init__(self, node, settings, frame_id: str = "oak_left") -> None:
+        from rclpy.qos import QoSProfile, ReliabilityPolicy
+        from sensor_msgs.msg import CompressedImage
+        from std_msgs.msg import String
+
+        self._image_type = CompressedImage
+        self._string_type = String
+        self.settings = settings
+        self.frame_id = frame_id
+        self.image_pub = node.create_publisher(
+            CompressedImage, "camera/image/compressed",
+            QoSProfile(depth=1, reliability=ReliabilityPolicy.BEST_EFFORT),
+        )
+        self.state_pub = node.create_publisher(String, "tracking_state", 10)
+
+    @property
+    def needs_jpeg(self) -> bool:
+        return self.image_pub.get_subscription_count() > 0
+
+    def submit(self, jpeg, **meta) -> None:
+        if jpeg is not None and self.image_pub.get_subscription_count():
+            msg = self._image_type()
+            stamp_us = meta["capture_us"]
+            msg.header.stamp.sec = stamp_us // 1_000_000
+            msg.header.stamp.nanosec = stamp_us % 1_000_000 * 1000
+            msg.header.frame_id = self.frame_id
+            msg.format = "jpeg"
+            data = array.array("B")
+            data.frombytes(jpeg)  # one memcpy; assigning bytes converts per element
+            msg.data = data
+            self.image_pub.publish(msg)
+        self.state_pub.publish(
+            self._string_type(data=json.dumps(tracking_state(meta, self.settings)))
+        )
+
+
+class TargetPublisher:
+    """Send the tracked person (the first box while locked) of every frame."""
+
+    needs_jpeg = False
+
+    def __init__(self, settings, sender=None) -> None:
+        self.settings = settings
+        self.sender = sender or target_channel.TargetSender()
+
+    def submit(self, jpeg, **meta) -> None:
+        width, height = meta["width"], meta["height"]
+        cx = cy = box_height = 0.0
+        if meta["boxes"] and meta["track_state"] == proto.TRACK_LOCKED:
+            x, y, w, h = meta["boxes"][0][:4]
+            cx = (x + w / 2) / width * 2 - 1
+            cy = (y + h / 2) / height * 2 - 1
+            box_height = h / height
+        distance = meta.get("distance_m")
+        # capture_us is on the epoch clock; the channel wants time.monotonic().
+        age_us = meta["encode_us"] - meta["capture_us"]
+        self.sender.send(target_channel.Target(
+            seq=meta["seq"] & 0xFFFFFFFF,
+            capture_us=int(time.monotonic() * 1e6) - age_us,
+            state=meta["track_state"],
+            cx=cx,
+            cy=cy,
+            height=box_height,
+            distance_m=distance,
+            stop=distance is not None and distance < self.settings.stop_distance,
+        ))
@@ -0,0 +1,318 @@
+"""Background recording of the camera stream into rotating segments.
+
+The recorder stores the JPEGs exactly as they were sent (no re-encode),
+each preceded by the version 2 frame header of :mod:`oak_streamer.protocol`
+so timestamps, boxes, distance and track state are kept with the frame.
+A segment is a pair of files named after its start time::
+
+    20250101-120000-000.oakrec   length-prefixed v2 packets, append only
+    20250101-120000-000.idx      fixed 20 byte entries (capture_us q, offset Q, size I)
+
+The index is append-only too and sorted by capture time, so seeking to a
+timestamp is a binary search over ``size / 20`` entries.  If a run ends
+without the index being flushed it can be rebuilt by walking the packets.
+
+:meth:`Recorder.submit` runs in the stream loop; it copies the frame into a
+record and puts it on a bounded queue without blocking.  When the disk stalls
+and the queue is full the frame is dropped (and counted) instead of delaying
+the live stream.  A writer thread drains the queue, rotates segments by age
+or size and enforces the retention policy (total size and/or age) after
+every rotation.
+
+Command line::
+
+    python3 -m oak_streamer.recorder list <dir>
+    python3 -m oak_streamer.recorder export <segment.oakrec> <out.mjpeg> [--from US] [--to US]
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from oak_streamer import protocol as proto
+
+INDEX = struct.Struct(">qQI")
+DATA_SUFFIX = ".oakrec"
+INDEX_SUFFIX = ".idx"
+
+_STOP = object()
+
+
+class Recorder:
+    """Write frames to ``directory`` on a background thread."""
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        segment_s: float = 60.0,
+        segment_bytes: int = 256 << 20,
+        max_bytes: Optional[int] = 4 << 30,
+        max_age_s: Optional[float] = None,
+        queue_size: int = 90,
+    ) -> None:
+        self.directory = directory
+        self.segment_s = segment_s
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._data = None
+        self._index = None
+        self._segment_start = 0.0
+        self._offset = 0
+        self._last_flush = 0.0
+        # Metrics
+        self.recorded = 0
+        self.dropped = 0
+        self.bytes_written = 0
+        self.segments_deleted = 0
+        self.errors = 0
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="oak-recorder", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls) -> Optional["Recorder"]:
+        """Build a recorder from ``OAK_RECORD_*``; ``None`` when recording is off."""
+
+        directory = os.environ.get("OAK_RECORD_DIR")
+        if not directory:
+            return None
+        max_mb = float(os.environ.get("OAK_RECORD_MAX_MB", "4096"))
+        max_age_h = float(os.environ.get("OAK_RECORD_MAX_AGE_H", "0"))
+        return cls(
+            directory,
+            segment_s=float(os.environ.get("OAK_RECORD_SEGMENT_S", "60")),
+            max_bytes=int(max_mb * (1 << 20)) if max_mb > 0 else None,
+            max_age_s=max_age_h * 3600 if max_age_h > 0 else None,
+        )
+
+    # -- stream side ---------------------------------------------------------
+
+    def submit(self, jpeg, **header) -> bool:
+        """Queue one frame; ``header`` are the :func:`protocol.pack_frame` fields.
+
+        Never blocks.  Returns ``False`` when the frame was dropped.
+        """
+
+        if self._queue.full():  # cheap check before the copy
+            self.dropped += 1
+            return False
+        record = proto.pack_frame(jpeg, **header)  # own buffer: ``jpeg`` may be reused
+        try:
+            self._queue.put_nowait((header.get("capture_us", 0), record))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def close(self, timeout_s: float = 5.0) -> None:
+        try:
+            self._queue.put(_STOP, timeout=timeout_s)
+        except queue.Full:
+            pass
+        self._thread.join(timeout_s)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+            "mb_written": round(self.bytes_written / (1 << 20), 1),
+            "segments_deleted": self.segments_deleted,
+            "errors": self.errors,
+        }
+
+    # -- writer thread -------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                self._flush()
+                continue
+            if item is _STOP:
+                self._close_segment()
+                return
+            try:
+                self._write(*item)
+            except OSError as e:
+                # Disk full or removed: drop this frame, retry on a new segment.
+                self.errors += 1
+                print(f"⚠️ Kayıt yazılamadı: {e}")
+                self._close_segment()
+
+    def _write(self, capture_us: int, record) -> None:
+        now = time.monotonic()
+        if self._data is None or (
+            now - self._segment_start >= self.segment_s or self._offset >= self.segment_bytes
+        ):
+            self._close_segment()
+            self._open_segment(now)
+        self._data.write(record)
+        self._index.write(INDEX.pack(capture_us, self._offset, len(record)))
+        self._offset += len(record)
+        self.bytes_written += len(record)
+        self.recorded += 1
+        if now - self._last_flush >= 1.0:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._data is not None:
+            self._data.flush()
+            self._index.flush()
+            self._last_flush = time.monotonic()
+
+    def _open_segment(self, now: float) -> None:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        n = 0
+        while True:  # names sort in recording order
+            base = os.path.join(self.directory, f"{stamp}-{n:03d}")
+            if not os.path.exists(base + DATA_SUFFIX):
+                break
+            n += 1
+        self._data = open(base + DATA_SUFFIX, "ab")
+        self._index = open(base + INDEX_SUFFIX, "ab")
+        self._segment_start = now
+        self._offset = 0
+
+    def _close_segment(self) -> None:
+        if self._data is None:
+            return
+        for f in (self._data, self._index):
+            try:
+                f.close()
+            except OSError:
+                self.errors += 1
+        self._data = self._index = None
+        self._apply_retention()
+
+    def _apply_retention(self) -> None:
+        segments = list_segments(self.directory)
+        total = sum(size for _, size, _ in segments)
+        cutoff = time.time() - self.max_age_s if self.max_age_s else None
+        for path, size, mtime in segments:  # oldest first
+            too_big = self.max_bytes is not None and total > self.max_bytes
+            too_old = cutoff is not None and mtime < cutoff
+            if not (too_big or too_old):
+                break
+            for p in (path, path[: -len(DATA_SUFFIX)] + INDEX_SUFFIX):
+                try:
+                    os.unlink(p)
+                except FileNotFoundError:
+                    pass
+            total -= size
+            self.segments_deleted += 1
+
+
+# -- reading -------------------------------------------------------------------
+
+def list_segments(directory: str) -> List[Tuple[str, int, float]]:
+    """``(data path, bytes incl. index, mtime)`` of every segment, oldest first."""
+
+    out = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(DATA_SUFFIX):
+            continue
+        path = os.path.join(directory, name)
+        index = path[: -len(DATA_SUFFIX)] + INDEX_SUFFIX
+        try:
+            st = os.stat(path)
+            size = st.st_size + (os.path.getsize(index) if os.path.exists(index) else 0)
+        except FileNotFoundError:
+            continue
+        out.append((path, size, st.st_mtime))
+    return out
+
+
+def read_index(data_path: str) -> List[Tuple[int, int, int]]:
+    """Index entries of a segment, rebuilt from the packets if the index is short."""
+
+    index_path = data_path[: -len(DATA_SUFFIX)] + INDEX_SUFFIX
+    entries = []
+    if os.path.exists(index_path):
+        with open(index_path, "rb") as f:
+            raw = f.read()
+        usable = len(raw) - len(raw) % INDEX.size
+        entries = [INDEX.unpack_from(raw, i) for i in range(0, usable, INDEX.size)]
+    end = entries[-1][1] + entries[-1][2] if entries else 0
+    if end < os.path.getsize(data_path):
+        entries.extend(_scan(data_path, end))
+    return entries
+
+
+def _scan(data_path: str, offset: int) -> Iterator[Tuple[int, int, int]]:
+    with open(data_path, "rb") as f:
+        f.seek(offset)
+        while True:
+            prefix = f.read(proto.LENGTH.size)
+            if len(prefix) < proto.LENGTH.size:
+                return
+            (length,) = proto.LENGTH.unpack(prefix)
+            body = f.read(length)
+            if len(body) < length:
+                return  # torn final write
+            header, _ = proto.unpack_frame(body)
+            yield (header.capture_us if header else 0, offset, proto.LENGTH.size + length)
+            offset += proto.LENGTH.size + length
+
+
+def iter_frames(
+    data_path: str, start_us: Optional[int] = None, end_us: Optional[int] = None,
+) -> Iterator[Tuple[proto.FrameHeader, bytes]]:
+    """Yield ``(header, jpeg)`` of a segment, optionally within a time range."""
+
+    entries = read_index(data_path)
+    first = 0
+    if start_us is not None:
+        keys: Sequence[int] = [e[0] for e in entries]
+        first = bisect.bisect_left(keys, start_us)
+    with open(data_path, "rb") as f:
+        for capture_us, offset, size in entries[first:]:
+            if end_us is not None and capture_us > end_us:
+                return
+            f.seek(offset)
+            packet = f.read(size)
+            header, jpeg = proto.unpack_frame(packet[proto.LENGTH.size:])
+            yield header, bytes(jpeg)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Kamera kayıtları")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_list = sub.add_parser("list", help="list segments")
+    p_list.add_argument("directory")
+    p_export = sub.add_parser("export", help="write the JPEGs of a segment as MJPEG")
+    p_export.add_argument("segment")
+    p_export.add_argument("out")
+    p_export.add_argument("--from", dest="start_us", type=int)
+    p_export.add_argument("--to", dest="end_us", type=int)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "list":
+        for path, size, _ in list_segments(args.directory):
+            entries = read_index(path)
+            span = (entries[-1][0] - entries[0][0]) / 1e6 if entries else 0.0
+            print(f"{os.path.basename(path)}  {len(entries)} kare  {span:.1f} s  "
+                  f"{size / (1 << 20):.1f} MB")
+    else:
+        n = 0
+        with open(args.out, "wb") as out:
+            for _, jpeg in iter_frames(args.segment, args.start_us, args.end_us):
+                out.write(jpeg)
+                n += 1
+        print(f"{n} kare yazıldı: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Named camera streams of the OAK: ``left``, ``right`` and ``rgb``.
+
+``left`` is the wide mono camera the tracker runs on and is always part of
+the pipeline; the others are added when listed in ``OAK_STREAMS``::
+
+    OAK_STREAMS="left,right:400p:15:30,rgb:720p:15:50"
+
+Each entry is ``name[:resolution[:fps[:jpeg quality]]]``; omitted fields keep
+the defaults of :data:`DEFAULTS`.  Mono resolutions are the sensor modes
+(``400p``/``720p``/``800p``); for ``rgb`` the 1080p sensor is scaled on the
+device to the requested output (``720p``/``1080p``).  With stereo depth on,
+``right`` has to run at the resolution and rate of ``left`` and is adjusted.
+
+Clients pick streams with the ``SUB=left,rgb`` control command (protocol
+version 2 only, see :mod:`oak_streamer.protocol`); frames of a stream nobody
+subscribed to are dropped without being encoded.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+PRIMARY = "left"
+
+
+class StreamConfig(NamedTuple):
+    name: str
+    socket: str           # dai.CameraBoardSocket member
+    color: bool
+    resolution: str
+    fps: int
+    quality: int
+
+
+DEFAULTS: Dict[str, StreamConfig] = {
+    "left": StreamConfig("left", "LEFT", False, "720p", 30, 20),
+    "right": StreamConfig("right", "RIGHT", False, "720p", 15, 20),
+    "rgb": StreamConfig("rgb", "RGB", True, "720p", 15, 40),
+}
+
+# Wire ids of the ``stream`` header byte; stable, never reuse a number.
+STREAM_IDS = {"left": 0, "right": 1, "rgb": 2}
+
+MONO_RESOLUTIONS = {"400p": "THE_400_P", "720p": "THE_720_P", "800p": "THE_800_P"}
+RGB_OUTPUTS = {"720p": (1280, 720), "1080p": (1920, 1080)}
+
+
+def parse_streams(spec: Optional[str]) -> Dict[str, StreamConfig]:
+    """Parse ``OAK_STREAMS``; ``left`` is always included, bad entries are skipped."""
+
+    streams = {PRIMARY: DEFAULTS[PRIMARY]}
+    for entry in (spec or "").split(","):
+        parts = [p.strip() for p in entry.split(":")]
+        name = parts[0]
+        if name not in DEFAULTS:
+            if name:
+                print(f"⚠️ Bilinmeyen kamera akışı: {name}")
+            continue
+        cfg = DEFAULTS[name]
+        try:
+            if len(parts) > 1 and parts[1]:
+                valid = RGB_OUTPUTS if cfg.color else MONO_RESOLUTIONS
+                if parts[1] not in valid:
+                    raise ValueError(parts[1])
+                cfg = cfg._replace(resolution=parts[1])
+            if len(parts) > 2 and parts[2]:
+                cfg = cfg._replace(fps=int(parts[2]))
+            if len(parts) > 3 and parts[3]:
+                cfg = cfg._replace(quality=max(1, min(100, int(parts[3]))))
+        except ValueError as e:
+            print(f"⚠️ Geçersiz akış ayarı '{entry}': {e}")
+            continue
+        streams[name] = cfg
+    return streams
+
+
+def parse_subscription(value: str, available: Iterable[str]) -> Optional[Tuple[str, ...]]:
+    """Stream names of a ``SUB=`` command that exist; ``None`` if none does."""
+
+    available = set(available)
+    names = tuple(dict.fromkeys(n for n in value.split(",") if n in available))
+    return names or None
+
+
+def add_mono(pipeline, dai, cfg: StreamConfig):
+    cam = pipeline.create(dai.node.MonoCamera)
+    cam.setBoardSocket(getattr(dai.CameraBoardSocket, cfg.socket))
+    cam.setResolution(getattr(dai.MonoCameraProperties.SensorResolution,
+                              MONO_RESOLUTIONS[cfg.resolution]))
+    cam.setFps(cfg.fps)
+    return cam
+
+
+def add_stream_output(pipeline, dai, cfg: StreamConfig, mono=None):
+    """Add the XLink output of an extra stream (and its camera unless ``mono``)."""
+
+    xout = pipeline.create(dai.node.XLinkOut)
+    xout.setStreamName(cfg.name)
+    if cfg.color:
+        cam = pipeline.create(dai.node.ColorCamera)
+        cam.setBoardSocket(dai.CameraBoardSocket.RGB)
+        cam.setResolution(dai.ColorCameraProperties.SensorResolution.THE_1080_P)
+        cam.setPreviewSize(*RGB_OUTPUTS[cfg.resolution])
+        cam.setInterleaved(True)
+        cam.setColorOrder(dai.ColorCameraProperties.ColorOrder.BGR)
+        cam.setFps(cfg.fps)
+        cam.preview.link(xout.input)
+        return cam
+    cam = mono if mono is not None else add_mono(pipeline, dai, cfg)
+    cam.out.link(xout.input)
+    return cam
@@ -0,0 +1,217 @@
+"""Multi-person tracker: stable track ids across frames and target selection.
+
+The detectors return a fresh, unordered list of boxes every frame.  Following
+``boxes[0]`` makes the target jump between people whenever HOG reorders them,
+so :class:`MultiTracker` associates the boxes with the tracks of the previous
+frames and keeps one id per person:
+
+* the cost of every track/detection pair is computed at once on numpy
+  arrays: ``1 - IoU`` of the detection with the track's predicted box, plus
+  the centroid distance in units of the track's diagonal (HOG boxes jitter in
+  size, their centres much less).  Pairs with no overlap that are more than
+  ``max_distance`` diagonals apart are not allowed;
+* pairs are assigned greedily in order of cost.  For the handful of people in
+  view this equals the optimal assignment unless two people cross, and costs
+  a single ``argsort`` instead of a Hungarian solver;
+* unmatched detections start new tracks, tracks missed for more than
+  ``max_misses`` frames are dropped.  A track becomes a candidate target
+  after ``min_hits`` detections, so a one-frame false positive never is.
+
+Each track has an ``age`` (frames since it appeared) and a ``confidence``, an
+exponential average of whether it was detected in each frame.  The target is
+the track the operator locked (``LOCK=<id>`` on the control channel); without
+a lock the current target is kept while it lives, otherwise the most
+confident (then the oldest) confirmed track is chosen.  A locked track that
+is lost is not replaced: the tracker reports no target until the operator
+locks another id or unlocks.
+
+An update with target choice costs about 0.1 ms for five people on a desktop,
+mostly fixed numpy overhead (``micro.tracker`` in ``benchmarks/suite.py``).
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from robot_common import lazy
+
+np = lazy.LazyModule("numpy")
+
+
+class Track:
+    """One person followed across frames."""
+
+    __slots__ = ("id", "box", "velocity", "age", "hits", "misses", "confidence")
+
+    def __init__(self, track_id: int, box: Sequence[int], confidence: float) -> None:
+        self.id = track_id
+        self.box = tuple(int(v) for v in box[:4])
+        self.velocity = (0.0, 0.0)   # centre motion, pixels per frame
+        self.age = 0
+        self.hits = 1
+        self.misses = 0
+        self.confidence = confidence
+
+    def predicted(self) -> Tuple[float, float, float, float]:
+        """Box expected in the next frame at constant centre velocity."""
+        x, y, w, h = self.box
+        dx, dy = self.velocity
+        steps = self.misses + 1
+        return (x + dx * steps, y + dy * steps, w, h)
+
+    def wire(self) -> Tuple[int, int, int, int, int, int]:
+        """``(x, y, w, h, track_id, score)`` as sent in the version 2 header."""
+        return self.box + (self.id, int(round(self.confidence * 100)))
+
+    def __repr__(self) -> str:
+        return (f"Track(id={self.id}, box={self.box}, age={self.age}, "
+                f"confidence={self.confidence:.2f})")
+
+
+def cost_matrix(tracks, detections, max_distance: float = 1.0):
+    """Association costs of ``tracks`` (N x 4) and ``detections`` (M x 4) boxes.
+
+    Both are ``(x, y, w, h)`` arrays.  Returns an N x M float array,
+    ``inf`` for pairs that must not be matched.
+    """
+
+    t = np.asarray(tracks, dtype=np.float64).reshape(-1, 1, 4)
+    d = np.asarray(detections, dtype=np.float64).reshape(1, -1, 4)
+    tx1, ty1 = t[..., 0] + t[..., 2], t[..., 1] + t[..., 3]
+    dx1, dy1 = d[..., 0] + d[..., 2], d[..., 1] + d[..., 3]
+    iw = np.clip(np.minimum(tx1, dx1) - np.maximum(t[..., 0], d[..., 0]), 0, None)
+    ih = np.clip(np.minimum(ty1, dy1) - np.maximum(t[..., 1], d[..., 1]), 0, None)
+    inter = iw * ih
+    union = t[..., 2] * t[..., 3] + d[..., 2] * d[..., 3] - inter
+    iou = inter / np.maximum(union, 1.0)
+
+    centre_dx = (t[..., 0] + t[..., 2] / 2) - (d[..., 0] + d[..., 2] / 2)
+    centre_dy = (t[..., 1] + t[..., 3] / 2) - (d[..., 1] + d[..., 3] / 2)
+    diagonal = np.maximum(np.hypot(t[..., 2], t[..., 3]), 1.0)
+    distance = np.hypot(centre_dx, centre_dy) / diagonal
+
+    cost = 1.0 - iou + distance
+    cost[(iou <= 0.0) & (distance > max_distance)] = np.inf
+    return cost
+
+
+def greedy_assignment(cost) -> List[Tuple[int, int]]:
+    """``(row, col)`` pairs taken cheapest first, each row and column at most once."""
+
+    rows, cols = cost.shape
+    if not rows or not cols:
+        return []
+    order = np.argsort(cost, axis=None)
+    finite = int(np.count_nonzero(np.isfinite(cost)))
+    used_rows = [False] * rows
+    used_cols = [False] * cols
+    pairs = []
+    for flat in order[:finite].tolist():
+        r, c = divmod(flat, cols)
+        if used_rows[r] or used_cols[c]:
+            continue
+        used_rows[r] = used_cols[c] = True
+        pairs.append((r, c))
+        if len(pairs) == min(rows, cols):
+            break
+    return pairs
+
+
+class MultiTracker:
+    """Associate per-frame detections into tracks with stable ids."""
+
+    def __init__(self, max_misses: int = 5, min_hits: int = 2, max_distance: float = 1.0,
+                 smoothing: float = 0.3) -> None:
+        self.max_misses = max_misses
+        self.min_hits = min_hits
+        self.max_distance = max_distance
+        self.smoothing = smoothing
+        self.tracks: List[Track] = []
+        self.locked_id: Optional[int] = None
+        self.target_id: Optional[int] = None
+        self._next_id = 1
+
+    def reset(self) -> None:
+        """Drop every track and the lock; ids start again from 1."""
+        self.tracks = []
+        self.locked_id = None
+        self.target_id = None
+        self._next_id = 1
+
+    def update(self, boxes: Sequence[Sequence[int]]) -> List[Track]:
+        """Feed the detections of one frame; returns the tracks detected in it."""
+
+        alpha = self.smoothing
+        matched: Dict[int, int] = {}
+        if self.tracks and boxes:
+            cost = cost_matrix([t.predicted() for t in self.tracks],
+                               [b[:4] for b in boxes], self.max_distance)
+            matched = dict(greedy_assignment(cost))
+
+        claimed = set(matched.values())
+        alive = []
+        for i, track in enumerate(self.tracks):
+            track.age += 1
+            if i in matched:
+                box = tuple(int(v) for v in boxes[matched[i]][:4])
+                dx = (box[0] + box[2] / 2) - (track.box[0] + track.box[2] / 2)
+                dy = (box[1] + box[3] / 2) - (track.box[1] + track.box[3] / 2)
+                steps = track.misses + 1
+                vx, vy = track.velocity
+                track.velocity = (vx + alpha * (dx / steps - vx), vy + alpha * (dy / steps - vy))
+                track.box = box
+                track.hits += 1
+                track.misses = 0
+                track.confidence += alpha * (1.0 - track.confidence)
+            else:
+                track.misses += 1
+                track.confidence *= 1.0 - alpha
+                if track.misses > self.max_misses:
+                    continue
+            alive.append(track)
+        for j, box in enumerate(boxes):
+            if j not in claimed:
+                alive.append(Track(self._next_id, box, alpha))
+                self._next_id = self._next_id % 0xFFFF + 1   # u16 on the wire, 0 = no id
+        self.tracks = alive
+        return [t for t in alive if t.misses == 0]
+
+    def confirmed(self) -> List[Track]:
+        return [t for t in self.tracks if t.hits >= self.min_hits]
+
+    def get(self, track_id: Optional[int]) -> Optional[Track]:
+        for track in self.tracks:
+            if track.id == track_id:
+                return track
+        return None
+
+    def lock(self, track_id: int) -> bool:
+        """Follow ``track_id`` only; ``False`` (and no change) if no such track."""
+        if self.get(track_id) is None:
+            return False
+        self.locked_id = track_id
+        return True
+
+    def unlock(self) -> None:
+        self.locked_id = None
+
+    def target(self) -> Optional[Track]:
+        """The track to follow in this frame, ``None`` if there is none."""
+
+        if self.locked_id is not None:
+            track = self.get(self.locked_id)
+        else:
+            track = self.get(self.target_id)
+            if track is None or track.hits < self.min_hits:
+                candidates = self.confirmed()
+                track = max(candidates, key=lambda t: (t.confidence, t.age), default=None)
+        self.target_id = None if track is None else track.id
+        return track
+
+    def wire_boxes(self, target: Optional[Track]) -> List[Tuple[int, int, int, int, int, int]]:
+        """Confirmed tracks detected in this frame as wire boxes, ``target`` first."""
+
+        boxes = [] if target is None else [target.wire()]
+        boxes.extend(t.wire() for t in self.tracks
+                     if t is not target and t.misses == 0 and t.hits >= self.min_hits)
+        return boxes
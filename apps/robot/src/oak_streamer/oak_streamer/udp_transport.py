@@ -0,0 +1,219 @@
+"""Optional UDP transport of the camera stream.
+
+Over TCP one lost segment holds back every later frame until it has been
+retransmitted (head-of-line blocking); on a lossy Wi-Fi link the live view
+then falls seconds behind.  With this transport each frame packet of
+:mod:`oak_streamer.protocol` (the body, without the length prefix) is cut into
+datagrams that fit the path MTU, and a frame that does not arrive complete is
+simply replaced by the next one.
+
+A client asks for it with ``UDP=<port>`` on the TCP control channel, which
+stays open for commands and to tell that the client is gone; frames then go
+to ``<client ip>:<port>`` instead of the TCP socket.  Without the command the
+stream stays on TCP.
+
+Every datagram starts with ``FRAGMENT`` (big endian)::
+
+    magic       2s  b"OU"
+    version     B   1
+    group       B   data fragments per parity fragment, 0 = no parity
+    frame_id    I   increases by one per frame sent
+    index       H   fragment index; data 0…count-1, parity count…
+    count       H   number of data fragments
+    frame_len   I   body length
+    frag_size   H   payload bytes of every data fragment but the last
+
+With parity, fragment ``count + g`` is the XOR of data fragments
+``g*group … g*group+group-1`` (zero padded), so one lost fragment per group
+is rebuilt at the cost of ``1/group`` more bandwidth.  :class:`FrameAssembler`
+drops a partial frame as soon as a newer frame completes and ignores
+fragments of frames older than the last one delivered: it never waits.
+"""
+
+from __future__ import annotations
+
+import socket
+import struct
+from typing import Dict, List, Optional, Tuple
+
+FRAGMENT = struct.Struct(">2sBBIHHIH")
+MAGIC = b"OU"
+VERSION = 1
+DEFAULT_DATAGRAM = 1200   # below the 1280 bytes IPv6 guarantees, safe over VPNs
+DEFAULT_GROUP = 4
+LENGTH_PREFIX = 4         # protocol.LENGTH, stripped from the packets
+
+
+def _xor(parts) -> bytes:
+    size = max(len(p) for p in parts)
+    acc = 0
+    for part in parts:
+        # int.from_bytes XORs a whole fragment in C; zero padding is implicit.
+        acc ^= int.from_bytes(bytes(part).ljust(size, b"\0"), "big")
+    return acc.to_bytes(size, "big")
+
+
+class UdpFrameSender:
+    """Send length-prefixed frame packets to ``addr`` as fragments.
+
+    The socket is non-blocking: when the send buffer is full the rest of the
+    frame is dropped (the receiver discards it) rather than stalling the
+    camera loop.
+    """
+
+    def __init__(self, addr: Tuple[str, int], datagram_size: int = DEFAULT_DATAGRAM,
+                 group: int = DEFAULT_GROUP, sock: Optional[socket.socket] = None) -> None:
+        self.addr = addr
+        self.frag_size = datagram_size - FRAGMENT.size
+        self.group = max(0, min(group, 255))
+        self.sock = sock or socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.frame_id = 0
+        # Metrics
+        self.frames = 0
+        self.datagrams = 0
+        self.dropped_frames = 0
+
+    def send(self, packet) -> bool:
+        """Send one packet (``protocol.pack_frame``/``pack_legacy`` output)."""
+
+        body = memoryview(packet)[LENGTH_PREFIX:]
+        size = self.frag_size
+        count = max(1, -(-len(body) // size))
+        if count > 0xFFFF:
+            self.dropped_frames += 1
+            return False
+        self.frame_id = (self.frame_id + 1) & 0xFFFFFFFF
+        parts = [body[i * size:(i + 1) * size] for i in range(count)]
+        if self.group:
+            parts += [_xor(parts[g:g + self.group]) for g in range(0, count, self.group)]
+        try:
+            for index, part in enumerate(parts):
+                header = FRAGMENT.pack(MAGIC, VERSION, self.group, self.frame_id, index,
+                                       count, len(body), size)
+                # Scatter/gather: the fragment is not copied next to the header.
+                self.sock.sendmsg([header, part], [], 0, self.addr)
+                self.datagrams += 1
+        except (BlockingIOError, InterruptedError):
+            self.dropped_frames += 1
+            return False
+        self.frames += 1
+        return True
+
+    def close(self) -> None:
+        self.sock.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {"frames": self.frames, "datagrams": self.datagrams,
+                "dropped_frames": self.dropped_frames}
+
+
+class _Partial:
+    __slots__ = ("count", "group", "frame_len", "frag_size", "data", "parity", "have")
+
+    def __init__(self, count: int, group: int, frame_len: int, frag_size: int) -> None:
+        self.count = count
+        self.group = group
+        self.frame_len = frame_len
+        self.frag_size = frag_size
+        self.data: List[Optional[bytes]] = [None] * count
+        self.parity: Dict[int, bytes] = {}
+        self.have = 0
+
+    def add(self, index: int, payload: bytes) -> None:
+        if index < self.count:
+            if self.data[index] is None:
+                self.data[index] = payload
+                self.have += 1
+        else:
+            self.parity[index - self.count] = payload
+
+    def recover(self) -> int:
+        """Rebuild single missing fragments from parity; returns how many."""
+
+        rebuilt = 0
+        for g, parity in self.parity.items():
+            start = g * self.group
+            members = range(start, min(start + self.group, self.count))
+            missing = [i for i in members if self.data[i] is None]
+            if len(missing) != 1:
+                continue
+            i = missing[0]
+            length = min(self.frag_size, self.frame_len - i * self.frag_size)
+            self.data[i] = _xor([parity] + [self.data[j] for j in members if j != i])[:length]
+            self.have += 1
+            rebuilt += 1
+        return rebuilt
+
+    def body(self) -> bytes:
+        return b"".join(self.data)
+
+
+def _behind(newest: int, frame_id: int) -> int:
+    """How many frames ``frame_id`` is behind ``newest`` (negative: ahead)."""
+
+    d = (newest - frame_id) & 0xFFFFFFFF
+    return d if d < 0x80000000 else d - (1 << 32)
+
+
+class FrameAssembler:
+    """Reassemble frame bodies from datagrams; stale and partial frames are dropped."""
+
+    # Frames this far behind the last delivered one are from a restarted sender.
+    RESTART_WINDOW = 1024
+
+    def __init__(self, max_pending: int = 4) -> None:
+        self.max_pending = max_pending
+        self.pending: Dict[int, _Partial] = {}
+        self.last_id: Optional[int] = None
+        # Metrics
+        self.frames = 0
+        self.recovered = 0
+        self.incomplete = 0
+        self.late = 0
+        self.invalid = 0
+
+    def add(self, datagram: bytes) -> Optional[bytes]:
+        """Feed one datagram; returns a frame body once it is complete."""
+
+        if len(datagram) < FRAGMENT.size:
+            self.invalid += 1
+            return None
+        magic, version, group, frame_id, index, count, frame_len, frag_size = (
+            FRAGMENT.unpack_from(datagram))
+        if magic != MAGIC or version != VERSION or count == 0:
+            self.invalid += 1
+            return None
+        if self.last_id is not None and (
+            0 <= _behind(self.last_id, frame_id) < self.RESTART_WINDOW
+        ):
+            self.late += 1
+            return None
+        partial = self.pending.get(frame_id)
+        if partial is None:
+            partial = self.pending[frame_id] = _Partial(count, group, frame_len, frag_size)
+            if len(self.pending) > self.max_pending:
+                newest = max(self.pending, key=lambda i: -_behind(frame_id, i))
+                oldest = max(self.pending, key=lambda i: _behind(newest, i))
+                del self.pending[oldest]
+                self.incomplete += 1
+                if oldest == frame_id:
+                    return None
+        partial.add(index, datagram[FRAGMENT.size:])
+        if partial.have < partial.count and partial.group:
+            self.recovered += partial.recover()
+        if partial.have < partial.count:
+            return None
+
+        del self.pending[frame_id]
+        # Everything older than the frame just completed could only be shown late.
+        for old in [i for i in self.pending if _behind(frame_id, i) > 0]:
+            del self.pending[old]
+            self.incomplete += 1
+        self.last_id = frame_id
+        self.frames += 1
+        return partial.body()
+
+    def stats(self) -> Dict[str, int]:
+        return {"frames": self.frames, "recovered": self.recovered,
+                "incomplete": self.incomplete, "late": self.late, "invalid": self.invalid}
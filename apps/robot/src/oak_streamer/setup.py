@@ -12,6 +12,7 @@ setup(
         ('share/' + package_name, ['package.xml']),
     ],
     install_requires=['setuptools', 'depthai', 'opencv-python'],
+    extras_require={'turbojpeg': ['PyTurboJPEG']},
     zip_safe=True,
     maintainer='kaanjetson',
     maintainer_email='kaanjetson@todo.todo',
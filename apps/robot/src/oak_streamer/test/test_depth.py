@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2] / "robot_common"))
+from oak_streamer.depth import box_distance_m  # noqa: E402
+
+
+def test_box_distance_is_median_of_valid_depth_in_metres():
+    depth = np.zeros((720, 1280), dtype=np.uint16)
+    depth[200:600, 400:600] = 1500      # person
+    depth[200:600, 400:600:3] = 0       # holes from the left-right check
+    depth[200:220, 400:600] = 9000      # background leaking into the box
+
+    assert box_distance_m(depth, (400, 200, 200, 400)) == 1.5
+
+
+def test_box_distance_rescales_and_rejects_empty_boxes():
+    depth = np.full((360, 640), 2500, dtype=np.uint16)
+    assert box_distance_m(depth, (600, 300, 200, 200), frame_shape=(720, 1280)) == 2.5
+    assert box_distance_m(np.zeros((360, 640), dtype=np.uint16), (0, 0, 100, 100)) is None
+    assert box_distance_m(depth, (0, 0, 1, 1)) is None
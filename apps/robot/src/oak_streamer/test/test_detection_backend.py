@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2] / "robot_common"))
+from oak_streamer.detection import DeviceDetector, resolve_backend  # noqa: E402
+
+
+class _Queue:
+    def __init__(self, *messages):
+        self.messages = list(messages)
+
+    def tryGet(self):  # noqa: N802 - DepthAI API
+        return self.messages.pop(0) if self.messages else None
+
+
+def _det(label, confidence, xmin, ymin, xmax, ymax):
+    return SimpleNamespace(label=label, confidence=confidence,
+                           xmin=xmin, ymin=ymin, xmax=xmax, ymax=ymax)
+
+
+def test_device_detector_scales_filters_and_keeps_last_result():
+    msg = SimpleNamespace(detections=[
+        _det(15, 0.5, 0.0, 0.0, 0.5, 0.5),
+        _det(15, 0.9, 0.5, 0.25, 1.2, 1.0),   # clipped to the frame
+        _det(7, 0.99, 0.0, 0.0, 1.0, 1.0),    # not a person
+        _det(15, 0.1, 0.0, 0.0, 1.0, 1.0),    # below threshold
+    ])
+    detector = DeviceDetector(_Queue(msg))
+    frame = SimpleNamespace(shape=(720, 1280))
+
+    assert detector.detect(frame, 0.5) == [(640, 180, 640, 540), (0, 0, 640, 360)]
+    # Queue empty: the previous detections are reused.
+    assert detector.detect(frame, 0.0) == [(640, 180, 640, 540)]
+
+
+def test_nn_backend_without_blob_falls_back_to_hog(tmp_path):
+    assert resolve_backend("nn", None) == "hog"
+    assert resolve_backend("nn", str(tmp_path / "missing.blob")) == "hog"
+    blob = tmp_path / "person.blob"
+    blob.write_bytes(b"\0")
+    assert resolve_backend("nn", str(blob)) == "nn"
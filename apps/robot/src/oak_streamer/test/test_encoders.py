@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2] / "robot_common"))
+from oak_streamer import encoders  # noqa: E402
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class _Stub:
+    def __init__(self, name, cost_s, clock):
+        self.name, self.cost_s, self.clock = name, cost_s, clock
+
+    def encode(self, frame, quality):
+        self.clock.t += self.cost_s
+        return b"\xff\xd8"
+
+
+def test_benchmark_reports_median_ms_per_backend():
+    clock = _Clock()
+    stubs = [_Stub("slow", 0.004, clock), _Stub("fast", 0.001, clock)]
+    timings = encoders.benchmark(stubs, frame=None, quality=20, rounds=3, clock=clock)
+
+    assert timings == pytest.approx({"slow": 4.0, "fast": 1.0})
+
+
+def test_passthrough_forwards_encoded_bytes_only():
+    enc = encoders.PassthroughEncoder()
+    assert enc.encode(b"\xff\xd8jpeg", 20) == b"\xff\xd8jpeg"
+
+    class Raw:
+        ndim = 2
+
+    assert enc.encode(Raw(), 20) is None
+
+
+class _Msg:
+    def __init__(self, seq):
+        self.seq = seq
+
+    def getSequenceNum(self):  # noqa: N802 - DepthAI API
+        return self.seq
+
+    def getData(self):  # noqa: N802 - DepthAI API
+        return f"jpeg{self.seq}"
+
+
+class _SeqQueue:
+    def __init__(self, seqs):
+        self.msgs = [_Msg(s) for s in seqs]
+
+    def get(self):
+        return self.msgs.pop(0)
+
+
+def test_passthrough_frames_are_paired_by_sequence_number():
+    # The JPEG of frame 2 and the raw frame 4 were dropped; 9 never gets a partner.
+    pairer = encoders.FramePairer(_SeqQueue([1, 3, 5, 9, 10]), _SeqQueue([1, 3, 4, 5, 11]),
+                                  max_skew=1)
+    frame, jpeg = pairer.get()
+    assert (frame.seq, jpeg) == (1, "jpeg1")
+    frame, jpeg = pairer.get()
+    assert (frame.seq, jpeg) == (3, "jpeg3")
+    frame, jpeg = pairer.get()
+    assert (frame.seq, jpeg) == (5, "jpeg5")      # raw 5 waited for JPEG 4 to pass
+    assert pairer.get() is None                   # 9 vs 11, then 10 vs 11: dropped
+    assert pairer.stats() == {"paired": 3, "resyncs": 2, "dropped": 1}
@@ -4,6 +4,8 @@ from pathlib import Path
 import numpy as np
 
 sys.path.append(str(Path(__file__).resolve().parents[1] / "oak_streamer"))
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2] / "robot_common"))
 from oak_streamer_node import detect_humans  # type: ignore
 
 
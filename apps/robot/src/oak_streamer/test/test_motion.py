@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2] / "robot_common"))
+from oak_streamer.motion import GatedDetector, MotionGate  # noqa: E402
+
+
+class _Counting:
+    name = "hog"
+
+    def __init__(self):
+        self.calls = 0
+
+    def detect(self, frame, sensitivity=0.5):
+        self.calls += 1
+        return [(0, 0, 10, 10)]
+
+
+def test_static_scene_reuses_boxes_until_motion_or_refresh():
+    now = [0.0]
+    inner = _Counting()
+    detector = GatedDetector(inner, MotionGate(refresh_s=1.0, clock=lambda: now[0]))
+    frame = np.full((720, 1280), 100, dtype=np.uint8)
+
+    for _ in range(10):
+        assert detector.detect(frame) == [(0, 0, 10, 10)]
+    assert inner.calls == 1
+
+    brighter = frame + 20           # exposure change, not motion
+    detector.detect(brighter)
+    assert inner.calls == 1
+
+    moved = brighter.copy()
+    moved[300:420, 600:680] = 250   # a person walking in
+    detector.detect(moved)
+    assert inner.calls == 2
+
+    now[0] = 1.5                    # periodic refresh
+    detector.detect(moved)
+    assert inner.calls == 3
+
+    stats = detector.gate.stats()
+    assert stats["frames"] == 13 and stats["skipped"] == 10
+    assert stats["skip_ratio"] == round(10 / 13, 3)
@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2] / "robot_common"))
+from oak_streamer import protocol as proto  # noqa: E402
+from oak_streamer.buffers import FramePool  # noqa: E402
+
+
+def _body(packet):
+    (length,) = proto.LENGTH.unpack_from(packet)
+    assert length == len(packet) - proto.LENGTH.size
+    return packet[proto.LENGTH.size:]
+
+
+def test_v2_round_trip():
+    jpeg = b"\xff\xd8jpeg\xff\xd9"
+    packet = proto.pack_frame(
+        jpeg, seq=7, capture_us=1_000, encode_us=1_500, width=1280, height=720,
+        boxes=[(10, 20, 30, 40), (1, 2, 3, 4, 9, 200)], distance_m=1.5,
+        track_state=proto.TRACK_LOCKED, flags=proto.FLAG_TRACKING,
+    )
+    header, payload = proto.unpack_frame(_body(packet))
+
+    assert payload == jpeg
+    assert header.version == proto.VERSION and header.seq == 7
+    assert header.encode_us - header.capture_us == 500
+    assert (header.width, header.height, header.distance_m) == (1280, 720, 1.5)
+    assert header.boxes == [(10, 20, 30, 40, 0, 0), (1, 2, 3, 4, 9, 200)]
+
+
+def test_legacy_body_is_plain_jpeg():
+    jpeg = b"\xff\xd8jpeg\xff\xd9"
+    header, payload = proto.unpack_frame(_body(proto.pack_legacy(jpeg)))
+    assert header is None and payload == jpeg
+
+    header, _ = proto.unpack_frame(_body(proto.pack_frame(
+        jpeg, seq=1, capture_us=0, encode_us=0, width=1, height=1)))
+    assert header.distance_m is None and header.boxes == []
+
+
+def test_packets_reuse_the_pool_buffer():
+    pool = FramePool()
+    first = bytes(proto.pack_legacy(b"\xff\xd8" + b"x" * 1000, pool.packet))
+    second = proto.pack_frame(b"\xff\xd8" + b"y" * 900, seq=2, capture_us=0, encode_us=0,
+                              width=4, height=4, boxes=[(0, 0, 1, 1)], alloc=pool.packet)
+
+    assert pool.allocations == 1
+    assert len(first) == 4 + 1002
+    header, payload = proto.unpack_frame(_body(second))
+    assert header.seq == 2 and payload == b"\xff\xd8" + b"y" * 900
+
+
+def test_stream_id_is_skippable_header_field():
+    jpeg = b"\xff\xd8rgb\xff\xd9"
+    body = _body(proto.pack_frame(jpeg, seq=3, capture_us=0, encode_us=0, width=1280,
+                                  height=720, boxes=[(0, 0, 1, 1)], stream=2))
+    header, payload = proto.unpack_frame(body)
+    assert header.flags & proto.FLAG_STREAM and header.stream == 2
+    assert payload == jpeg
+
+    # A client that only knows the fixed header and boxes still finds the JPEG.
+    header_len = proto.HEADER.unpack_from(body)[3]
+    assert body[header_len:] == jpeg
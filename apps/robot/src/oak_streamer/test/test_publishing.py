@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2] / "robot_common"))
+from oak_streamer import protocol as proto  # noqa: E402
+from oak_streamer.publishing import FrameBus, tracking_state  # noqa: E402
+
+META = dict(seq=3, capture_us=1000, encode_us=1500, width=640, height=480,
+            boxes=[(10, 20, 30, 40, 900)], distance_m=1.23456,
+            track_state=proto.TRACK_LOCKED)
+
+
+def test_bus_fans_out_without_copy_and_survives_broken_subscribers():
+    bus = FrameBus()
+    got = []
+    bus.subscribe(lambda jpeg, meta: 1 / 0)
+    unsubscribe = bus.subscribe(lambda jpeg, meta: got.append((jpeg, meta["seq"])))
+    data = bytearray(b"\xff\xd8jpeg")
+    bus.submit(data, **META)
+    assert got == [(data, 3)] and got[0][0] is data
+    unsubscribe()
+    bus.submit(data, **META)
+    assert len(got) == 1
+
+
+def test_tracking_state_message():
+    settings = SimpleNamespace(last_direction="left", stop_distance=2.0)
+    state = tracking_state(META, settings)
+    assert state["state"] == "locked" and state["direction"] == "left"
+    assert state["distance_m"] == 1.235 and state["stop"] is True
+    assert state["boxes"] == [[10, 20, 30, 40]]
+    assert tracking_state(dict(META, distance_m=None), settings)["stop"] is False
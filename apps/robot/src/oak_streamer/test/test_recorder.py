@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from oak_streamer import protocol as proto  # noqa: E402
+from oak_streamer.recorder import Recorder, iter_frames, list_segments  # noqa: E402
+
+
+def _submit(rec, i):
+    return rec.submit(b"\xff\xd8" + bytes([i]) * 100, seq=i, capture_us=i * 1000,
+                      encode_us=i * 1000 + 5, width=64, height=48,
+                      boxes=[(i, 1, 2, 3)], track_state=proto.TRACK_LOCKED)
+
+
+def test_segments_rotate_seek_and_keep_detections(tmp_path):
+    rec = Recorder(str(tmp_path), segment_bytes=600, max_bytes=None)
+    for i in range(10):
+        assert _submit(rec, i)
+    rec.close()
+
+    segments = [path for path, _, _ in list_segments(str(tmp_path))]
+    assert len(segments) > 1
+    frames = [f for path in segments for f in iter_frames(path)]
+    assert [h.seq for h, _ in frames] == list(range(10))
+    assert frames[3][0].boxes == [(3, 1, 2, 3, 0, 0)]
+    assert frames[3][1] == b"\xff\xd8" + bytes([3]) * 100
+
+    last = segments[-1]
+    first_seq = next(iter_frames(last))[0].seq
+    seeked = [h.seq for h, _ in iter_frames(last, start_us=(first_seq + 1) * 1000)]
+    assert seeked[0] == first_seq + 1
+
+
+def test_retention_and_full_queue_drop(tmp_path):
+    rec = Recorder(str(tmp_path), segment_bytes=300, max_bytes=1000)
+    for i in range(20):
+        _submit(rec, i)
+    rec.close()
+    assert sum(size for _, size, _ in list_segments(str(tmp_path))) <= 1000
+    assert rec.segments_deleted > 0
+
+    rec = Recorder(str(tmp_path / "q"), queue_size=1)
+    rec.close()                          # stalled writer: nothing drains the queue
+    assert _submit(rec, 0)
+    assert not _submit(rec, 1) and rec.dropped == 1
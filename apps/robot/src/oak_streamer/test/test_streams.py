@@ -0,0 +1,56 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2] / "robot_common"))
+from oak_streamer import oak_streamer_node as node  # noqa: E402
+from oak_streamer.streams import parse_streams  # noqa: E402
+
+
+def test_parse_streams_keeps_left_and_skips_bad_entries():
+    streams = parse_streams("rgb:1080p:10:55,right:999p,thermal,right::15")
+
+    assert list(streams) == ["left", "rgb", "right"]
+    assert streams["rgb"][3:] == ("1080p", 10, 55)
+    assert (streams["right"].resolution, streams["right"].fps) == ("720p", 15)
+
+
+class _Queue:
+    def __init__(self):
+        self.reads = 0
+
+    def tryGet(self):  # noqa: N802 - DepthAI API
+        self.reads += 1
+        return None
+
+
+def test_subscription_needs_v2_and_unsubscribed_streams_are_not_read():
+    settings = node.StreamSettings(streams=parse_streams("left,rgb"))
+    node.apply_command("SUB=rgb", settings)
+    assert settings.subscriptions == ("left",)   # legacy: no stream ids on the wire
+
+    node.apply_command("PROTO=2 SUB=rgb,left,right", settings)
+    assert settings.subscriptions == ("rgb", "left")
+
+    queue = _Queue()
+    oak = node.OakDevice(None, None, None, None, extra=((settings.streams["rgb"], queue),))
+    node.apply_command("SUB=left", settings)
+    assert node.stream_packets(oak, settings) == [] and queue.reads == 0
+
+    node.reset_connection(settings)
+    assert settings.subscriptions == ("left",)
+
+
+def test_commands_split_across_reads_are_applied_whole():
+    settings = node.StreamSettings(streams=parse_streams("left,right,rgb"))
+    node.feed_commands(b"PROTO=2\nUDP=50", settings)
+    assert settings.protocol == 2 and settings.udp_port is None   # not port 50
+    node.feed_commands(b"10\nSUB=left,right,", settings)
+    assert settings.udp_port == 5010 and settings.subscriptions == ("left",)
+    node.feed_commands(b"rgb\n", settings)
+    assert settings.subscriptions == ("left", "right", "rgb")
+
+    node.feed_commands(b"UDP=6000", settings)
+    node.reset_connection(settings)                # a new client starts clean
+    node.feed_commands(b"\n", settings)
+    assert settings.udp_port is None
@@ -0,0 +1,56 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2] / "robot_common"))
+from oak_streamer import oak_streamer_node as node  # noqa: E402
+from oak_streamer.tracker import MultiTracker, cost_matrix, greedy_assignment  # noqa: E402
+
+
+def test_ids_survive_reordering_and_short_misses():
+    tracker = MultiTracker(max_misses=2)
+    a, b = (100, 50, 40, 100), (300, 60, 40, 100)
+    tracker.update([a, b])
+    assert tracker.target() is None                # not confirmed after one frame
+    ids = {t.box: t.id for t in tracker.update([b, a])}
+    target = tracker.target()
+    assert target.id == ids[a]                     # a tie goes to the first track
+
+    # Detector order flips and one person is missed for a frame: ids stay put.
+    tracker.update([(305, 60, 40, 100)])
+    moved = {t.id: t.box for t in tracker.update([(310, 62, 40, 100), (104, 50, 40, 100)])}
+    assert moved == {ids[b]: (310, 62, 40, 100), ids[a]: (104, 50, 40, 100)}
+    assert tracker.target().id == ids[a]           # auto target is sticky
+
+    assert tracker.lock(ids[b]) and not tracker.lock(99)
+    assert tracker.target().id == ids[b]
+    assert [box[4] for box in tracker.wire_boxes(tracker.target())] == [ids[b], ids[a]]
+    for _ in range(3):
+        tracker.update([(104, 50, 40, 100)])
+    assert tracker.target() is None                # a lost lock is not replaced
+    tracker.unlock()
+    assert tracker.target().id == ids[a]
+
+
+def test_cost_gates_far_pairs_and_assignment_is_one_to_one():
+    cost = cost_matrix([(0, 0, 10, 10), (100, 0, 10, 10)],
+                       [(101, 1, 10, 10), (1, 0, 10, 10), (500, 0, 10, 10)])
+    assert np.isinf(cost[:, 2]).all()
+    assert sorted(greedy_assignment(cost)) == [(0, 1), (1, 0)]
+    assert greedy_assignment(np.empty((0, 3))) == []
+
+
+def test_lock_command_and_reset():
+    settings = node.StreamSettings()
+    settings.tracker.update([(0, 0, 10, 10)])
+    node.apply_command("LOCK=1", settings)
+    assert settings.tracker.locked_id == 1
+    node.apply_command("LOCK=0", settings)
+    assert settings.tracker.locked_id is None
+    node.apply_command("LOCK=1 UNLOCK LOCK=x", settings)
+    assert settings.tracker.locked_id is None
+    node.apply_command("LOCK=1", settings)
+    node.reset_connection(settings)
+    assert settings.tracker.locked_id is None and not settings.tracker.tracks
@@ -0,0 +1,61 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2] / "robot_common"))
+from oak_streamer import protocol as proto  # noqa: E402
+from oak_streamer.udp_transport import FrameAssembler, UdpFrameSender  # noqa: E402
+
+
+class _Socket:
+    def __init__(self):
+        self.datagrams = []
+
+    def setblocking(self, flag):
+        pass
+
+    def sendmsg(self, buffers, ancdata, flags, addr):
+        self.datagrams.append(b"".join(bytes(b) for b in buffers))
+
+
+def _frames(n, size=5000):
+    jpegs = [os.urandom(size) for _ in range(n)]
+    sock = _Socket()
+    sender = UdpFrameSender(("127.0.0.1", 1), datagram_size=1000, group=4, sock=sock)
+    per_frame = []
+    for i, jpeg in enumerate(jpegs):
+        start = len(sock.datagrams)
+        sender.send(proto.pack_frame(jpeg, seq=i, capture_us=0, encode_us=0, width=1, height=1))
+        per_frame.append(sock.datagrams[start:])
+    return jpegs, per_frame
+
+
+def test_fragments_reassemble_and_parity_rebuilds_one_loss_per_group():
+    (jpeg,), (datagrams,) = _frames(1)
+    assert len(datagrams) == 6 + 2   # 6 data fragments, parity per 4
+    assert all(len(d) <= 1000 for d in datagrams)
+
+    assembler = FrameAssembler()
+    # Lose fragment 1 (first group) and fragment 5 (the short last one).
+    out = [assembler.add(d) for i, d in enumerate(datagrams) if i not in (1, 5)]
+    body = [b for b in out if b is not None]
+    assert len(body) == 1 and proto.unpack_frame(body[0])[1] == jpeg
+    assert assembler.recovered == 2
+
+
+def test_incomplete_and_late_frames_are_dropped_not_waited_for():
+    jpegs, frames = _frames(3)
+    assembler = FrameAssembler()
+
+    for d in frames[0][:2]:          # frame 1 loses most of its fragments
+        assembler.add(d)
+    bodies = [b for b in map(assembler.add, frames[1]) if b is not None]
+    assert len(bodies) == 1 and proto.unpack_frame(bodies[0])[1] == jpegs[1]
+    assert assembler.incomplete == 1 and not assembler.pending
+
+    late = assembler.late
+    assert all(assembler.add(d) is None for d in frames[0][2:])   # too late now
+    assert assembler.late - late == len(frames[0]) - 2
+    bodies = [b for b in map(assembler.add, reversed(frames[2])) if b is not None]
+    assert len(bodies) == 1 and proto.unpack_frame(bodies[0])[1] == jpegs[2]   # any order
@@ -0,0 +1,264 @@
+"""Flight recorder of the joystick → PLC control path.
+
+Every command the listener accepts, every mixed drive output and brush write
+(with the number of Modbus requests it took, their duration and whether one
+failed) and every safe stop is appended as a fixed-size record to a ring file
+mapped into memory.  Appending is one ``struct.pack_into`` into the map plus
+updating the write counter in the header, a couple of microseconds; the
+kernel writes the pages back, so the recording survives a crash of the node
+(not a power cut).  The file is reused across restarts and the oldest
+records are overwritten once ``capacity`` is reached.
+
+Layout (little endian)::
+
+    header  64 bytes  magic, version, record size, capacity, records written,
+                      time.time() - time.monotonic() of the writer
+    records capacity × RECORD.size
+
+``RECORD`` fields: ``t`` (time.monotonic()), ``kind``, ``flags``, ``forward``,
+``turn``, ``left``/``right`` (D10/D11), ``addr`` (brush coil), ``brush1``,
+``brush2`` (-1 unknown), ``writes`` (Modbus requests), ``modbus_us``,
+``seq`` (operator packet seq), ``latency_ms`` (packet age, -1 unknown).
+
+Command line::
+
+    python3 -m plc_comm.flight_recorder dump [file] [--last N]
+    python3 -m plc_comm.flight_recorder replay [file] [--speed 1] [--max-p99-ms X]
+
+``replay`` feeds the recorded drive and brush records through
+:func:`plc_comm.mixing.mix` and the same skip-if-held write path as the node
+into a :class:`plc_comm.sim_plc.SimulatedPLC`.  It reports outputs that mix
+differently today than when recorded and the Modbus timing, and exits non-zero
+on a mismatch or when ``--max-p99-ms`` is exceeded, so a recording doubles
+as a regression test.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import time
+from typing import List, NamedTuple, Optional, Sequence
+
+HEADER = struct.Struct("<8sHHIQd")
+HEADER_SIZE = 64
+MAGIC = b"PLCFR\x00\x00\x00"
+VERSION = 1
+RECORD = struct.Struct("<dBBhhHHHbbBIIi5x")
+
+COMMAND, DRIVE, BRUSH, SAFE_STOP = 1, 2, 3, 4
+KIND_NAMES = {COMMAND: "command", DRIVE: "drive", BRUSH: "brush", SAFE_STOP: "safe_stop"}
+FLAG_FORCE = 1
+FLAG_ERROR = 2
+FLAG_FOLLOW = 4
+
+DEFAULT_PATH = "/var/tmp/plc_comm_flight.ring"
+_COUNT_OFFSET = 16  # offset of the records-written counter in HEADER
+
+
+class Record(NamedTuple):
+    t: float
+    kind: int
+    flags: int
+    forward: int
+    turn: int
+    left: int
+    right: int
+    addr: int
+    brush1: int
+    brush2: int
+    writes: int
+    modbus_us: int
+    seq: int
+    latency_ms: int
+
+
+class FlightRecorder:
+    """Append records to the ring file at ``path``."""
+
+    def __init__(self, path: str = DEFAULT_PATH, capacity: int = 65536) -> None:
+        self.path = path
+        self.capacity = capacity
+        size = HEADER_SIZE + capacity * RECORD.size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            existing = os.fstat(fd).st_size
+            if existing == size and self._compatible(fd):
+                self.count = struct.unpack_from("<Q", os.pread(fd, 8, _COUNT_OFFSET))[0]
+            else:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+                self.count = 0
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, RECORD.size, capacity, self.count,
+                         time.time() - time.monotonic())
+
+    def _compatible(self, fd: int) -> bool:
+        magic, version, record_size, capacity, _, _ = HEADER.unpack(os.pread(fd, HEADER.size, 0))
+        return (magic, version, record_size, capacity) == (
+            MAGIC, VERSION, RECORD.size, self.capacity)
+
+    @classmethod
+    def from_env(cls) -> Optional["FlightRecorder"]:
+        """``PLC_FLIGHT_RECORDER`` is the ring file path, ``0`` turns recording off."""
+
+        path = os.environ.get("PLC_FLIGHT_RECORDER", DEFAULT_PATH)
+        if path in ("", "0"):
+            return None
+        try:
+            return cls(path, int(os.environ.get("PLC_FLIGHT_RECORDS", "65536")))
+        except OSError as e:
+            print(f"⚠️ Uçuş kaydı açılamadı ({path}): {e}")
+            return None
+
+    def append(self, kind: int, flags: int = 0, forward: int = 0, turn: int = 0,
+               left: int = 0, right: int = 0, addr: int = 0, brush1: int = -1,
+               brush2: int = -1, writes: int = 0, modbus_s: float = 0.0, seq: int = 0,
+               latency_ms: int = -1) -> None:
+        offset = HEADER_SIZE + (self.count % self.capacity) * RECORD.size
+        RECORD.pack_into(
+            self._map, offset, time.monotonic(), kind, flags, forward, turn, left, right,
+            addr, brush1, brush2, writes, int(modbus_s * 1e6), seq & 0xFFFFFFFF,
+            max(-(1 << 31), min(latency_ms, (1 << 31) - 1)),
+        )
+        # The counter is bumped after the record, so a reader never sees a torn one.
+        self.count += 1
+        struct.pack_into("<Q", self._map, _COUNT_OFFSET, self.count)
+
+    def close(self) -> None:
+        self._map.close()
+
+
+def read_records(path: str = DEFAULT_PATH) -> List[Record]:
+    """All records of a ring file, oldest first."""
+
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, record_size, capacity, count, _ = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"{path}: not a flight recorder file")
+    first = max(0, count - capacity)
+    return [Record(*RECORD.unpack_from(data, HEADER_SIZE + (i % capacity) * RECORD.size))
+            for i in range(first, count)]
+
+
+def wall_clock_offset(path: str = DEFAULT_PATH) -> float:
+    """Add to a record's ``t`` to get ``time.time()`` (of the last writer)."""
+
+    with open(path, "rb") as f:
+        return HEADER.unpack(f.read(HEADER.size))[5]
+
+
+def _percentiles(values: Sequence[float]) -> dict:
+    if not values:
+        return {"p50": None, "p99": None, "max": None}
+    ordered = sorted(values)
+    return {"p50": round(ordered[len(ordered) // 2], 3),
+            "p99": round(ordered[min(len(ordered) - 1, len(ordered) * 99 // 100)], 3),
+            "max": round(ordered[-1], 3)}
+
+
+def replay(records: Sequence[Record], client, speed: float = 0.0) -> dict:
+    """Feed drive/brush records through mixing and the write path into ``client``.
+
+    ``speed`` scales the recorded pacing (1 = real time); 0 replays as fast
+    as the PLC answers.
+    """
+
+    from plc_comm.mixing import COIL_DRIVE, COIL_TURN, REG_LEFT, mix
+    from plc_comm.readback import PlcState, write_values
+
+    state = PlcState()
+    mismatches = []
+    replayed_ms, recorded_ms = [], []
+    writes = recorded_writes = errors = 0
+    actions = [r for r in records if r.kind in (DRIVE, BRUSH)]
+    t_start = time.perf_counter()
+    for rec in actions:
+        if speed > 0:
+            delay = t_start + (rec.t - actions[0].t) / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        if rec.kind == DRIVE:
+            drive_coils, turn_coils, speeds = mix(rec.forward, rec.turn)
+            if speeds != [rec.left, rec.right]:
+                mismatches.append({"t": rec.t, "forward": rec.forward, "turn": rec.turn,
+                                   "recorded": [rec.left, rec.right], "mixed": speeds})
+            blocks = [("coil", COIL_DRIVE, drive_coils), ("coil", COIL_TURN, turn_coils),
+                      ("reg", REG_LEFT, speeds)]
+        else:
+            blocks = [("coil", rec.addr, [bool(rec.brush1)])]
+        t0 = time.perf_counter()
+        for kind, start, values in blocks:
+            wrote, res = write_values(client, state, kind, start, values,
+                                      force=bool(rec.flags & FLAG_FORCE))
+            writes += wrote
+            errors += res is not None and res.isError()
+        replayed_ms.append((time.perf_counter() - t0) * 1000)
+        recorded_ms.append(rec.modbus_us / 1000)
+        recorded_writes += rec.writes
+    return {
+        "records": len(records),
+        "replayed": len(actions),
+        "mix_mismatches": len(mismatches),
+        "mismatch_examples": mismatches[:10],
+        "modbus_writes": writes,
+        "recorded_modbus_writes": recorded_writes,
+        "modbus_errors": errors,
+        "modbus_ms": _percentiles(replayed_ms),
+        "recorded_modbus_ms": _percentiles(recorded_ms),
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="PLC uçuş kaydı")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_dump = sub.add_parser("dump", help="print the records as JSON lines")
+    p_dump.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    p_dump.add_argument("--last", type=int, help="only the newest N records")
+    p_replay = sub.add_parser("replay", help="replay into a simulated PLC")
+    p_replay.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    p_replay.add_argument("--speed", type=float, default=0.0,
+                          help="1 = recorded pacing, 0 = as fast as possible")
+    p_replay.add_argument("--plc-delay-ms", type=float, default=0.0)
+    p_replay.add_argument("--max-p99-ms", type=float,
+                          help="fail when the replayed Modbus p99 exceeds this")
+    args = parser.parse_args(argv)
+
+    records = read_records(args.path)
+    if args.cmd == "dump":
+        offset = wall_clock_offset(args.path)
+        for rec in records[-args.last:] if args.last else records:
+            row = rec._asdict()
+            row["kind"] = KIND_NAMES.get(rec.kind, rec.kind)
+            row["wall"] = round(rec.t + offset, 3)
+            print(json.dumps(row))
+        return 0
+
+    from pymodbus.client import ModbusTcpClient
+
+    from plc_comm.sim_plc import SimulatedPLC
+
+    plc = SimulatedPLC(response_delay_s=args.plc_delay_ms / 1000).start()
+    client = ModbusTcpClient("127.0.0.1", port=plc.port)
+    try:
+        client.connect()
+        result = replay(records, client, args.speed)
+    finally:
+        client.close()
+        plc.stop()
+    print(json.dumps(result, indent=2))
+    failed = result["mix_mismatches"] > 0
+    if args.max_p99_ms is not None and (result["modbus_ms"]["p99"] or 0) > args.max_p99_ms:
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,126 @@
+"""Person-follow controller: tracked target → joystick-style drive command.
+
+:class:`FollowController` turns the newest :class:`robot_common.target.Target`
+into a ``(forward, turn)`` pair in the joystick range (-100…100) so that the
+result goes through the same ``process_joystick`` mixing and Modbus writes as
+the phone's stick.  It is evaluated at a fixed rate by
+:class:`plc_comm.udp_listener_node.UDPJoystickListener`; every tick produces a
+command from whatever target is available at that moment, never waiting for
+a new one:
+
+* the target is older than ``max_age_s`` (camera stalled, channel silent) →
+  stop.  This is the update deadline: a command never outlives the frame it
+  was computed from by more than ``max_age_s``;
+* target locked → turn proportional to the horizontal offset of the box
+  centre (with a dead band) and drive forward proportional to the distance
+  beyond ``follow_distance_m``; without a depth measurement the robot only
+  turns, and the camera's stop flag always zeroes ``forward``;
+* target lost or searching → rotate slowly towards the side it was last seen
+  for ``search_s``, then stop.
+
+Speeding up is slew limited per tick; slowing down is immediate.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+from robot_common.target import TRACK_LOCKED, Target
+
+
+def _clamp(value: float, limit: float) -> int:
+    return int(max(-limit, min(limit, value)))
+
+
+class FollowController:
+    def __init__(
+        self,
+        rate_hz: float = 20.0,
+        follow_distance_m: float = 2.0,
+        max_age_s: float = 0.3,
+        max_forward: int = 40,
+        max_turn: int = 40,
+        kp_forward: float = 30.0,   # command per metre of distance error
+        kp_turn: float = 60.0,      # command per unit of centre offset (-1…1)
+        dead_band: float = 0.1,
+        forward_step: int = 5,      # max forward increase per tick
+        search_turn: int = 20,
+        search_s: float = 1.0,
+    ) -> None:
+        self.period_s = 1.0 / rate_hz
+        self.follow_distance_m = follow_distance_m
+        self.max_age_s = max_age_s
+        self.max_forward = max_forward
+        self.max_turn = max_turn
+        self.kp_forward = kp_forward
+        self.kp_turn = kp_turn
+        self.dead_band = dead_band
+        self.forward_step = forward_step
+        self.search_turn = search_turn
+        self.search_s = search_s
+        self.forward = 0
+        self._last_cx = 0.0
+        self._last_locked = None
+        self._last_tick = None
+        # Metrics
+        self.ticks = 0
+        self.stale = 0
+        self.late_ticks = 0
+        self.max_late_ms = 0.0
+
+    def command(self, target: Optional[Target], now: float) -> Tuple[int, int]:
+        """The ``(forward, turn)`` command for the tick at ``now`` (monotonic s)."""
+
+        self._account(now)
+        if target is None or target.age_s(now) > self.max_age_s:
+            self.stale += target is not None
+            return self._drive(0, 0)
+
+        if target.state == TRACK_LOCKED:
+            self._last_cx = target.cx
+            self._last_locked = now
+            offset = target.cx if abs(target.cx) > self.dead_band else 0.0
+            turn = _clamp(self.kp_turn * offset, self.max_turn)
+            forward = 0
+            if target.distance_m is not None and not target.stop:
+                error = target.distance_m - self.follow_distance_m
+                forward = max(0, _clamp(self.kp_forward * error, self.max_forward))
+            return self._drive(forward, turn)
+
+        if self._last_locked is not None and now - self._last_locked < self.search_s:
+            turn = self.search_turn if self._last_cx >= 0 else -self.search_turn
+            return self._drive(0, turn)
+        return self._drive(0, 0)
+
+    def _drive(self, forward: int, turn: int) -> Tuple[int, int]:
+        if forward > self.forward:
+            forward = min(forward, self.forward + self.forward_step)
+        self.forward = forward
+        return forward, turn
+
+    def _account(self, now: float) -> None:
+        self.ticks += 1
+        if self._last_tick is not None:
+            late = now - self._last_tick - self.period_s
+            if late > self.period_s / 2:
+                self.late_ticks += 1
+            self.max_late_ms = max(self.max_late_ms, late * 1000)
+        self._last_tick = now
+
+    def hold(self) -> None:
+        """The last command was not applied; ramp up from standstill next time."""
+        self.forward = 0
+
+    def reset(self) -> None:
+        """Forget the target history, e.g. when follow mode is switched off."""
+        self.forward = 0
+        self._last_locked = None
+        self._last_tick = None
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "ticks": self.ticks,
+            "stale": self.stale,
+            "late_ticks": self.late_ticks,
+            "max_late_ms": round(self.max_late_ms, 1),
+        }
@@ -0,0 +1,49 @@
+"""Joystick → Delta PLC command mixing and the PLC address map.
+
+``forward`` and ``turn`` are the phone's stick values (-100…100).  Driving
+sets the drive direction coils (2059 forward, 2060 reverse) and slows the
+inner wheel by ``|turn|`` percent; standing still with a turn sets the turn
+direction coils (2051 right, 2052 left) and spins in place at ``|turn|``.
+D10/D11 are the left/right speeds in percent.
+"""
+
+from __future__ import annotations
+
+from typing import List, Tuple
+
+COIL_TURN = 2048 + 3     # 2051/2052: sağ/sol dönüş
+COIL_DRIVE = 2048 + 11   # 2059/2060: ileri/geri
+COIL_BRUSH1 = 2068
+COIL_BRUSH2 = 2069
+REG_LEFT = 10
+REG_RIGHT = 11
+
+
+def mix(forward: int, turn: int) -> Tuple[List[bool], List[bool], List[int]]:
+    """``(drive coils, turn coils, [D10, D11])`` for one stick position."""
+
+    left = right = 0
+    base_speed = min(max(abs(forward), 0), 100)
+    turn_coils = [False, False]
+    if forward != 0:
+        drive_coils = [True, False] if forward > 0 else [False, True]
+        if turn > 0:
+            left = base_speed
+            right = int(base_speed * (1 - abs(turn) / 100))
+        elif turn < 0:
+            right = base_speed
+            left = int(base_speed * (1 - abs(turn) / 100))
+        else:
+            left = right = base_speed
+    else:
+        drive_coils = [False, False]
+        if turn > 0:
+            turn_coils = [True, False]
+            left = right = min(abs(turn), 100)
+        elif turn < 0:
+            turn_coils = [False, True]
+            left = right = min(abs(turn), 100)
+
+    left = max(0, min(100, left))
+    right = max(0, min(100, right))
+    return drive_coils, turn_coils, [left, right]
@@ -0,0 +1,187 @@
+"""Cached PLC state with periodic bulk read-back.
+
+:class:`PlcState` mirrors the coils and registers ``udp_listener_node`` drives.
+It is updated two ways:
+
+* write-through: every successful write stores what was written;
+* read-back: :class:`PlcReader` periodically fetches the watched addresses
+  and overwrites the cache with what the PLC actually holds.
+
+Writes consult the cache and are skipped when the PLC already holds the
+value (see :meth:`PlcState.holds`).  The read-back also catches a PLC that
+was power-cycled or changed by someone else: the listener compares the fresh
+snapshot with what it last commanded and rewrites the difference.
+
+The watched addresses are grouped into as few ``read_coils`` /
+``read_holding_registers`` requests as possible by :func:`plan_blocks`: gaps
+of up to ``max_gap`` addresses are read along rather than split, since one
+Modbus round trip costs far more than a few extra bits.  With the default map
+a read-back is two requests: coils 2051…2069 and registers D10…D11.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from plc_comm.mixing import COIL_BRUSH1, COIL_BRUSH2, COIL_DRIVE, COIL_TURN, REG_LEFT, REG_RIGHT
+
+WATCHED_COILS = (COIL_TURN, COIL_TURN + 1, COIL_DRIVE, COIL_DRIVE + 1, COIL_BRUSH1, COIL_BRUSH2)
+WATCHED_REGISTERS = (REG_LEFT, REG_RIGHT)
+
+# Modbus limits per request (read coils / read holding registers).
+MAX_COILS = 2000
+MAX_REGISTERS = 125
+
+
+def plan_blocks(
+    addresses: Iterable[int], max_gap: int = 16, max_count: int = MAX_REGISTERS,
+) -> List[Tuple[int, int]]:
+    """Group ``addresses`` into ``(start, count)`` contiguous read requests."""
+
+    blocks: List[List[int]] = []
+    for address in sorted(set(addresses)):
+        if blocks:
+            start, end = blocks[-1]
+            if address - end - 1 <= max_gap and address - start < max_count:
+                blocks[-1][1] = address
+                continue
+        blocks.append([address, address])
+    return [(start, end - start + 1) for start, end in blocks]
+
+
+class PlcState:
+    """Last known value of each coil and register, and when it was confirmed."""
+
+    def __init__(self, clock=time.monotonic) -> None:
+        self.clock = clock
+        self.coils: Dict[int, bool] = {}
+        self.registers: Dict[int, int] = {}
+        self.read_t: Optional[float] = None   # last successful read-back
+
+    def store_coils(self, start: int, values: Sequence) -> None:
+        for i, v in enumerate(values):
+            self.coils[start + i] = bool(v)
+
+    def store_registers(self, start: int, values: Sequence[int]) -> None:
+        for i, v in enumerate(values):
+            self.registers[start + i] = int(v)
+
+    def holds(self, kind: str, start: int, values: Sequence) -> bool:
+        """``True`` when every value is already known to be in the PLC."""
+
+        table = self.coils if kind == "coil" else self.registers
+        cast = bool if kind == "coil" else int
+        return all(table.get(start + i) == cast(v) for i, v in enumerate(values))
+
+    def invalidate(self) -> None:
+        """Forget everything, e.g. after the Modbus connection was lost."""
+        self.coils.clear()
+        self.registers.clear()
+        self.read_t = None
+
+    def snapshot(self) -> Dict[str, object]:
+        c, r = self.coils.get, self.registers.get
+        drive = "stop"
+        if c(COIL_DRIVE):
+            drive = "forward"
+        elif c(COIL_DRIVE + 1):
+            drive = "reverse"
+        turn = "none"
+        if c(COIL_TURN):
+            turn = "right"
+        elif c(COIL_TURN + 1):
+            turn = "left"
+        return {
+            "D10": r(REG_LEFT),
+            "D11": r(REG_RIGHT),
+            "drive": drive,
+            "turn": turn,
+            "brush1": c(COIL_BRUSH1),
+            "brush2": c(COIL_BRUSH2),
+            "age_ms": None if self.read_t is None
+            else int((self.clock() - self.read_t) * 1000),
+        }
+
+
+def write_values(client, state: PlcState, kind: str, start: int, values: Sequence,
+                 force: bool = False):
+    """Write a coil/register block unless ``state`` says the PLC already holds it.
+
+    Returns ``(wrote, response)``; ``response`` is ``None`` when skipped.  The
+    state is updated on success (write-through).
+    """
+
+    if not force and state.holds(kind, start, values):
+        return False, None
+    if kind == "coil":
+        if len(values) == 1:
+            res = client.write_coil(start, bool(values[0]))
+        else:
+            res = client.write_coils(start, list(values))
+    else:
+        res = client.write_registers(start, list(values))
+    if res is None or not res.isError():
+        if kind == "coil":
+            state.store_coils(start, values)
+        else:
+            state.store_registers(start, values)
+    return True, res
+
+
+class PlcReader:
+    """Read the watched addresses into a :class:`PlcState` in bulk."""
+
+    def __init__(
+        self,
+        state: PlcState,
+        coils: Iterable[int] = WATCHED_COILS,
+        registers: Iterable[int] = WATCHED_REGISTERS,
+        max_gap: int = 16,
+    ) -> None:
+        self.state = state
+        self.coil_blocks = plan_blocks(coils, max_gap, MAX_COILS)
+        self.register_blocks = plan_blocks(registers, max_gap, MAX_REGISTERS)
+        # Metrics
+        self.reads = 0
+        self.requests = 0
+        self.errors = 0
+        self.read_ms = 0.0
+
+    def read(self, client) -> bool:
+        """Refresh the state; ``False`` (state untouched) when any request failed."""
+
+        t0 = time.perf_counter()
+        coils, registers = [], []
+        for start, count in self.coil_blocks:
+            self.requests += 1
+            res = client.read_coils(start, count=count)
+            if res is None or res.isError():
+                self.errors += 1
+                return False
+            coils.append((start, res.bits[:count]))  # bits are padded to a byte
+        for start, count in self.register_blocks:
+            self.requests += 1
+            res = client.read_holding_registers(start, count=count)
+            if res is None or res.isError():
+                self.errors += 1
+                return False
+            registers.append((start, res.registers[:count]))
+        # Only a complete read replaces the cache, so it is never half old, half new.
+        for start, values in coils:
+            self.state.store_coils(start, values)
+        for start, values in registers:
+            self.state.store_registers(start, values)
+        self.state.read_t = self.state.clock()
+        self.reads += 1
+        self.read_ms = (time.perf_counter() - t0) * 1000
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "reads": self.reads,
+            "requests": self.requests,
+            "errors": self.errors,
+            "blocks": len(self.coil_blocks) + len(self.register_blocks),
+            "read_ms": round(self.read_ms, 2),
+        }
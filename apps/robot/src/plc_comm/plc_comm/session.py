@@ -0,0 +1,196 @@
+"""Operator sessions of the joystick listener.
+
+Every phone/tablet identifies itself with a session id (``sid``, random per
+app start) and numbers its packets (``seq``, strictly increasing within the
+session).  :class:`SessionTable` decides per packet:
+
+``CONTROL``
+    from the session holding the lease: the listener applies it;
+``OBSERVE``
+    from any other session: it only keeps that session alive (it still gets
+    ``plc_state`` replies), its stick values are ignored;
+``STALE``
+    ``seq`` not above the session's last one (delayed duplicate or
+    reordered): dropped before anything else looks at it;
+``INVALID``
+    not a JSON object, or a ``seq`` that is not an integer: counted and
+    dropped without creating a session.
+
+The lease is renewed by every accepted packet of the holder and lapses after
+``lease_s`` of silence.  While nobody holds a live lease the next session
+that sends a control packet gets it implicitly, which is how a single app
+works without knowing about sessions (a ``takeover`` then simply claims it,
+even from an observer).  Taking over a live lease is an explicit handshake:
+
+1. the requester sends ``"takeover": 1`` → it is answered ``pending`` and the
+   holder gets ``takeover_request`` with the requester's ``sid`` in ``by``;
+2. the holder sends ``"release": 1`` → the requester is ``granted`` and the
+   old holder ``released``; it should mark its packets ``"observe": 1`` from
+   then on.  A holder that goes silent loses the lease after ``lease_s``
+   instead, and is told ``revoked`` when someone else takes it.
+
+Replies are ``{"type": "session", "event": ..., "sid": ..., "holder": ...}``
+datagrams to the session's address.  Packets without ``sid`` (older apps)
+form a session per source address and skip ordering when they carry no
+``seq``.  Per-session state is a ``__slots__`` object in a dict; the cost per
+packet is a lookup and an integer compare whatever the number of observers.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, List, Mapping, Optional, Tuple
+
+CONTROL = "control"
+OBSERVE = "observe"
+STALE = "stale"
+INVALID = "invalid"
+
+Reply = Tuple[tuple, dict]
+
+# Heartbeat client states of commcheck.heartbeat, best first.
+_LINK_RANK = {"ok": 0, "degraded": 1, "legacy": 2, "idle": 2, "lost": 3}
+
+
+class Session:
+    __slots__ = ("sid", "addr", "last_seq", "last_seen", "dropped")
+
+    def __init__(self, sid: str, addr: tuple) -> None:
+        self.sid = sid
+        self.addr = addr
+        self.last_seq: Optional[int] = None
+        self.last_seen = 0.0
+        self.dropped = 0
+
+
+class SessionTable:
+    def __init__(self, lease_s: float = 1.0, ttl_s: float = 30.0,
+                 clock=time.monotonic) -> None:
+        self.lease_s = lease_s
+        self.ttl_s = ttl_s
+        self.clock = clock
+        self.sessions: Dict[str, Session] = {}
+        self.holder: Optional[Session] = None
+        self.pending: Optional[Session] = None
+        # Metrics
+        self.stale = 0
+        self.invalid = 0
+        self.takeovers = 0
+
+    def holder_active(self, now: float) -> bool:
+        return self.holder is not None and now - self.holder.last_seen <= self.lease_s
+
+    def _reply(self, session: Session, event: str) -> Reply:
+        return session.addr, {
+            "type": "session", "event": event, "sid": session.sid,
+            "holder": self.holder.sid if self.holder is not None else None,
+            "lease_ms": int(self.lease_s * 1000),
+        }
+
+    def _grant(self, session: Session) -> List[Reply]:
+        replies = []
+        previous = self.holder
+        if previous is not None and previous is not session:
+            self.takeovers += 1
+        self.holder = session
+        self.pending = None
+        if previous is not None and previous is not session:
+            replies.append(self._reply(previous, "revoked"))
+        replies.append(self._reply(session, "granted"))
+        return replies
+
+    def handle(self, payload: dict, addr: tuple,
+               now: Optional[float] = None) -> Tuple[str, List[Reply]]:
+        """Classify one packet; returns the verdict and the replies to send."""
+
+        if not isinstance(payload, dict):
+            self.invalid += 1
+            return INVALID, []
+        seq = payload.get("seq")
+        if seq is not None and (isinstance(seq, bool) or not isinstance(seq, int)):
+            self.invalid += 1
+            return INVALID, []
+        now = self.clock() if now is None else now
+        sid = str(payload.get("sid") or f"{addr[0]}:{addr[1]}")
+        session = self.sessions.get(sid)
+        if session is None:
+            session = self.sessions[sid] = Session(sid, addr)
+        if seq is not None:
+            if session.last_seq is not None and seq <= session.last_seq:
+                session.dropped += 1
+                self.stale += 1
+                return STALE, []
+            session.last_seq = seq
+        session.addr = addr
+        was_active = self.holder_active(now)
+        session.last_seen = now
+
+        if session is self.holder:
+            if payload.get("release"):
+                self.holder = None
+                pending = self.pending
+                if pending is not None and now - pending.last_seen <= self.lease_s:
+                    return OBSERVE, self._grant(pending) + [self._reply(session, "released")]
+                self.pending = None
+                return OBSERVE, [self._reply(session, "released")]
+            if was_active:
+                return CONTROL, []
+            return CONTROL, [self._reply(session, "granted")]  # lease had lapsed
+
+        if not was_active and (payload.get("takeover") or not payload.get("observe")):
+            return CONTROL, self._grant(session)   # nobody to ask: claim the free lease
+        if payload.get("takeover") and self.pending is not session:
+            self.pending = session
+            holder_addr, request = self._reply(self.holder, "takeover_request")
+            request["by"] = session.sid
+            return OBSERVE, [(holder_addr, request), self._reply(session, "pending")]
+        return OBSERVE, []
+
+    def expire(self, now: Optional[float] = None) -> None:
+        """Forget sessions silent for ``ttl_s``; call now and then, not per packet."""
+
+        now = self.clock() if now is None else now
+        for sid, session in list(self.sessions.items()):
+            if session is not self.holder and now - session.last_seen > self.ttl_s:
+                del self.sessions[sid]
+        if self.pending is not None and now - self.pending.last_seen > self.lease_s:
+            self.pending = None
+
+    def addresses(self) -> List[tuple]:
+        return [s.addr for s in self.sessions.values()]
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "sessions": len(self.sessions),
+            "holder": self.holder.sid if self.holder is not None else None,
+            "stale": self.stale,
+            "invalid": self.invalid,
+            "takeovers": self.takeovers,
+        }
+
+
+def link_states_by_ip(snapshot: Mapping) -> Dict[str, str]:
+    """Best heartbeat state per client IP of a ``link_quality`` snapshot.
+
+    A tablet reconnecting to the heartbeat port may briefly have two
+    connections; the live one speaks for it.
+    """
+
+    states: Dict[str, str] = {}
+    for client in snapshot.get("clients") or ():
+        ip = str(client.get("peer", "")).rpartition(":")[0]
+        state = client.get("state", "legacy")
+        if ip not in states or _LINK_RANK.get(state, 2) < _LINK_RANK.get(states[ip], 2):
+            states[ip] = state
+    return states
+
+
+def holder_link_lost(states: Mapping[str, str], holder: Optional[Session]) -> bool:
+    """``True`` when the heartbeat of the device holding the lease is lost.
+
+    Only the controlling tablet's link gates the joystick: an observer that
+    goes quiet must not stop the operator.  Without a holder, or when the
+    holder has no heartbeat connection that echoes, nothing is gated here.
+    """
+
+    return holder is not None and states.get(holder.addr[0]) == "lost"
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Local Modbus TCP server emulating the Delta DVP-SE register map.
+
+Used by the control-path benchmarks and verification harnesses instead of the
+real PLC.  The map covers what ``udp_listener_node`` touches:
+
+* coils 2051/2052 (turn direction, ``2048 + 3``), 2059/2060 (drive direction,
+  ``2048 + 11``), 2068/2069 (brushes)
+* holding registers D10/D11 (left/right speed)
+* with ``watchdog=True``, the heartbeat contract of :mod:`plc_comm.watchdog`
+  (D20/D21), scanned every ``scan_s``; each trip is timestamped in
+  ``watchdog_trips``
+
+Every write is recorded with a ``time.perf_counter()`` timestamp so callers
+can measure command-to-register latency, and every request is counted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from pymodbus.datastore import ModbusSequentialDataBlock, ModbusServerContext
+
+try:
+    from pymodbus.datastore import ModbusSlaveContext as _DeviceContext
+except ImportError:  # pragma: no cover - renamed in newer pymodbus releases
+    from pymodbus.datastore import ModbusDeviceContext as _DeviceContext
+from pymodbus.server import StartAsyncTcpServer
+
+from plc_comm.mixing import (  # noqa: F401 - re-exported for the harnesses
+    COIL_BRUSH1, COIL_BRUSH2, COIL_DRIVE, COIL_TURN, REG_LEFT, REG_RIGHT,
+)
+from plc_comm.watchdog import REG_HEARTBEAT, REG_WATCHDOG_MS, PlcWatchdog
+
+COIL_COUNT = 4096
+REGISTER_COUNT = 256
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _RecordingBlock(ModbusSequentialDataBlock):
+    def __init__(self, plc: "SimulatedPLC", kind: str, size: int) -> None:
+        super().__init__(0, [0] * size)
+        self._plc = plc
+        self._kind = kind
+
+    def getValues(self, address, count=1):  # noqa: N802 - pymodbus API
+        self._plc.requests += 1
+        return super().getValues(address, count)
+
+    def setValues(self, address, values):  # noqa: N802 - pymodbus API
+        super().setValues(address, values)
+        if not isinstance(values, list):
+            values = [values]
+        self._plc.record(self._kind, address - self._plc.offset, values)
+
+
+class SimulatedPLC:
+    """Modbus TCP server on ``127.0.0.1`` running on a background thread."""
+
+    def __init__(self, port: Optional[int] = None, response_delay_s: float = 0.0,
+                 watchdog: bool = False, scan_s: float = 0.005) -> None:
+        self.port = port or free_port()
+        self.response_delay_s = response_delay_s
+        self.watchdog = PlcWatchdog() if watchdog else None
+        self.scan_s = scan_s
+        self.watchdog_trips: List[float] = []
+        self.requests = 0
+        self.writes: List[Tuple[float, str, int, List[int]]] = []
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.coils = _RecordingBlock(self, "coil", COIL_COUNT)
+        self.registers = _RecordingBlock(self, "reg", REGISTER_COUNT)
+        try:
+            device = _DeviceContext(co=self.coils, hr=self.registers, zero_mode=True)
+            self.offset = 0
+        except TypeError:  # zero_mode removed: the context shifts addresses by one
+            device = _DeviceContext(co=self.coils, hr=self.registers)
+            self.offset = 1
+        self.context = ModbusServerContext(device, single=True)
+
+    def record(self, kind: str, address: int, values: List[int]) -> None:
+        if self.response_delay_s:
+            time.sleep(self.response_delay_s)
+        with self._lock:
+            self.requests += 1
+            self.writes.append((time.perf_counter(), kind, address, [int(v) for v in values]))
+
+    def coil(self, address: int) -> bool:
+        return bool(self.coils.values[address + self.offset])
+
+    def register(self, address: int) -> int:
+        return int(self.registers.values[address + self.offset])
+
+    def writes_since(self, t: float) -> List[Tuple[float, str, int, List[int]]]:
+        with self._lock:
+            return [w for w in self.writes if w[0] >= t]
+
+    def start(self, timeout_s: float = 5.0) -> "SimulatedPLC":
+        threading.Thread(target=self._run, name="sim-plc", daemon=True).start()
+        deadline = time.monotonic() + timeout_s
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=0.2).close()
+                return self
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError(f"simulated PLC did not start on port {self.port}")
+
+    def _force_off(self) -> None:
+        # Straight into the data blocks: these are the PLC's own outputs, not Modbus writes.
+        o = self.offset
+        ModbusSequentialDataBlock.setValues(self.registers, REG_LEFT + o, [0, 0])
+        for coil in (COIL_TURN, COIL_DRIVE, COIL_BRUSH1):
+            ModbusSequentialDataBlock.setValues(self.coils, coil + o, [False, False])
+
+    async def _scan(self) -> None:
+        while True:
+            tripped = self.watchdog.tripped
+            if self.watchdog.scan(time.perf_counter(), self.register(REG_HEARTBEAT),
+                                  self.register(REG_WATCHDOG_MS)):
+                self._force_off()
+                if not tripped:
+                    self.watchdog_trips.append(time.perf_counter())
+            await asyncio.sleep(self.scan_s)
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        if self.watchdog is not None:
+            self._loop.create_task(self._scan())
+        self._loop.run_until_complete(
+            StartAsyncTcpServer(context=self.context, address=("127.0.0.1", self.port))
+        )
+
+    def stop(self) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulated Delta PLC (Modbus TCP)")
+    parser.add_argument("--port", type=int, default=5020)
+    parser.add_argument("--watchdog", action="store_true", help="emulate the D20 watchdog")
+    args = parser.parse_args()
+    plc = SimulatedPLC(args.port, watchdog=args.watchdog).start()
+    print(f"🧪 Simüle PLC dinleniyor: 127.0.0.1:{plc.port}")
+    try:
+        while True:
+            time.sleep(1.0)
+            print(f"D10={plc.register(REG_LEFT)} D11={plc.register(REG_RIGHT)} "
+                  f"istek={plc.requests}")
+    except KeyboardInterrupt:
+        plc.stop()
+
+
+if __name__ == "__main__":
+    main()
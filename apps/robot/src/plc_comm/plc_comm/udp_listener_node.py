@@ -2,27 +2,97 @@
 """
 UDP üzerinden joystick ve fırça verilerini alıp, Delta PLC'ye Modbus TCP ile gönderen ROS2 Node.
 Bağlantı koptuğunda tekrar bağlantı bekler, terminalde bağlantı durumunu açıkça yazar.
+
+Takip modu (``follow``, ``PLC_FOLLOW=1`` veya pakette ``"follow": 1``): kamera
+düğümünün takip ettiği kişi robot_common.target kanalından okunur ve sabit
+hızda plc_comm.follow ile joystick komutuna çevrilip aynı process_joystick
+karıştırmasından geçirilir.  Elle joystick girişi her zaman önceliklidir; takip
+yalnızca mobil uygulama bağlıyken ve heartbeat varken çalışır.
+
+PLC durumu (plc_comm.readback) ``PLC_READBACK_HZ`` hızında toplu okunur; önbellek
+gereksiz yazmaları atlar, komutla uyuşmayan değerleri yeniden yazar ve
+``plc_state`` topic'ine ve bağlı tüm oturumlara (telefonlar) yayınlanır.
+
+Birden fazla tablet bağlanabilir: sürüşü yalnızca kirayı tutan oturum yönetir,
+eski/yinelenen paketler oturum sırası (``seq``) ile atılır, devir açık bir
+el sıkışmayla yapılır (plc_comm.session).
+
+Her komut, karıştırma çıktısı ve Modbus sonucu bellek eşlemeli bir halka
+dosyaya yazılır (``PLC_FLIGHT_RECORDER``, plc_comm.flight_recorder); kayıt
+``python3 -m plc_comm.flight_recorder replay`` ile simüle PLC'de tekrar oynatılır.
+
+PLC adresi/portu, Modbus zaman aşımı, UDP portu ve gecikme sınırı
+robot_common.config dosyasının ``plc`` bölümünden okunur; dosya değişince
+yeni değerler ana döngünün başında toplu uygulanır (yeni UDP portu
+açılamazsa ya da yeni PLC yanıt vermezse eski değerlere geri dönülür).
+
+PLC bekçisi (plc_comm.watchdog): ayrı bir iş parçacığı ve Modbus bağlantısı
+``heartbeat_hz`` hızında D20'yi artırır, ama yalnızca ana döngü ilerlediği
+sürece.  Düğüm bir Modbus çağrısında takılır ya da çökerse D20 değişmez ve
+PLC programı ``watchdog_ms`` sonra D10/D11'i ve yön/fırça bobinlerini sıfırlar.
 """
 
 import rclpy
 from rclpy.node import Node
+from std_msgs.msg import String
+import os
 import time
 import socket
 import json
-from pymodbus.client import ModbusTcpClient
+
+from robot_common import instrumentation as instr
+from robot_common import lazy, liveness
+from robot_common.config import ConfigWatcher
+from robot_common.target import TargetReceiver
+
+from plc_comm.follow import FollowController
+from plc_comm.mixing import COIL_BRUSH1, COIL_BRUSH2, COIL_DRIVE, COIL_TURN, REG_LEFT, mix
+from plc_comm.flight_recorder import (
+    BRUSH, COMMAND, DRIVE, FLAG_ERROR, FLAG_FOLLOW, FLAG_FORCE, SAFE_STOP, FlightRecorder,
+)
+from plc_comm.readback import PlcReader, PlcState, write_values
+from plc_comm.session import CONTROL, SessionTable, holder_link_lost, link_states_by_ip
+from plc_comm.watchdog import HeartbeatWriter
+
+# pymodbus yalnızca ilk Modbus bağlantısında (veya arka plan ısınmasında) yüklenir.
+modbus_client = lazy.LazyModule("pymodbus.client")
+
+# Elle girişten sonra takibin devralmadan önce beklediği süre.
+MANUAL_HOLD_S = 0.5
+
+# pymodbus'un varsayılanı; bir Modbus çağrısının en uzun süresi (canlılık sınırı)
+# buna bağlı olduğundan açıkça verilir: modbus_timeout_s × (MODBUS_RETRIES + 1).
+MODBUS_RETRIES = 3
+
 
 class UDPJoystickListener(Node):
-    def __init__(self):
+    def __init__(self, udp_port=None, plc_ip=None, plc_port=None,
+                 follow=False, follow_rate_hz=20.0, readback_hz=5.0):
         super().__init__('udp_listener_node')
-        self.plc_ip = '192.168.1.5'
-        self.plc_port = 502
-        self.modbus_timeout = 1.0
+        # Verilen argümanlar yapılandırma dosyasının önüne geçer.
+        overrides = {k: v for k, v in (("udp_port", udp_port), ("ip", plc_ip),
+                                       ("port", plc_port)) if v is not None}
+        self.config = ConfigWatcher("plc", self.apply_config, overrides=overrides,
+                                    log=self.get_logger().info)
+        cfg = self.config.current
+        self.plc_ip = cfg.ip
+        self.plc_port = cfg.port
+        self.modbus_timeout = cfg.modbus_timeout_s
+        self.max_latency_ms = cfg.max_latency_ms
+        instr.gauge("config_plc", self.config.stats)
 
         self.udp_ip = "0.0.0.0"
-        self.udp_port = 8888
+        self.udp_port = cfg.udp_port
 
         self.is_connected = True
         self.timeout_counter = 0
+        # Güvenli duruş bir kez yazılır; bir sonraki geçerli komuta kadar tekrarlanmaz
+        # (aksi halde her döngüde uçuş kaydını dolduruyordu).
+        self._stopped = False
+
+        # Denetçiye canlılık: döngü ilerledikçe ya da süresi sınırlı bir Modbus
+        # çağrısının içindeyken ayrı bir iş parçacığı atar (PLC erişilemezken de).
+        self.loop_monitor = liveness.LoopMonitor(stall_s=1.0).start()
 
         self.last_forward = 0
         self.last_turn = 0
@@ -32,19 +102,65 @@ class UDPJoystickListener(Node):
         self.sock = None
         self.listener_active = False
 
+        # commcheck heartbeat servisinin yayınladığı bağlantı kalitesi; yalnızca
+        # kirayı tutan tabletin bağlantısı sürüşü durdurur (plc_comm.session).
+        self.link_states = {}   # istemci IP'si → heartbeat durumu
+        self.link_lost = False
+        self.link_sub = self.create_subscription(String, 'link_quality', self.on_link_quality, 10)
+
+        # PLC durum önbelleği: yazmalarla güncellenir, okuma ile doğrulanır.
+        self.plc_state = PlcState()
+        self.reader = PlcReader(self.plc_state)
+        self.commanded = {}  # (tür, adres) → son komut edilen değerler
+        self.skipped_writes = 0
+        self.mismatches = 0
+        # Operatör oturumları: kontrol tek bir oturumdadır (kira), diğerleri izler.
+        self.sessions = SessionTable()
+        self.sessions_expired_at = 0.0
+        instr.gauge("sessions", self.sessions.stats)
+
+        # Uçuş kaydı: her komut, karıştırma çıktısı ve Modbus sonucu (flight_recorder).
+        self.flight = FlightRecorder.from_env()
+        if self.flight is not None:
+            self.get_logger().info(f"Uçuş kaydı: {self.flight.path}")
+        self.plc_state_pub = self.create_publisher(String, 'plc_state', 10)
+        instr.gauge("plc_readback", self.readback_stats)
+
+        # İlk bağlantı main_loop'un ilk turunda kurulur; pymodbus arka planda yüklenir.
         self.client = None
-        self.ensure_modbus_client()
+        lazy.warm_up(modbus_client)
+
+        # PLC bekçisi: ana döngü ilerledikçe D20 artırılır (plc_comm.watchdog).
+        self.heartbeat = None
+        self.start_heartbeat(cfg)
+        instr.gauge("plc_heartbeat",
+                    lambda: self.heartbeat.stats() if self.heartbeat else {"rate_hz": 0})
+
+        # Takip modu: hedef kanalı ilk etkinleştirmede açılır.
+        self.follow = FollowController(rate_hz=follow_rate_hz)
+        self.follow_enabled = False
+        self.target_rx = None
+        self.manual_until = 0.0
+        self.set_follow(follow)
+        instr.gauge("follow", self.follow.stats)
 
         self.create_udp_socket()
         self.timer = self.create_timer(0.05, self.main_loop)  # 20Hz
+        self.follow_timer = self.create_timer(1.0 / follow_rate_hz, self.follow_loop)
+        if readback_hz > 0:
+            self.readback_timer = self.create_timer(1.0 / readback_hz, self.readback_loop)
 
     def ensure_modbus_client(self):
         if self.client is None or not self.client.connected:
             try:
                 if self.client is not None:
                     self.client.close()
-                self.client = ModbusTcpClient(self.plc_ip, port=self.plc_port, timeout=self.modbus_timeout)
-                connected = self.client.connect()
+                self.plc_state.invalidate()  # PLC yeniden başlamış olabilir
+                self.client = modbus_client.ModbusTcpClient(
+                    self.plc_ip, port=self.plc_port, timeout=self.modbus_timeout,
+                    retries=MODBUS_RETRIES)
+                with self.loop_monitor.blocking(self.modbus_limit_s()):
+                    connected = self.client.connect()
                 if connected:
                     self.get_logger().info("Modbus TCP bağlantısı başarılı!")
                 else:
@@ -52,6 +168,44 @@ class UDPJoystickListener(Node):
             except Exception as e:
                 self.get_logger().error(f"Modbus TCP bağlantı hatası: {e}")
 
+    def modbus_limit_s(self, requests=1):
+        """``requests`` Modbus isteğinin (ya da bağlantının) en uzun süresi."""
+        return requests * self.modbus_timeout * (MODBUS_RETRIES + 1) + 0.5
+
+    def connect_heartbeat_client(self):
+        """Bekçinin kendi Modbus bağlantısı (pymodbus istemcileri paylaşılmaz)."""
+        client = modbus_client.ModbusTcpClient(self.plc_ip, port=self.plc_port,
+                                               timeout=self.modbus_timeout)
+        if not client.connect():
+            client.close()
+            return None
+        return client
+
+    def start_heartbeat(self, cfg):
+        if self.heartbeat is not None:
+            self.heartbeat.stop()
+            self.heartbeat = None
+        if cfg.heartbeat_hz > 0:
+            self.heartbeat = HeartbeatWriter(self.connect_heartbeat_client, cfg.heartbeat_hz,
+                                             cfg.watchdog_ms, log=self.get_logger().warn).start()
+
+    def destroy_node(self):
+        self.loop_monitor.stop()
+        if self.heartbeat is not None:
+            self.heartbeat.stop()
+        super().destroy_node()
+
+    def bind_udp_socket(self, port):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind((self.udp_ip, port))
+        except OSError:
+            sock.close()
+            raise
+        sock.settimeout(0.01)
+        return sock
+
     def create_udp_socket(self):
         if self.sock:
             try:
@@ -59,11 +213,8 @@ class UDPJoystickListener(Node):
             except Exception:
                 pass
 
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         try:
-            self.sock.bind((self.udp_ip, self.udp_port))
-            self.sock.settimeout(0.01)
+            self.sock = self.bind_udp_socket(self.udp_port)
             print(f"📡 UDP bağlantısı bekleniyor... ({self.udp_ip}:{self.udp_port})")
             self.get_logger().info(f"UDP listener aktif: {self.udp_ip}:{self.udp_port}")
             self.listener_active = True
@@ -72,7 +223,166 @@ class UDPJoystickListener(Node):
             self.get_logger().error(f"UDP soketi başlatılamadı: {e}")
             self.listener_active = False
 
+    def apply_config(self, old, new):
+        """Yeni yapılandırmayı uygula; hata fırlatırsa ConfigWatcher geri alır."""
+        if new.udp_port != old.udp_port:
+            sock = self.bind_udp_socket(new.udp_port)  # açılamazsa eski soket kalır
+            if self.sock:
+                self.sock.close()
+            self.sock = sock
+            self.udp_port = new.udp_port
+            self.listener_active = True
+            self.get_logger().info(f"UDP listener aktif: {self.udp_ip}:{self.udp_port}")
+        if (new.ip, new.port, new.modbus_timeout_s) != (old.ip, old.port, old.modbus_timeout_s):
+            if (new.ip, new.port) != (old.ip, old.port) and self.client is not None:
+                # Eski PLC son komutu tutmaya devam etmesin.
+                self.safe_stop()
+            self.plc_ip, self.plc_port = new.ip, new.port
+            self.modbus_timeout = new.modbus_timeout_s
+            if self.client is not None:
+                self.client.close()
+                self.client = None
+            self.ensure_modbus_client()
+            if self.client is None or not self.client.connected:
+                raise ConnectionError(f"PLC {new.ip}:{new.port} yanıt vermiyor")
+        if any(new[k] != old[k] for k in ("ip", "port", "modbus_timeout_s",
+                                          "heartbeat_hz", "watchdog_ms")):
+            self.start_heartbeat(new)
+        self.max_latency_ms = new.max_latency_ms
+
+    def set_follow(self, enabled):
+        if enabled == self.follow_enabled:
+            return
+        if enabled and self.target_rx is None:
+            try:
+                self.target_rx = TargetReceiver()
+            except OSError as e:
+                self.get_logger().error(f"Takip kanalı açılamadı: {e}")
+                return
+        self.follow.reset()
+        self.follow_enabled = enabled
+        print("🎯 Takip modu açık" if enabled else "🎯 Takip modu kapalı")
+        self.get_logger().info(f"Takip modu: {enabled}")
+
+    def follow_loop(self):
+        if not self.follow_enabled:
+            return
+        now = time.monotonic()
+        forward, turn = self.follow.command(self.target_rx.poll(), now)
+        if not self.is_connected or self.holder_link_lost() or now < self.manual_until:
+            self.follow.hold()  # güvenli mod veya elle kontrol
+            return
+        with instr.span("follow"):
+            self.process_joystick(forward, turn, follow=True)
+
+    def readback_loop(self):
+        if self.client is None or not self.client.connected:
+            return
+        try:
+            with instr.span("modbus_read"):
+                requests = len(self.reader.coil_blocks) + len(self.reader.register_blocks)
+                with self.loop_monitor.blocking(self.modbus_limit_s(requests)):
+                    ok = self.reader.read(self.client)
+        except Exception as e:
+            self.get_logger().error(f"Modbus okuma hatası: {e}")
+            return
+        if not ok:
+            self.get_logger().warn("PLC durumu okunamadı")
+            return
+        confirmed = self.reconcile()
+        self.publish_plc_state(confirmed)
+
+    def reconcile(self):
+        """Okunan durumu son komutlarla karşılaştır; hepsi tutuyorsa True."""
+        confirmed = True
+        for (kind, start), values in list(self.commanded.items()):
+            if self.plc_state.holds(kind, start, values):
+                continue
+            confirmed = False
+            self.mismatches += 1
+            self.get_logger().warn(f"PLC durumu komutla uyuşmuyor ({kind} {start}): {values}")
+            if not any(values):
+                # Durdurma komutları hemen yeniden yazılır.
+                try:
+                    self.write_block(kind, start, values)
+                except Exception as e:
+                    self.get_logger().error(f"Modbus yeniden yazma hatası: {e}")
+            elif start == COIL_BRUSH1:
+                self.last_brush1 = None
+            elif start == COIL_BRUSH2:
+                self.last_brush2 = None
+            else:
+                # Hareket yalnızca canlı bir komutla yeniden uygulanır: bir sonraki
+                # joystick paketi/takip adımı tekrar yazar.
+                self.last_forward = self.last_turn = None
+        return confirmed
+
+    def publish_plc_state(self, confirmed=True):
+        snapshot = dict(self.plc_state.snapshot(), confirmed=confirmed)
+        self.plc_state_pub.publish(String(data=json.dumps(snapshot)))
+        reply = {"type": "plc_state", **snapshot}
+        for addr in self.sessions.addresses():
+            self.send_reply(addr, reply)
+
+    def send_reply(self, addr, reply):
+        if not self.listener_active:
+            return
+        try:
+            self.sock.sendto(json.dumps(reply).encode(), addr)
+        except OSError:
+            pass
+
+    def readback_stats(self):
+        return dict(self.reader.stats(), skipped_writes=self.skipped_writes,
+                    mismatches=self.mismatches)
+
+    def write_block(self, kind, start, values, force=False):
+        """Bir bobin/register bloğunu yaz; PLC zaten bu değerleri tutuyorsa atla.
+
+        (yazıldı mı, hatasız mı) döner.
+        """
+        self.commanded[(kind, start)] = list(values)
+        with self.loop_monitor.blocking(self.modbus_limit_s()):
+            wrote, res = write_values(self.client, self.plc_state, kind, start, values, force)
+        if not wrote:
+            self.skipped_writes += 1
+            return False, True
+        if res is not None and res.isError():
+            self.get_logger().error(f"Modbus write error ({kind} {start}): {res}")
+            return True, False
+        return True, True
+
+    def on_link_quality(self, msg):
+        try:
+            self.link_states = link_states_by_ip(json.loads(msg.data))
+        except (ValueError, AttributeError, TypeError):
+            return
+        lost = self.holder_link_lost()
+        if lost and not self.link_lost:
+            print("⚡ Heartbeat kayboldu, robot güvenli moda geçti!")
+            self.get_logger().warn("HEARTBEAT KAYBOLDU! Robot ve fırçalar güvenli moda geçti.")
+            self.is_connected = False
+            self.safe_stop()
+        self.link_lost = lost
+
+    def holder_link_lost(self):
+        return holder_link_lost(self.link_states, self.sessions.holder)
+
+    def safe_stop(self):
+        if self._stopped:
+            return
+        self._stopped = True
+        if self.flight is not None:
+            self.flight.append(SAFE_STOP)
+        self.process_joystick(0, 0, force=True)
+        self.write_brush(2068, 0, force=True)
+        self.write_brush(2069, 0, force=True)
+
     def main_loop(self):
+        self.loop_monitor.progress()
+        if self.heartbeat is not None:
+            self.heartbeat.progress()
+        self.config.poll()  # döngü sınırı: değişiklikler burada toplu uygulanır
         self.ensure_modbus_client()
 
         if not self.listener_active:
@@ -81,6 +391,11 @@ class UDPJoystickListener(Node):
             self.create_udp_socket()
             return
 
+        now = time.monotonic()
+        if now - self.sessions_expired_at >= 1.0:
+            self.sessions.expire(now)
+            self.sessions_expired_at = now
+
         try:
             self.check_and_receive()
         except Exception as e:
@@ -94,8 +409,16 @@ class UDPJoystickListener(Node):
 
         while True:
             try:
-                data, addr = self.sock.recvfrom(1024)
+                with instr.span("udp_receive"):
+                    data, addr = self.sock.recvfrom(1024)
                 payload = json.loads(data.decode())
+                verdict, replies = self.sessions.handle(payload, addr)
+                for reply_addr, reply in replies:
+                    self.send_reply(reply_addr, reply)
+                    if reply['event'] in ('granted', 'revoked'):
+                        self.get_logger().info(f"Oturum {reply['sid']}: {reply['event']}")
+                if verdict != CONTROL:
+                    continue  # izleyici ya da eski/yinelenen paket
                 last_payload = payload
                 if not self.is_connected:
                     print(f"✅ Mobil uygulama bağlantısı geldi! ({addr})")
@@ -114,14 +437,17 @@ class UDPJoystickListener(Node):
             gecikme_ms = now_ts - pkt_ts
             self.get_logger().info(f"UDP paket gecikmesi: {gecikme_ms} ms")
 
-            if gecikme_ms > 3000:
+            if gecikme_ms > self.max_latency_ms:
                 if self.is_connected:
                     print("⚡ Ağ gecikmesi yüksek, robot güvenli moda geçti!")
                     self.get_logger().warn("AĞ GECİKMESİ YÜKSEK! Robot ve fırçalar güvenli moda geçti.")
                 self.is_connected = False
-                self.process_joystick(0, 0, force=True)
-                self.write_brush(2068, 0, force=True)
-                self.write_brush(2069, 0, force=True)
+                self.safe_stop()
+                self.timeout_counter = 0
+                return
+
+            if self.holder_link_lost():
+                # Heartbeat geri gelene kadar joystick komutları uygulanmaz.
                 self.timeout_counter = 0
                 return
 
@@ -129,10 +455,22 @@ class UDPJoystickListener(Node):
             joy_t = int(last_payload.get('joystick_turn', 0))
             brush1 = int(last_payload.get("brush1", 0))
             brush2 = int(last_payload.get("brush2", 0))
-            self.process_joystick(joy_f, joy_t)
+            if self.flight is not None:
+                self.flight.append(COMMAND, forward=joy_f, turn=joy_t, brush1=brush1,
+                                   brush2=brush2, seq=int(last_payload.get('seq', 0)),
+                                   latency_ms=gecikme_ms)
+            if 'follow' in last_payload:
+                self.set_follow(bool(last_payload['follow']))
+            now = time.monotonic()
+            if joy_f or joy_t:
+                self.manual_until = now + MANUAL_HOLD_S
+            if not self.follow_enabled or now < self.manual_until:
+                # Takip açıkken sıfır joystick paketleri sürüşü takibe bırakır.
+                self.process_joystick(joy_f, joy_t)
             self.write_brush(2068, brush1)
             self.write_brush(2069, brush2)
 
+            self._stopped = False
             self.timeout_counter = 0
 
         else:
@@ -143,60 +481,30 @@ class UDPJoystickListener(Node):
                 print("❌ Mobil uygulama bağlantısı koptu, tekrar bağlantı bekleniyor...")
                 self.get_logger().warn("❌ Mobil uygulama bağlantısı koptu, robot ve fırçalar durduruluyor.")
             self.is_connected = False
-            self.process_joystick(0, 0, force=True)
-            self.write_brush(2068, 0, force=True)
-            self.write_brush(2069, 0, force=True)
+            self.safe_stop()
 
-    def process_joystick(self, forward, turn, force=False):
+    def process_joystick(self, forward, turn, force=False, follow=False):
         if force or forward != self.last_forward or turn != self.last_turn:
             self.ensure_modbus_client()
-            left = right = 0
-            base_speed = min(max(abs(forward), 0), 100)
+            drive_coils, turn_coils, (left, right) = mix(forward, turn)
+            blocks = (("coil", COIL_DRIVE, drive_coils), ("coil", COIL_TURN, turn_coils),
+                      ("reg", REG_LEFT, [left, right]))
 
+            writes, failed = 0, False
+            t0 = time.perf_counter()
             try:
-                if forward > 0:
-                    res1 = self.client.write_coils(2048 + 11, [True, False])
-                    res2 = self.client.write_coils(2048 + 3, [False, False])
-                    if turn > 0:
-                        left = base_speed
-                        right = int(base_speed * (1 - abs(turn) / 100))
-                    elif turn < 0:
-                        right = base_speed
-                        left = int(base_speed * (1 - abs(turn) / 100))
-                    else:
-                        left = right = base_speed
-                elif forward < 0:
-                    res1 = self.client.write_coils(2048 + 11, [False, True])
-                    res2 = self.client.write_coils(2048 + 3, [False, False])
-                    if turn > 0:
-                        left = base_speed
-                        right = int(base_speed * (1 - abs(turn) / 100))
-                    elif turn < 0:
-                        right = base_speed
-                        left = int(base_speed * (1 - abs(turn) / 100))
-                    else:
-                        left = right = base_speed
-                elif forward == 0:
-                    res1 = self.client.write_coils(2048 + 11, [False, False])
-                    if turn > 0:
-                        res2 = self.client.write_coils(2048 + 3, [True, False])
-                        left = right = min(abs(turn), 100)
-                    elif turn < 0:
-                        res2 = self.client.write_coils(2048 + 3, [False, True])
-                        left = right = min(abs(turn), 100)
-                    else:
-                        res2 = self.client.write_coils(2048 + 3, [False, False])
-
-                left = max(0, min(100, left))
-                right = max(0, min(100, right))
-
-                res3 = self.client.write_registers(10, [left, right])
-                for i, res in enumerate([res1, res2, res3]):
-                    if res is not None and res.isError():
-                        self.get_logger().error(f"Modbus write error {i}: {res}")
-
+                with instr.span("modbus_write"):
+                    for kind, start, values in blocks:
+                        wrote, ok = self.write_block(kind, start, values, force)
+                        writes += wrote
+                        failed |= not ok
             except Exception as e:
+                failed = True
                 self.get_logger().error(f"Modbus process_joystick Exception: {e}")
+            if self.flight is not None:
+                flags = (FLAG_FORCE * force) | (FLAG_ERROR * failed) | (FLAG_FOLLOW * follow)
+                self.flight.append(DRIVE, flags, forward, turn, left, right, writes=writes,
+                                   modbus_s=time.perf_counter() - t0)
 
             self.get_logger().info(f"Joystick → F:{forward}, T:{turn} | D10={left}, D11={right}")
             self.last_forward = forward
@@ -206,10 +514,11 @@ class UDPJoystickListener(Node):
         last_val = self.last_brush1 if coil_addr == 2068 else self.last_brush2
         if force or value != last_val:
             self.ensure_modbus_client()
+            wrote, ok = False, False
+            t0 = time.perf_counter()
             try:
-                res = self.client.write_coil(coil_addr, bool(value))
-                if res is not None and res.isError():
-                    self.get_logger().error(f"Modbus write_brush ({coil_addr}) Error: {res}")
+                with instr.span("modbus_write"):
+                    wrote, ok = self.write_block("coil", coil_addr, [bool(value)], force)
                 self.get_logger().info(f"Fırça {coil_addr} → {bool(value)}")
                 if coil_addr == 2068:
                     self.last_brush1 = value
@@ -217,13 +526,23 @@ class UDPJoystickListener(Node):
                     self.last_brush2 = value
             except Exception as e:
                 self.get_logger().error(f"write_brush Exception ({coil_addr}): {e}")
+            if self.flight is not None:
+                flags = (FLAG_FORCE * force) | (FLAG_ERROR * (not ok))
+                self.flight.append(BRUSH, flags, addr=coil_addr, brush1=int(bool(value)),
+                                   writes=int(wrote), modbus_s=time.perf_counter() - t0)
+
 
 def main(args=None):
+    instr.install("plc_comm")
     rclpy.init(args=args)
-    node = UDPJoystickListener()
+    node = UDPJoystickListener(
+        follow=os.environ.get("PLC_FOLLOW", "0") == "1",
+        readback_hz=float(os.environ.get("PLC_READBACK_HZ", "5")),
+    )
     rclpy.spin(node)
     node.destroy_node()
     rclpy.shutdown()
 
+
 if __name__ == "__main__":
     main()
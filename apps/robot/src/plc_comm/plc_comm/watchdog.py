@@ -0,0 +1,200 @@
+"""PLC-side watchdog: a heartbeat register the PLC program supervises.
+
+``udp_listener_node`` stops the motors itself when the phone goes quiet, but
+only while it is running.  If it hangs inside a blocking Modbus call, or the
+process dies, the last D10/D11 and direction coils stay latched in the PLC.
+The watchdog moves the final fail-safe into the PLC:
+
+* the node increments a heartbeat register at a fixed rate
+  (:class:`HeartbeatWriter`, its own thread and Modbus connection, so a slow
+  control write does not delay it), but only while the control loop keeps
+  making progress;
+* the PLC program stops everything when the register stops changing.
+
+PLC contract
+------------
+
+Registers (Delta DVP-SE, Modbus addresses as in :mod:`plc_comm.mixing`)::
+
+    D20   heartbeat    written by the node, 1…65535 then wraps to 1 (never 0)
+    D21   timeout_ms   written by the node on every (re)connect; 0 = PLC default
+
+Every scan the PLC program must do the equivalent of (structured text)::
+
+    IF D20 <> last_hb THEN                 (* a new heartbeat *)
+        last_hb := D20;  hb_timer := 0;  armed := TRUE;  tripped := FALSE;
+    END_IF;
+    limit := SEL(D21 = 0, D21, 500);       (* ms; D21 = 0 → 500 ms default *)
+    IF armed AND hb_timer >= limit THEN
+        tripped := TRUE;
+    END_IF;
+    IF tripped THEN                        (* every scan while tripped *)
+        D10 := 0;  D11 := 0;               (* left/right speed *)
+        RST M3;  RST M4;                   (* coils 2051/2052: turn direction *)
+        RST M11; RST M12;                  (* coils 2059/2060: drive direction *)
+        RST M20; RST M21;                  (* coils 2068/2069: brushes *)
+    END_IF;
+
+with ``hb_timer`` a free-running 10 ms or 100 ms timer.  The rules behind it:
+
+1. The watchdog arms on the first change of D20 after power-up, so a PLC
+   whose node never ran (or runs without the watchdog) is not stopped.
+2. Only a *change* counts: a node that died after writing D20 must not keep
+   the PLC alive with the value it left behind.
+3. While tripped the outputs are held off on every scan, whatever is written
+   to D10/D11 and the coils.  A new heartbeat clears the trip but does not
+   restore the old outputs: motion resumes only when the node writes a new
+   command (its read-back sees the zeros and asks for a live one).
+4. Time to stop after the node stalls is at most ``timeout + 1/rate + one
+   scan``; with the defaults (500 ms, 10 Hz) about 600 ms.
+
+:class:`PlcWatchdog` is a reference implementation of these rules; the
+simulated PLC (:mod:`plc_comm.sim_plc`) runs it, and
+``benchmarks/bench_watchdog.py`` measures time-to-stop against it.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+REG_HEARTBEAT = 20
+REG_WATCHDOG_MS = 21
+DEFAULT_TIMEOUT_MS = 500
+
+
+class HeartbeatWriter:
+    """Increment the heartbeat register while the control loop makes progress.
+
+    ``connect`` returns a new, connected Modbus client (or ``None``); the
+    writer owns it, since pymodbus clients are not shared between threads.
+    The control loop calls :meth:`progress` once per iteration.  A tick that
+    finds no progress since the previous one skips its write, so the
+    heartbeat changes at most as often as the control loop runs and stops as
+    soon as the loop does.
+    """
+
+    def __init__(self, connect: Callable[[], object], rate_hz: float = 10.0,
+                 timeout_ms: int = DEFAULT_TIMEOUT_MS,
+                 log: Callable[[str], None] = print) -> None:
+        self.connect = connect
+        self.period_s = 1.0 / rate_hz
+        self.timeout_ms = timeout_ms
+        self.log = log
+        self.client = None
+        self.counter = 0
+        self._progress = 0
+        self._seen = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Metrics
+        self.beats = 0
+        self.skipped = 0
+        self.stalls = 0
+        self.errors = 0
+        self.stalled = False
+
+    def progress(self) -> None:
+        """Called by the control loop; cheap enough for every iteration."""
+        self._progress += 1
+
+    def step(self) -> bool:
+        """One tick: write the next heartbeat if the loop progressed; ``True`` if written."""
+
+        if self._progress == self._seen:
+            self.skipped += 1
+            if not self.stalled and self.beats:
+                self.stalled = True
+                self.stalls += 1
+                self.log("🚨 Kontrol döngüsü ilerlemiyor, PLC heartbeat durduruldu")
+            return False
+        self._seen = self._progress
+        if self.stalled:
+            self.stalled = False
+            self.log("✅ Kontrol döngüsü devam ediyor, PLC heartbeat yeniden başladı")
+        try:
+            if self.client is None:
+                self.client = self.connect()
+                if self.client is None:
+                    self.errors += 1
+                    return False
+                self._check(self.client.write_register(REG_WATCHDOG_MS, self.timeout_ms))
+            counter = self.counter % 0xFFFF + 1   # 1…65535: 0 is the PLC's power-up value
+            self._check(self.client.write_register(REG_HEARTBEAT, counter))
+        except Exception as e:
+            self.errors += 1
+            if self.errors == 1 or self.errors % 100 == 0:
+                self.log(f"⚠️ PLC heartbeat yazılamadı: {e}")
+            self._close()
+            return False
+        self.counter = counter
+        self.beats += 1
+        return True
+
+    @staticmethod
+    def _check(res) -> None:
+        if res is not None and res.isError():
+            raise ConnectionError(str(res))
+
+    def _close(self) -> None:
+        if self.client is not None:
+            try:
+                self.client.close()
+            except Exception:
+                pass
+            self.client = None
+
+    def _run(self) -> None:
+        next_t = time.monotonic()
+        while True:
+            next_t += self.period_s
+            if self._stop.wait(max(0.0, next_t - time.monotonic())):
+                return
+            self.step()
+
+    def start(self) -> "HeartbeatWriter":
+        self._thread = threading.Thread(target=self._run, name="plc-heartbeat", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop beating; the PLC trips after its timeout unless another writer takes over."""
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(2 * self.period_s + 1.0)
+        self._close()
+
+    def stats(self) -> Dict[str, object]:
+        return {"rate_hz": round(1.0 / self.period_s, 1), "timeout_ms": self.timeout_ms,
+                "beats": self.beats, "skipped": self.skipped, "stalls": self.stalls,
+                "errors": self.errors, "stalled": self.stalled}
+
+
+class PlcWatchdog:
+    """Reference implementation of the PLC side of the contract, one call per scan."""
+
+    def __init__(self) -> None:
+        self.last: Optional[int] = None
+        self.changed_at = 0.0
+        self.armed = False
+        self.tripped = False
+        self.trips = 0
+
+    def scan(self, now: float, heartbeat: int, timeout_ms: int) -> bool:
+        """Feed D20/D21 at time ``now`` (s); ``True`` while the outputs must be held off."""
+
+        if self.last is None:
+            self.last = heartbeat          # power-up value does not arm
+            self.changed_at = now
+        elif heartbeat != self.last:
+            self.last = heartbeat
+            self.changed_at = now
+            self.armed = True
+            self.tripped = False
+        limit = (timeout_ms or DEFAULT_TIMEOUT_MS) / 1000
+        if self.armed and not self.tripped and now - self.changed_at >= limit:
+            self.tripped = True
+            self.trips += 1
+        return self.tripped
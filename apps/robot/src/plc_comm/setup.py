@@ -25,6 +25,8 @@ setup(
             'plc_write_read_node = plc_comm.plc_write_read_node:main',
             'plc_write_m11_node = plc_comm.plc_write_m11:main',
             'udp_listener_node = plc_comm.udp_listener_node:main',
+            'sim_plc = plc_comm.sim_plc:main',
+            'plc_flight_recorder = plc_comm.flight_recorder:main',
                   # 🆕 BU SATIR EKLENDİ
         ],
     },
@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from plc_comm.flight_recorder import (  # noqa: E402
+    BRUSH, COMMAND, DRIVE, FLAG_FORCE, FlightRecorder, read_records, replay,
+)
+
+
+class WriteClient:
+    def __init__(self):
+        self.writes = []
+
+    def _ok(self):
+        return SimpleNamespace(isError=lambda: False)
+
+    def write_coil(self, address, value):
+        self.writes.append(("coil", address, [value]))
+        return self._ok()
+
+    def write_coils(self, address, values):
+        self.writes.append(("coil", address, values))
+        return self._ok()
+
+    def write_registers(self, address, values):
+        self.writes.append(("reg", address, values))
+        return self._ok()
+
+
+def test_ring_wraps_and_survives_reopen(tmp_path):
+    path = str(tmp_path / "flight.ring")
+    rec = FlightRecorder(path, capacity=4)
+    for i in range(3):
+        rec.append(COMMAND, forward=i, seq=i, latency_ms=5)
+    rec.close()
+    rec = FlightRecorder(path, capacity=4)  # same geometry: keeps appending
+    for i in range(3, 6):
+        rec.append(COMMAND, forward=i, seq=i)
+    records = read_records(path)
+    assert [r.seq for r in records] == [2, 3, 4, 5]  # oldest overwritten
+    assert records[0].latency_ms == 5 and records[-1].latency_ms == -1
+    assert records == sorted(records, key=lambda r: r.t)
+    rec.close()
+    FlightRecorder(path, capacity=8).close()  # other geometry: starts over
+    assert read_records(path) == []
+
+
+def test_replay_remixes_and_writes(tmp_path):
+    path = str(tmp_path / "flight.ring")
+    rec = FlightRecorder(path, capacity=16)
+    rec.append(DRIVE, forward=50, turn=50, left=50, right=25, writes=3)
+    rec.append(DRIVE, forward=60, turn=50, left=60, right=99, writes=1)  # mixes to 30
+    rec.append(BRUSH, addr=2068, brush1=1, writes=1)
+    rec.append(DRIVE, FLAG_FORCE, forward=60, turn=50, left=60, right=30, writes=3)
+    rec.close()
+    client = WriteClient()
+    result = replay(read_records(path), client)
+    assert result["replayed"] == 4 and result["mix_mismatches"] == 1
+    assert result["mismatch_examples"][0]["mixed"] == [60, 30]
+    # Unchanged coils are skipped like in the node; the forced record writes all.
+    assert result["modbus_writes"] == 3 + 1 + 1 + 3
+    assert ("coil", 2068, [True]) in client.writes
@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2] / "robot_common"))
+from plc_comm.follow import FollowController  # noqa: E402
+from robot_common.target import (  # noqa: E402
+    TRACK_LOCKED, TRACK_LOST, Target, TargetReceiver, TargetSender,
+)
+
+
+def _target(now, cx=0.0, distance=4.0, state=TRACK_LOCKED, stop=False, age_s=0.0):
+    return Target(1, int((now - age_s) * 1e6), state, cx, 0.0, 0.5, distance, stop)
+
+
+def test_follow_commands_ramp_turn_search_and_deadline():
+    ctl = FollowController(rate_hz=20.0)
+    now = 100.0
+    forwards = []
+    for _ in range(10):
+        forwards.append(ctl.command(_target(now), now)[0])
+        now += 0.05
+    assert forwards[0] == 5 and forwards[-1] == 40  # slew limited up to max_forward
+    assert ctl.command(_target(now, stop=True), now) == (0, 0)  # slowing is immediate
+    assert ctl.command(_target(now, cx=0.5, distance=None), now) == (0, 30)
+    assert ctl.command(_target(now, cx=0.05, distance=None), now) == (0, 0)  # dead band
+    # Lost on the right: search to the right, then give up.
+    assert ctl.command(_target(now, state=TRACK_LOST), now + 0.05) == (0, 20)
+    assert ctl.command(_target(now + 2, state=TRACK_LOST), now + 2) == (0, 0)
+    # Stale target: stop, whatever it said.
+    assert ctl.command(_target(now + 3, age_s=0.5), now + 3) == (0, 0)
+    stats = ctl.stats()
+    assert stats["stale"] == 1 and stats["late_ticks"] == 2
+
+
+def test_target_channel_keeps_newest(tmp_path):
+    path = str(tmp_path / "target.sock")
+    rx = TargetReceiver(path)
+    tx = TargetSender(path)
+    try:
+        assert rx.poll() is None
+        for seq in (1, 2, 3):
+            assert tx.send(Target(seq, 5, TRACK_LOCKED, 0.25, -0.5, 0.4, None, False))
+        got = rx.poll()
+        assert got.seq == 3 and got.distance_m is None and got.cx == 0.25
+        assert rx.received == 3
+    finally:
+        tx.close()
+        rx.close()
+    assert not TargetSender(path).send(got)  # no reader: dropped, no exception
@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from plc_comm.mixing import mix  # noqa: E402
+from plc_comm.readback import PlcReader, PlcState, plan_blocks  # noqa: E402
+
+
+class FakeClient:
+    def __init__(self, fail=False):
+        self.coils = [False] * 4096
+        self.registers = [0] * 64
+        self.requests = []
+        self.fail = fail
+
+    def _reply(self, **values):
+        return SimpleNamespace(isError=lambda: self.fail, **values)
+
+    def read_coils(self, start, count=1):
+        self.requests.append(("coils", start, count))
+        bits = self.coils[start:start + count]
+        return self._reply(bits=bits + [False] * (-len(bits) % 8))
+
+    def read_holding_registers(self, start, count=1):
+        self.requests.append(("regs", start, count))
+        return self._reply(registers=self.registers[start:start + count])
+
+
+def test_plan_blocks_merges_small_gaps():
+    assert plan_blocks([2051, 2052, 2059, 2060, 2068, 2069]) == [(2051, 19)]
+    assert plan_blocks([10, 11]) == [(10, 2)]
+    assert plan_blocks([1, 2, 40], max_gap=16) == [(1, 2), (40, 1)]
+    assert plan_blocks(range(0, 300), max_gap=0, max_count=125) == [
+        (0, 125), (125, 125), (250, 50)]
+
+
+def test_reader_fills_state_in_two_requests():
+    client = FakeClient()
+    client.coils[2059] = client.coils[2068] = True
+    client.registers[10:12] = [40, 30]
+    state = PlcState(clock=lambda: 5.0)
+    reader = PlcReader(state)
+    assert reader.read(client)
+    assert client.requests == [("coils", 2051, 19), ("regs", 10, 2)]
+    drive, turn, speeds = mix(40, 25)
+    assert state.holds("coil", 2059, drive) and state.holds("reg", 10, speeds)
+    assert not state.holds("coil", 2051, [True, False])
+    snap = state.snapshot()
+    assert snap["drive"] == "forward" and snap["brush1"] and not snap["brush2"]
+    assert (snap["D10"], snap["D11"], snap["age_ms"]) == (40, 30, 0)
+
+    client.fail = True
+    client.registers[10] = 0
+    assert not reader.read(client)
+    assert state.registers[10] == 40 and reader.errors == 1
+
+
+def test_mix_matches_stick_semantics():
+    assert mix(50, 0) == ([True, False], [False, False], [50, 50])
+    assert mix(-50, -50) == ([False, True], [False, False], [25, 50])
+    assert mix(0, 30) == ([False, False], [True, False], [30, 30])
+    assert mix(0, 0) == ([False, False], [False, False], [0, 0])
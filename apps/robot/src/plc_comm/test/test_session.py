@@ -0,0 +1,92 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from plc_comm.session import (  # noqa: E402
+    CONTROL, INVALID, OBSERVE, STALE, SessionTable, holder_link_lost, link_states_by_ip,
+)
+
+A = ("10.0.0.2", 4000)
+B = ("10.0.0.3", 4001)
+
+
+def events(replies):
+    return [(addr, msg["event"]) for addr, msg in replies]
+
+
+def test_sequence_ordering_and_implicit_claim():
+    table = SessionTable(lease_s=1.0)
+    verdict, replies = table.handle({"sid": "a", "seq": 1}, A, now=0.0)
+    assert verdict == CONTROL and events(replies) == [(A, "granted")]
+    assert table.handle({"sid": "a", "seq": 3}, A, now=0.1) == (CONTROL, [])
+    assert table.handle({"sid": "a", "seq": 2}, A, now=0.2)[0] == STALE  # reordered
+    assert table.handle({"sid": "a", "seq": 3}, A, now=0.2)[0] == STALE  # duplicate
+    # A second tablet only observes while the lease is live.
+    assert table.handle({"sid": "b", "seq": 1}, B, now=0.5) == (OBSERVE, [])
+    # The holder goes silent: the lease lapses and b gets it, a is told.
+    verdict, replies = table.handle({"sid": "b", "seq": 2}, B, now=1.5)
+    assert verdict == CONTROL
+    assert events(replies) == [(A, "revoked"), (B, "granted")]
+    assert table.stats()["stale"] == 2 and table.stats()["takeovers"] == 1
+
+
+def test_takeover_handshake():
+    table = SessionTable(lease_s=1.0)
+    table.handle({"sid": "a", "seq": 1}, A, now=0.0)
+    verdict, replies = table.handle({"sid": "b", "seq": 1, "takeover": 1}, B, now=0.1)
+    assert verdict == OBSERVE
+    assert events(replies) == [(A, "takeover_request"), (B, "pending")]
+    assert replies[0][1]["by"] == "b"
+    # Repeating the request does not spam the holder.
+    assert table.handle({"sid": "b", "seq": 2, "takeover": 1}, B, now=0.2) == (OBSERVE, [])
+    assert table.handle({"sid": "a", "seq": 2}, A, now=0.3)[0] == CONTROL
+    verdict, replies = table.handle({"sid": "a", "seq": 3, "release": 1}, A, now=0.4)
+    assert verdict == OBSERVE
+    assert events(replies) == [(B, "granted"), (A, "released")]
+    assert table.handle({"sid": "a", "seq": 4, "observe": 1}, A, now=0.5) == (OBSERVE, [])
+    assert table.handle({"sid": "b", "seq": 3}, B, now=0.5) == (CONTROL, [])
+
+
+def test_takeover_of_a_free_or_lapsed_lease_is_granted():
+    table = SessionTable(lease_s=1.0)
+    verdict, replies = table.handle({"sid": "a", "seq": 1, "takeover": 1, "observe": 1}, A,
+                                    now=0.0)
+    assert verdict == CONTROL and events(replies) == [(A, "granted")]
+    verdict, replies = table.handle({"sid": "b", "seq": 1, "takeover": 1, "observe": 1}, B,
+                                    now=2.0)
+    assert verdict == CONTROL and events(replies) == [(A, "revoked"), (B, "granted")]
+
+
+def test_legacy_packets_and_expiry():
+    table = SessionTable(lease_s=1.0, ttl_s=5.0)
+    assert table.handle({"joystick_forward": 10}, A, now=0.0)[0] == CONTROL
+    assert table.handle({"joystick_forward": 10}, A, now=0.1) == (CONTROL, [])
+    table.handle({"sid": "b", "seq": 1, "observe": 1}, B, now=0.2)
+    table.expire(now=10.0)
+    assert list(table.sessions) == ["10.0.0.2:4000"]  # the holder is kept
+
+
+def test_malformed_packets_are_dropped():
+    table = SessionTable(lease_s=1.0)
+    for packet in ({"sid": "a", "seq": "x"}, {"sid": "a", "seq": 1.5}, {"sid": "a", "seq": True},
+                   {"sid": "a", "seq": [1]}, [1, 2], "text"):
+        assert table.handle(packet, A, now=0.0) == (INVALID, [])
+    assert table.stats()["invalid"] == 6 and not table.sessions
+    assert table.handle({"sid": "a", "seq": 1}, A, now=0.1)[0] == CONTROL
+
+
+def test_only_the_holders_heartbeat_gates_control():
+    table = SessionTable(lease_s=1.0)
+    table.handle({"sid": "a", "seq": 1}, A, now=0.0)
+    # a's tablet echoes fine; b's second connection went quiet, its reconnect is live.
+    states = link_states_by_ip({"state": "lost", "clients": [
+        {"peer": "10.0.0.2:50000", "state": "ok"},
+        {"peer": "10.0.0.3:50001", "state": "lost"},
+        {"peer": "10.0.0.4:50002", "state": "lost"},
+        {"peer": "10.0.0.4:50003", "state": "ok"},
+    ]})
+    assert states == {"10.0.0.2": "ok", "10.0.0.3": "lost", "10.0.0.4": "ok"}
+    assert not holder_link_lost(states, table.holder)
+    assert holder_link_lost(dict(states, **{"10.0.0.2": "lost"}), table.holder)
+    assert not holder_link_lost({"10.0.0.2": "lost"}, None)       # nobody drives
+    assert not holder_link_lost({"10.0.0.3": "legacy"}, table.holder)   # no echo at all
@@ -0,0 +1,56 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from plc_comm.watchdog import (  # noqa: E402
+    REG_HEARTBEAT, REG_WATCHDOG_MS, HeartbeatWriter, PlcWatchdog,
+)
+
+
+class FakeClient:
+    def __init__(self, fail=False):
+        self.writes = []
+        self.fail = fail
+        self.closed = False
+
+    def write_register(self, address, value):
+        self.writes.append((address, value))
+        return SimpleNamespace(isError=lambda: self.fail)
+
+    def close(self):
+        self.closed = True
+
+
+def test_heartbeat_only_advances_while_the_control_loop_does():
+    clients = [FakeClient(fail=True), FakeClient()]
+    writer = HeartbeatWriter(lambda: clients.pop(0), timeout_ms=400, log=lambda msg: None)
+
+    assert not writer.step()                     # no loop iteration yet
+    writer.progress()
+    assert not writer.step() and writer.errors == 1   # PLC error: connection dropped
+    writer.progress()
+    assert writer.step() and writer.step() is False   # one beat per loop iteration
+    assert writer.counter == 1 and writer.stalls == 1
+
+    writer.progress()
+    writer.progress()
+    assert writer.step() and not writer.stalled
+    assert writer.client.writes == [(REG_WATCHDOG_MS, 400), (REG_HEARTBEAT, 1),
+                                    (REG_HEARTBEAT, 2)]
+    writer.counter = 0xFFFF
+    writer.progress()
+    writer.step()
+    assert writer.client.writes[-1] == (REG_HEARTBEAT, 1)   # wraps past 0
+
+
+def test_plc_trips_after_timeout_and_waits_for_a_new_heartbeat():
+    plc = PlcWatchdog()
+    assert not plc.scan(0.0, 0, 0)
+    assert not plc.scan(10.0, 0, 0)              # never armed: no node, no trip
+    assert not plc.scan(10.1, 1, 300)
+    assert not plc.scan(10.39, 1, 300)
+    assert plc.scan(10.4, 1, 300) and plc.scan(11.0, 1, 300)   # held while stale
+    assert not plc.scan(11.05, 2, 300) and plc.trips == 1
+    assert not plc.scan(11.5, 2, 0)              # D21 = 0: 500 ms default
+    assert plc.scan(11.55, 2, 0) and plc.trips == 2
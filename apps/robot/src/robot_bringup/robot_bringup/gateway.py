@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""Single-process robot gateway.
+
+``scripts/run_all.sh`` starts every node in its own interpreter, each paying
+for its own Python, rclpy and OpenCV start-up.  The gateway hosts the same
+endpoints as components of one asyncio event loop instead:
+
+* ``heartbeat`` – :class:`commcheck.heartbeat.HeartbeatService` (TCP)
+* ``battery``   – battery telemetry control session (TCP), the blocking
+  serial/UDP stream runs in the I/O executor
+* ``camera``    – OAK frame stream (TCP), frame grab, detection and JPEG
+  encode run in a dedicated single-thread vision executor; frames are also
+  published on ROS and handed to in-process consumers through
+  ``oak_streamer.publishing.bus`` while a client is streaming
+* ``joystick``  – :class:`plc_comm.udp_listener_node.UDPJoystickListener`;
+  its 20 Hz timer and blocking Modbus calls are spun by an rclpy executor on
+  its own thread, the node itself is created in this process
+
+Ports are explicit and can be overridden, e.g.::
+
+    python3 -m robot_bringup.gateway --port camera=5000 --port heartbeat=5002
+
+The multi-process layout stays the default; this mode is opt-in.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from battery_streamer.battery_udp_node import parse_udp_port, udp_stream_loop
+from commcheck.heartbeat import HeartbeatService
+from oak_streamer import oak_streamer_node as oak
+from oak_streamer import publishing
+from robot_common import instrumentation as instr
+
+try:  # rclpy is only needed for the joystick component.
+    import rclpy
+    from rclpy.executors import SingleThreadedExecutor
+    from rclpy.node import Node
+    from std_msgs.msg import String
+except ImportError:  # pragma: no cover - depends on the ROS environment
+    rclpy = None  # type: ignore
+
+_T0 = time.monotonic()
+
+DEFAULT_PORTS: Dict[str, int] = {
+    "camera": 5000,
+    "battery": 5001,
+    "heartbeat": 5002,
+    "joystick": 8888,
+}
+COMPONENTS = tuple(DEFAULT_PORTS)
+
+
+class BatteryComponent:
+    """TCP control session that drives the blocking battery UDP stream."""
+
+    def __init__(self, host: str, port: int, executor: ThreadPoolExecutor) -> None:
+        self.host = host
+        self.port = port
+        self.executor = executor
+        # The serial port can only be owned by one stream at a time.
+        self._session = asyncio.Lock()
+
+    async def start(self) -> asyncio.AbstractServer:
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        print(f"🚀 Battery kontrol TCP sunucusu: {self.host}:{self.port}")
+        return server
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        client_ip = writer.get_extra_info("peername")[0]
+        async with self._session:
+            print(f"✅ Flutter TCP bağlandı: {client_ip}")
+            try:
+                raw = await asyncio.wait_for(reader.read(64), 1.0)
+            except asyncio.TimeoutError:
+                raw = b""
+            stop_evt = threading.Event()
+            stream = loop.run_in_executor(
+                self.executor, udp_stream_loop, stop_evt, client_ip, parse_udp_port(raw)
+            )
+            try:
+                while await reader.read(64):
+                    pass  # Tek byte ping'ler; EOF bağlantının koptuğu anlamına gelir.
+            except (ConnectionError, OSError):
+                pass
+            print("⚡ Flutter TCP bağlantısı koptu, UDP yayını durduruluyor…")
+            stop_evt.set()
+            await stream
+            writer.close()
+
+
+class CameraComponent:
+    """OAK frame stream with the CPU heavy work pushed to a vision executor."""
+
+    def __init__(self, host: str, port: int, executor: ThreadPoolExecutor) -> None:
+        self.host = host
+        self.port = port
+        self.executor = executor
+        self.settings = oak.StreamSettings()
+        self.config = oak.watch_config(self.settings)
+        self.devices = oak.DeviceMonitor()
+        # DepthAI allows a single open device; clients are served one by one.
+        self._session = asyncio.Lock()
+
+    async def start(self) -> asyncio.AbstractServer:
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        oak.warm_up(self.settings.tracking, self.settings.encoder)
+        oak.start_recorder(self.settings)
+        print(f"🚀 TCP server başlatıldı: {self.host}:{self.port}")
+        return server
+
+    def _open_device(self):
+        """The opened OAK, or ``None`` after waiting a second for it to be plugged in."""
+        if oak.dai is None:
+            raise RuntimeError("DepthAI is not available")
+        if not self.devices.ready(1.0):
+            return None
+        dev = oak.open_device(self.settings)
+        self.devices.opened()
+        return dev
+
+    @staticmethod
+    def _close_device(dev) -> None:
+        try:
+            dev.device.close()
+        except Exception:
+            pass
+
+    def _grab_and_encode(self, dev) -> List[memoryview]:
+        self.config.poll()  # vision thread, between two frames
+        with instr.span("frame_get"):
+            frames = oak.read_frame(dev)
+            if frames is not None:
+                in_mono, encoded = frames
+                frame = in_mono.getCvFrame()
+                depth = dev.depth.latest() if dev.depth is not None else None
+        self.devices.frame()
+        if frames is None:
+            return []   # passthrough JPEG of the frame was dropped
+        packet = oak.process_frame(frame, self.settings, dev.detector, depth,
+                                   in_mono.getTimestamp().total_seconds(), encoded)
+        # Left frame first, then the subscribed right/rgb frames (own buffers).
+        packets = oak.stream_packets(dev, self.settings)
+        if packet is not None:
+            packets.insert(0, packet)
+        return packets
+
+    async def _read_commands(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            data = await reader.read(32)
+            if not data:
+                return
+            oak.feed_commands(data, self.settings)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        async with self._session:
+            peer = writer.get_extra_info("peername")
+            print(f"✅ Flutter bağlantısı geldi: {peer}")
+            dev = None
+            sender = None
+            oak.reset_connection(self.settings)
+            # Packets live in a reused buffer: drain() must only return once the
+            # transport has sent all of it (this also keeps frames from queueing).
+            writer.transport.set_write_buffer_limits(high=0)
+            commands = asyncio.ensure_future(self._read_commands(reader))
+            try:
+                while not commands.done():
+                    try:
+                        if dev is None:
+                            dev = await loop.run_in_executor(self.executor, self._open_device)
+                            continue
+                        packets = await loop.run_in_executor(
+                            self.executor, self._grab_and_encode, dev
+                        )
+                    except (ConnectionError, OSError):
+                        raise
+                    except Exception as e:  # pragma: no cover - device errors are logged
+                        # The client stays connected while the OAK comes back.
+                        print(f"🚨 Kamera hatası: {e}")
+                        self.devices.lost(opening=dev is None)
+                        if dev is None:
+                            await asyncio.sleep(1.0)
+                        else:
+                            await loop.run_in_executor(self.executor, self._close_device, dev)
+                            dev = None
+                        continue
+                    sender = oak.udp_sender(self.settings, peer[0], sender)
+                    for packet in packets:
+                        if sender is not None:
+                            sender.send(packet)  # non-blocking, the buffer is free at once
+                        else:
+                            writer.write(packet)
+                            await writer.drain()
+            except (ConnectionError, OSError):
+                print("⚡ Bağlantı koptu, yeni bağlantı bekleniyor...")
+            except Exception as e:  # pragma: no cover - runtime errors are logged
+                print(f"🚨 Hata oluştu: {e}")
+            finally:
+                commands.cancel()
+                if sender is not None:
+                    sender.close()
+                if dev is not None:
+                    await loop.run_in_executor(self.executor, self._close_device, dev)
+                writer.close()
+
+
+class RosComponents:
+    """rclpy side of the gateway: joystick listener and link-quality publisher."""
+
+    def __init__(self, joystick_port: Optional[int]) -> None:
+        from plc_comm.udp_listener_node import UDPJoystickListener
+
+        rclpy.init()
+        self.node = Node("robot_gateway")
+        self.link_pub = self.node.create_publisher(String, "link_quality", 10)
+        self.executor = SingleThreadedExecutor()
+        self.executor.add_node(self.node)
+        self.listener = None
+        if joystick_port is not None:
+            self.listener = UDPJoystickListener(
+                udp_port=joystick_port, follow=os.environ.get("PLC_FOLLOW", "0") == "1"
+            )
+            self.executor.add_node(self.listener)
+
+    def publish_link_state(self, state: str, snapshot: Dict[str, object]) -> None:
+        self.link_pub.publish(String(data=json.dumps(snapshot)))
+
+    def shutdown(self) -> None:
+        self.executor.shutdown()
+        if self.listener is not None:
+            self.listener.destroy_node()
+        self.node.destroy_node()
+        rclpy.shutdown()
+
+
+async def run_gateway(
+    ports: Dict[str, int], enabled: List[str], host: str = "0.0.0.0"
+) -> None:
+    """Start the ``enabled`` components on the running loop and serve forever."""
+
+    loop = asyncio.get_running_loop()
+    io_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gw-io")
+    vision_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gw-vision")
+
+    ros = None
+    ros_thread = None
+    if rclpy is not None:
+        ros = RosComponents(ports["joystick"] if "joystick" in enabled else None)
+        ros_thread = threading.Thread(target=ros.executor.spin, name="gw-ros", daemon=True)
+        ros_thread.start()
+    elif "joystick" in enabled:
+        print("⚠️ rclpy bulunamadı, joystick bileşeni devre dışı")
+
+    servers: List[asyncio.AbstractServer] = []
+    heartbeat = None
+    try:
+        if "heartbeat" in enabled:
+            heartbeat = HeartbeatService(
+                host, ports["heartbeat"],
+                on_state=ros.publish_link_state if ros is not None else None,
+            )
+            await heartbeat.start()
+        if "battery" in enabled:
+            servers.append(await BatteryComponent(host, ports["battery"], io_executor).start())
+        if "camera" in enabled:
+            camera = CameraComponent(host, ports["camera"], vision_executor)
+            # Components in this process take frames from the bus, without a copy.
+            camera.settings.sinks.append(publishing.bus)
+            camera.settings.sinks.append(publishing.TargetPublisher(camera.settings))
+            if ros is not None:
+                camera.settings.sinks.append(publishing.RosPublisher(ros.node, camera.settings))
+            servers.append(await camera.start())
+
+        print(f"✅ Gateway hazır ({(time.monotonic() - _T0) * 1000:.0f} ms): "
+              + ", ".join(f"{name}={ports[name]}" for name in enabled))
+        await loop.create_future()  # start_server() already serves; run until cancelled
+    finally:
+        for server in servers:
+            server.close()
+        if heartbeat is not None:
+            await heartbeat.close()
+        if ros is not None:
+            ros.shutdown()
+        io_executor.shutdown(wait=False)
+        vision_executor.shutdown(wait=False)
+
+
+def parse_ports(items: List[str]) -> Dict[str, int]:
+    """Parse ``name=port`` overrides on top of :data:`DEFAULT_PORTS`."""
+
+    ports = dict(DEFAULT_PORTS)
+    for item in items:
+        name, _, value = item.partition("=")
+        if name not in ports:
+            raise ValueError(f"unknown component {name!r}, expected one of {COMPONENTS}")
+        ports[name] = int(value)
+    used = [p for n, p in ports.items() if n != "joystick"]
+    if len(set(used)) != len(used):
+        raise ValueError(f"TCP ports collide: {ports}")
+    return ports
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", action="append", default=[], metavar="NAME=PORT",
+                        help="override a component port, e.g. camera=5000")
+    parser.add_argument("--disable", action="append", default=[], choices=COMPONENTS,
+                        help="do not start this component")
+    args = parser.parse_args(argv)
+
+    try:
+        ports = parse_ports(args.port)
+    except ValueError as e:
+        parser.error(str(e))
+    enabled = [name for name in COMPONENTS if name not in args.disable]
+    instr.install("gateway")
+    try:
+        asyncio.run(run_gateway(ports, enabled, args.host))
+    except KeyboardInterrupt:
+        print("\nÇıkılıyor (CTRL+C).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""Process supervisor for the robot nodes.
+
+Replaces the fire-and-forget ``scripts/run_all.sh``:
+
+* every node is started as ``python3 -m <module>`` and gets the write end of
+  a pipe in ``ROBOT_SUPERVISOR_FD``; nodes call
+  :func:`robot_common.liveness.beat` from their main loop,
+* a node that exits, never beats within ``startup_grace_s`` or stops beating
+  for ``liveness_timeout_s`` is killed and restarted with exponential backoff,
+* each node can be pinned to a CPU set and given a nice value or a
+  ``SCHED_FIFO`` priority, so the 20 Hz control loop and the camera/HOG node
+  do not compete for the same cores,
+* start-up time (spawn to first beat) and restart counts are logged and
+  written to a JSON status file.
+
+The node table can be replaced with ``--config nodes.json`` holding a list of
+objects with the :class:`NodeSpec` field names.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import selectors
+import signal
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from robot_common.liveness import ENV_FD
+
+
+@dataclass
+class NodeSpec:
+    """How to start and schedule one node."""
+
+    name: str
+    module: str
+    cpus: Optional[List[int]] = None
+    nice: int = 0
+    rt_priority: int = 0  # > 0 selects SCHED_FIFO with this priority
+    liveness_timeout_s: float = 5.0
+    startup_grace_s: float = 30.0
+    command: Optional[List[str]] = None  # overrides ``python3 -m module``
+
+
+DEFAULT_NODES = [
+    NodeSpec("battery", "battery_streamer.battery_udp_node", nice=5),
+    NodeSpec("heartbeat", "commcheck.commcheck"),
+    # Vision is the CPU hog: keep it off the control core and below it in priority.
+    NodeSpec("camera", "oak_streamer.oak_streamer_node", cpus=[2, 3], nice=10),
+    # The control node beats from a liveness.LoopMonitor thread: while its 20 Hz loop
+    # progresses or waits inside one Modbus call for at most modbus_timeout_s x 4
+    # (pymodbus retries=3), so an unreachable PLC is left to its reconnect logic and
+    # the PLC watchdog.  2 s covers a 1 s loop stall plus one missed beat.
+    NodeSpec("control", "plc_comm.udp_listener_node", cpus=[1], rt_priority=10,
+             liveness_timeout_s=2.0),
+]
+
+
+@dataclass
+class NodeState:
+    spec: NodeSpec
+    proc: Optional[subprocess.Popen] = None
+    beat_fd: int = -1
+    spawned_at: float = 0.0
+    last_beat: Optional[float] = None
+    next_start: float = 0.0
+    failures: int = 0
+    starts: int = 0
+    restarts: int = 0
+    startup_ms: List[float] = field(default_factory=list)
+    last_exit: Optional[int] = None
+
+    def status(self) -> Dict[str, object]:
+        return {
+            "pid": self.proc.pid if self.proc else None,
+            "starts": self.starts,
+            "restarts": self.restarts,
+            "last_startup_ms": self.startup_ms[-1] if self.startup_ms else None,
+            "startup_ms": self.startup_ms[-10:],
+            "last_exit": self.last_exit,
+        }
+
+
+def backoff_s(failures: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """Delay before the next restart after ``failures`` consecutive failures."""
+    if failures <= 0:
+        return 0.0
+    return min(cap, base * 2 ** (failures - 1))
+
+
+def _usable_cpus(cpus: Optional[List[int]]) -> Optional[set]:
+    if not cpus:
+        return None
+    usable = set(cpus) & os.sched_getaffinity(0)
+    return usable or None
+
+
+def _scheduling_preexec(spec: NodeSpec):
+    cpus = _usable_cpus(spec.cpus)
+
+    def apply() -> None:
+        # Runs in the child before exec; failures must not abort the spawn.
+        try:
+            if cpus:
+                os.sched_setaffinity(0, cpus)
+            if spec.nice:
+                os.nice(spec.nice)
+            if spec.rt_priority > 0:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(spec.rt_priority))
+        except OSError:
+            pass
+
+    return apply
+
+
+class Supervisor:
+    def __init__(self, nodes: List[NodeSpec], status_path: Optional[str] = None,
+                 stable_after_s: float = 60.0, log=print) -> None:
+        self.nodes = [NodeState(spec) for spec in nodes]
+        self.status_path = status_path
+        self.stable_after_s = stable_after_s
+        self.log = log
+        self.selector = selectors.DefaultSelector()
+        self.running = True
+        self._last_status = 0.0
+
+    # -- process management -------------------------------------------------
+    def spawn(self, node: NodeState) -> None:
+        spec = node.spec
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(read_fd, False)
+        os.set_blocking(write_fd, False)
+        env = dict(os.environ, **{ENV_FD: str(write_fd)})
+        cmd = spec.command or [sys.executable, "-m", spec.module]
+        try:
+            node.proc = subprocess.Popen(cmd, env=env, pass_fds=(write_fd,),
+                                         preexec_fn=_scheduling_preexec(spec))
+        except OSError as e:
+            os.close(read_fd)
+            os.close(write_fd)
+            self.log(f"🚨 {spec.name} başlatılamadı: {e}")
+            node.failures += 1
+            node.next_start = time.monotonic() + backoff_s(node.failures)
+            return
+        os.close(write_fd)  # Only the child keeps the write end open.
+        node.beat_fd = read_fd
+        node.spawned_at = time.monotonic()
+        node.last_beat = None
+        if node.starts:
+            node.restarts += 1
+        node.starts += 1
+        self.selector.register(read_fd, selectors.EVENT_READ, node)
+        self._report_scheduling(node)
+        self.log(f"▶️ {spec.name} başlatıldı (pid {node.proc.pid}, başlatma #{node.starts})")
+
+    def _report_scheduling(self, node: NodeState) -> None:
+        spec, pid = node.spec, node.proc.pid
+        if spec.rt_priority > 0:
+            try:
+                if os.sched_getscheduler(pid) != os.SCHED_FIFO:
+                    self.log(f"⚠️ {spec.name}: SCHED_FIFO uygulanamadı (CAP_SYS_NICE gerekli)")
+            except OSError:
+                pass
+        if spec.cpus and not _usable_cpus(spec.cpus):
+            self.log(f"⚠️ {spec.name}: CPU seti {spec.cpus} bu sistemde yok, sabitlenmedi")
+
+    def stop(self, node: NodeState, reason: str) -> None:
+        proc = node.proc
+        if proc is None:
+            return
+        if proc.poll() is None:
+            self.log(f"⏹ {node.spec.name} durduruluyor: {reason}")
+            proc.terminate()
+            try:
+                proc.wait(timeout=3.0)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+        node.last_exit = proc.returncode
+        node.proc = None
+        self._close_beat_fd(node)
+
+    def _close_beat_fd(self, node: NodeState) -> None:
+        if node.beat_fd >= 0:
+            self.selector.unregister(node.beat_fd)
+            os.close(node.beat_fd)
+            node.beat_fd = -1
+
+    def _failed(self, node: NodeState, reason: str) -> None:
+        now = time.monotonic()
+        if node.last_beat is not None and now - node.spawned_at > self.stable_after_s:
+            node.failures = 0  # It ran fine for a while; start the backoff over.
+        self.stop(node, reason)
+        node.failures += 1
+        delay = backoff_s(node.failures)
+        node.next_start = now + delay
+        self.log(f"🔁 {node.spec.name}: {reason}, {delay:.1f} s sonra yeniden başlatılacak "
+                 f"(çıkış kodu {node.last_exit}, yeniden başlatma {node.restarts})")
+
+    # -- liveness -------------------------------------------------------------
+    def _drain_beats(self, timeout: float) -> None:
+        for key, _ in self.selector.select(timeout):
+            node: NodeState = key.data
+            try:
+                data = os.read(key.fd, 4096)
+            except BlockingIOError:
+                continue
+            if not data:
+                # EOF: an exit is picked up by poll(), a closed pipe by the timeout.
+                self._close_beat_fd(node)
+                continue
+            now = time.monotonic()
+            if node.last_beat is None:
+                ms = (now - node.spawned_at) * 1000
+                node.startup_ms.append(round(ms, 1))
+                self.log(f"✅ {node.spec.name} hazır: {ms:.0f} ms")
+            node.last_beat = now
+
+    def check(self) -> None:
+        now = time.monotonic()
+        for node in self.nodes:
+            spec = node.spec
+            if node.proc is None:
+                if now >= node.next_start:
+                    self.spawn(node)
+                continue
+            if node.proc.poll() is not None:
+                self._failed(node, "süreç sonlandı")
+            elif node.last_beat is None:
+                if now - node.spawned_at > spec.startup_grace_s:
+                    self._failed(node, "başlangıçta heartbeat gelmedi")
+            elif now - node.last_beat > spec.liveness_timeout_s:
+                self._failed(node, f"{now - node.last_beat:.1f} s heartbeat yok")
+
+    def status(self) -> Dict[str, object]:
+        return {n.spec.name: n.status() for n in self.nodes}
+
+    def _write_status(self) -> None:
+        now = time.monotonic()
+        if not self.status_path or now - self._last_status < 1.0:
+            return
+        self._last_status = now
+        tmp = self.status_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.status(), f, indent=2)
+        os.replace(tmp, self.status_path)
+
+    def run(self, poll_s: float = 0.1) -> None:
+        while self.running:
+            self.check()
+            self._drain_beats(poll_s)
+            self._write_status()
+        for node in self.nodes:
+            self.stop(node, "supervisor kapanıyor")
+        self.log(json.dumps(self.status()))
+
+
+def load_nodes(path: Optional[str]) -> List[NodeSpec]:
+    if not path:
+        return list(DEFAULT_NODES)
+    with open(path) as f:
+        return [NodeSpec(**item) for item in json.load(f)]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", help="JSON list of node specs")
+    parser.add_argument("--status", default="/tmp/robot_supervisor.json",
+                        help="where to write per-node start-up times and restart counts")
+    parser.add_argument("--only", action="append", default=[],
+                        help="start only the named node(s)")
+    parser.add_argument("--print-config", action="store_true",
+                        help="print the effective node table and exit")
+    args = parser.parse_args(argv)
+
+    nodes = load_nodes(args.config)
+    if args.only:
+        nodes = [n for n in nodes if n.name in args.only]
+    if args.print_config:
+        print(json.dumps([asdict(n) for n in nodes], indent=2))
+        return
+
+    supervisor = Supervisor(nodes, status_path=args.status)
+
+    def _stop(signum, _frame):
+        supervisor.running = False
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+    supervisor.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+from setuptools import setup
+
+package_name = 'robot_bringup'
+
+setup(
+    name=package_name,
+    version='0.0.0',
+    packages=[package_name],
+    data_files=[
+        ('share/ament_index/resource_index/packages',
+            ['resource/' + package_name]),
+        ('share/' + package_name, ['package.xml']),
+    ],
+    install_requires=['setuptools'],
+    zip_safe=True,
+    maintainer='kaanjetson',
+    maintainer_email='kaanjetson@todo.todo',
+    description='Robot düğümlerini tek süreçte veya ayrı süreçlerde başlatma araçları',
+    license='MIT',
+    tests_require=['pytest'],
+    entry_points={
+        'console_scripts': [
+            'robot_gateway = robot_bringup.gateway:main',
+            'robot_supervisor = robot_bringup.supervisor:main',
+        ],
+    },
+)
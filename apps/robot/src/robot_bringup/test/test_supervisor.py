@@ -0,0 +1,54 @@
+import sys
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[2]
+sys.path.append(str(SRC / "robot_bringup"))
+sys.path.append(str(SRC / "robot_common"))
+from robot_bringup.supervisor import NodeSpec, Supervisor, backoff_s  # noqa: E402
+
+# Child that beats a few times through robot_common.liveness and then crashes.
+CRASHER = (
+    "import sys, time; sys.path.insert(0, %r)\n"
+    "from robot_common import liveness\n"
+    "liveness.MIN_INTERVAL_S = 0\n"
+    "for _ in range(3):\n"
+    "    liveness.beat(); time.sleep(0.02)\n"
+    "sys.exit(3)\n" % str(SRC / "robot_common")
+)
+
+
+def test_backoff_is_exponential_and_capped():
+    assert backoff_s(0) == 0.0
+    assert [backoff_s(n, base=0.5) for n in (1, 2, 3)] == [0.5, 1.0, 2.0]
+    assert backoff_s(50, cap=30.0) == 30.0
+
+
+def test_crashing_node_is_restarted_and_counted():
+    spec = NodeSpec("crasher", "unused", command=[sys.executable, "-c", CRASHER])
+    sup = Supervisor([spec], log=lambda _: None)
+    node = sup.nodes[0]
+    deadline = time.monotonic() + 10.0
+    while node.restarts < 2 and time.monotonic() < deadline:
+        sup.check()
+        sup._drain_beats(0.01)
+    last_exit = node.last_exit
+    sup.stop(node, "test bitti")
+    assert node.restarts >= 2
+    assert last_exit == 3
+    assert node.startup_ms and all(ms > 0 for ms in node.startup_ms)
+
+
+def test_silent_node_is_killed_after_liveness_timeout():
+    spec = NodeSpec("silent", "unused", startup_grace_s=0.2,
+                    command=[sys.executable, "-c", "import time; time.sleep(30)"])
+    sup = Supervisor([spec], log=lambda _: None)
+    node = sup.nodes[0]
+    sup.check()
+    pid = node.proc.pid
+    deadline = time.monotonic() + 5.0
+    while node.proc is not None and time.monotonic() < deadline:
+        sup.check()
+        sup._drain_beats(0.01)
+    assert node.proc is None or node.proc.pid != pid
+    assert node.failures == 1
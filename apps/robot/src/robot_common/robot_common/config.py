@@ -0,0 +1,303 @@
+"""Shared, hot-reloadable tuning values of the robot nodes.
+
+Every tunable lives in :data:`SCHEMA`, grouped by node (``plc``, ``camera``,
+``battery``).  A value comes from, lowest precedence first:
+
+1. the schema default,
+2. the node's environment variable, if the parameter has one,
+3. the JSON file ``ROBOT_CONFIG`` (default ``/etc/robot/config.json``)::
+
+       {"plc": {"ip": "192.168.1.5", "max_latency_ms": 2000},
+        "camera": {"jpeg_quality": 30}}
+
+4. overrides the node was started with (command line arguments).
+
+A node owns a :class:`ConfigWatcher` for its section and calls
+:meth:`~ConfigWatcher.poll` once per loop iteration, between two units of
+work.  ``poll`` stats the file at most once per ``interval_s``.  When the file
+changed it parses and validates the whole section first.  A file that does
+not parse, or any invalid value, rejects the change as a whole and the
+running values stay.  Otherwise the node's ``apply(old, new)`` callback gets
+the previous and the new :class:`Config`.  If ``apply`` raises (a port cannot
+be bound, a PLC address does not answer), ``apply(new, old)`` is called to
+undo what was done and the old values stay in force.  A node therefore sees
+either all of a change or none of it, and only at a loop boundary.
+
+``python3 -m robot_common.config [file]`` validates a file and prints the
+effective values before it is deployed.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+ENV_FILE = "ROBOT_CONFIG"
+DEFAULT_PATH = "/etc/robot/config.json"
+
+
+class Param(NamedTuple):
+    default: Any
+    type: type
+    low: Optional[float] = None
+    high: Optional[float] = None
+    env: Optional[str] = None
+    help: str = ""
+
+
+SCHEMA: Dict[str, Dict[str, Param]] = {
+    "plc": {
+        "ip": Param("192.168.1.5", str, env="PLC_IP", help="Delta PLC address"),
+        "port": Param(502, int, 1, 65535, "PLC_PORT", "Modbus TCP port"),
+        "modbus_timeout_s": Param(1.0, float, 0.05, 10.0, help="Modbus request timeout"),
+        "udp_port": Param(8888, int, 1, 65535, "PLC_UDP_PORT", "joystick UDP port"),
+        "max_latency_ms": Param(3000, int, 100, 60000,
+                                help="older joystick packets trigger a safe stop"),
+        "heartbeat_hz": Param(10.0, float, 0.0, 50.0, "PLC_HEARTBEAT_HZ",
+                              "PLC watchdog heartbeat rate, 0 = off"),
+        "watchdog_ms": Param(500, int, 100, 10000, "PLC_WATCHDOG_MS",
+                             "PLC stops the motors after this long without a heartbeat"),
+    },
+    "camera": {
+        "jpeg_quality": Param(20, int, 1, 100, help="JPEG quality of the left stream"),
+        "stop_distance_m": Param(2.0, float, 0.2, 20.0, help="stop distance to a person"),
+        "sensitivity": Param(0.5, float, 0.0, 1.0, help="detector sensitivity"),
+    },
+    "battery": {
+        "read_period_s": Param(1.0, float, 0.1, 60.0, "BMS_PERIOD_S", "BMS polling period"),
+        "udp_port": Param(8890, int, 1, 65535, help="default UDP target port"),
+        "serial_port": Param("/dev/ttyUSB0", str, env="BMS_SERIAL_PORT", help="BMS UART"),
+    },
+}
+
+
+class ConfigError(ValueError):
+    """A configuration value or file that cannot be used."""
+
+
+class Config(Mapping):
+    """Immutable, validated values of one section; also readable as attributes."""
+
+    def __init__(self, section: str, values: Mapping[str, Any]) -> None:
+        self.section = section
+        self._values = MappingProxyType(dict(values))
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[key]
+
+    def __getattr__(self, key: str) -> Any:
+        if key.startswith("_"):
+            raise AttributeError(key)
+        try:
+            return self._values[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return f"Config({self.section!r}, {dict(self._values)!r})"
+
+    def changed(self, other: "Config") -> List[str]:
+        """Keys whose value differs from ``other``."""
+        return [k for k in self._values if other.get(k) != self._values[k]]
+
+
+def validate(section: str, key: str, value: Any) -> Any:
+    """Return ``value`` converted to the parameter's type; :class:`ConfigError` if invalid."""
+
+    param = SCHEMA[section].get(key)
+    if param is None:
+        raise ConfigError(f"{section}.{key}: unknown parameter")
+    wrong_type = ConfigError(f"{section}.{key}: expected {param.type.__name__}, got {value!r}")
+    if isinstance(value, bool) or isinstance(value, str) != (param.type is str):
+        raise wrong_type
+    if param.type is int and isinstance(value, float):
+        if not value.is_integer():
+            raise wrong_type
+        value = int(value)
+    elif param.type is float:
+        value = float(value)
+    if param.type is str and (not value or value != value.strip()):
+        raise ConfigError(f"{section}.{key}: empty or padded string {value!r}")
+    if param.low is not None and value < param.low or (
+        param.high is not None and value > param.high
+    ):
+        raise ConfigError(f"{section}.{key}: {value} outside {param.low}…{param.high}")
+    return value
+
+
+def _from_env(section: str) -> Dict[str, Any]:
+    values = {}
+    for key, param in SCHEMA[section].items():
+        raw = os.environ.get(param.env) if param.env else None
+        if raw:
+            try:
+                value = raw if param.type is str else param.type(raw)
+            except ValueError:
+                raise ConfigError(f"{param.env}: expected {param.type.__name__}, "
+                                  f"got {raw!r}") from None
+            values[key] = validate(section, key, value)
+        else:
+            values[key] = param.default
+    return values
+
+
+def load_file(path: str) -> Dict[str, Dict[str, Any]]:
+    """Parse the JSON config file; :class:`ConfigError` when it is unusable."""
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except ValueError as e:
+        raise ConfigError(f"{path}: {e}") from None
+    if not isinstance(data, dict) or not all(isinstance(v, dict) for v in data.values()):
+        raise ConfigError(f"{path}: expected {{section: {{name: value}}}}")
+    unknown = set(data) - set(SCHEMA)
+    if unknown:
+        raise ConfigError(f"{path}: unknown sections {sorted(unknown)}")
+    return data
+
+
+def resolve(section: str, file_values: Mapping[str, Any],
+            overrides: Mapping[str, Any] = MappingProxyType({})) -> Config:
+    """Defaults, environment, file and overrides merged and validated."""
+
+    values = _from_env(section)
+    for key, value in list(file_values.items()) + list(overrides.items()):
+        values[key] = validate(section, key, value)
+    return Config(section, values)
+
+
+Apply = Callable[[Config, Config], None]
+
+
+class ConfigWatcher:
+    """Current :class:`Config` of ``section``, reloaded at loop boundaries.
+
+    ``overrides`` (e.g. ports given on a node's command line) win over the
+    file for the lifetime of the watcher.
+    """
+
+    def __init__(self, section: str, apply: Optional[Apply] = None,
+                 path: Optional[str] = None, overrides: Optional[Mapping[str, Any]] = None,
+                 interval_s: float = 1.0, clock=time.monotonic,
+                 log: Callable[[str], None] = print) -> None:
+        self.section = section
+        self.apply = apply
+        self.path = path or os.environ.get(ENV_FILE, DEFAULT_PATH)
+        self.interval_s = interval_s
+        self.clock = clock
+        self.log = log
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._checked_at = -float("inf")
+        self._file_values: Mapping[str, Any] = {}
+        self.overrides = {k: validate(section, k, v) for k, v in (overrides or {}).items()}
+        # Metrics
+        self.reloads = 0
+        self.rejected = 0
+        self.rolled_back = 0
+        values = self._read_file(force=True) or {}
+        try:
+            self.current = resolve(section, values, self.overrides)
+            self._file_values = values
+        except ConfigError as e:
+            # A broken file at start-up must not keep the node from running.
+            self.log(f"⚠️ Yapılandırma geçersiz, varsayılanlar kullanılıyor: {e}")
+            self._file_values = {}
+            self.current = resolve(section, {}, self.overrides)
+
+    def _read_file(self, force: bool = False) -> Optional[Mapping[str, Any]]:
+        """The section's values if the file changed, ``None`` if it did not.
+
+        Nothing is stored here: the caller keeps the values only once they
+        are validated (and applied), so a rejected edit never becomes the
+        baseline of the next comparison.
+        """
+
+        now = self.clock()
+        if not force and now - self._checked_at < self.interval_s:
+            return False
+        self._checked_at = now
+        try:
+            st = os.stat(self.path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        if stamp == self._stamp:
+            return None
+        self._stamp = stamp
+        try:
+            data = load_file(self.path) if stamp is not None else {}
+        except (ConfigError, OSError) as e:
+            self.rejected += 1
+            self.log(f"⚠️ Yapılandırma okunamadı, eski değerler korunuyor: {e}")
+            return None
+        return data.get(self.section, {})
+
+    def poll(self) -> List[str]:
+        """Apply a changed file; returns the keys that changed (empty: nothing did)."""
+
+        values = self._read_file()
+        if values is None:
+            return []
+        try:
+            new = resolve(self.section, values, self.overrides)
+        except ConfigError as e:
+            self.rejected += 1
+            self.log(f"⚠️ Yapılandırma reddedildi: {e}")
+            return []
+        old = self.current
+        changed = new.changed(old)
+        if not changed:
+            self._file_values = values
+            return []
+        if self.apply is not None:
+            try:
+                self.apply(old, new)
+            except Exception as e:
+                self.rolled_back += 1
+                self.log(f"⚠️ Yapılandırma uygulanamadı, geri alındı "
+                         f"({', '.join(changed)}): {e}")
+                try:
+                    self.apply(new, old)
+                except Exception as undo_error:  # keep running on the old values
+                    self.log(f"🚨 Geri alma da başarısız: {undo_error}")
+                return []
+        self.current = new
+        self._file_values = values
+        self.reloads += 1
+        self.log("🔧 Yapılandırma güncellendi: "
+                 + ", ".join(f"{self.section}.{k}={new[k]}" for k in changed))
+        return changed
+
+    def stats(self) -> Dict[str, object]:
+        return {"path": self.path, "reloads": self.reloads, "rejected": self.rejected,
+                "rolled_back": self.rolled_back, **self.current}
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Robot yapılandırmasını doğrula")
+    parser.add_argument("path", nargs="?", default=os.environ.get(ENV_FILE, DEFAULT_PATH))
+    args = parser.parse_args(argv)
+    try:
+        data = load_file(args.path)
+        out = {section: dict(resolve(section, data.get(section, {}))) for section in SCHEMA}
+    except (ConfigError, OSError) as e:
+        print(f"🚨 {e}")
+        return 1
+    print(json.dumps(out, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,413 @@
+"""Device hotplug events for the nodes that hold a USB device open.
+
+The BMS UART adapter and the OAK camera drop off the bus on a USB glitch and
+come back a moment later.  Instead of retrying blindly every second, a node
+subscribes to hotplug events and reopens the device as soon as it is back.
+
+One :class:`DeviceWatch` per process (:func:`shared`) reads the events on a
+background thread, from the first source that works:
+
+``netlink``
+    Kernel and udev uevents (``NETLINK_KOBJECT_UEVENT``, groups 1 and 2).
+    The kernel event arrives first; the udev one follows once the
+    ``/dev/serial/by-id`` links and permissions are in place, so a reopen
+    that was too early gets a second chance.
+``inotify``
+    Entries created/removed under ``/dev``, ``/dev/serial/by-id`` and
+    ``/dev/bus/usb/*``, for containers where uevents do not arrive.
+``none``
+    No events; :meth:`Subscription.wait` simply times out and the caller
+    retries on its own schedule.
+
+``ROBOT_DEVWATCH=netlink|inotify|off`` forces a source.  Events are only a
+hint to try again now: consumers still check that their device opens and
+keep a slow periodic retry in case an event is missed.
+
+:class:`ReconnectTimer` measures what the user sees: the time from the
+device reappearing to the first good sample or frame.
+"""
+
+from __future__ import annotations
+
+import collections
+import ctypes
+import ctypes.util
+import os
+import select
+import socket
+import struct
+import threading
+import time
+from typing import Callable, Deque, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+ENV_SOURCE = "ROBOT_DEVWATCH"
+
+NETLINK_KOBJECT_UEVENT = 15
+GROUP_KERNEL = 1
+GROUP_UDEV = 2
+UDEV_PREFIX = b"libudev\0"
+UDEV_MAGIC = 0xFEEDCAFE
+
+INOTIFY_EVENT = struct.Struct("iIII")
+IN_ATTRIB = 0x004
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_TO | IN_ATTRIB
+WATCH_DIRS = ("/dev", "/dev/serial", "/dev/serial/by-id", "/dev/bus/usb")
+BY_ID_DIR = "/dev/serial/by-id"
+
+
+class DeviceEvent(NamedTuple):
+    action: str                 # add, remove, change, bind, ...
+    subsystem: str              # tty, usb, ... ("" when unknown)
+    devname: str                # /dev path, "" when the event has none
+    props: Mapping[str, str]
+    source: str                 # kernel, udev or inotify
+    t: float                    # time.monotonic() when received
+
+
+def parse_uevent(data: bytes, now: Optional[float] = None) -> Optional[DeviceEvent]:
+    """Decode a kernel (``action@devpath\\0KEY=VALUE\\0…``) or libudev uevent."""
+
+    source = "kernel"
+    if data.startswith(UDEV_PREFIX):
+        if len(data) < 24 or struct.unpack_from(">I", data, 8)[0] != UDEV_MAGIC:
+            return None
+        offset, length = struct.unpack_from("=II", data, 16)
+        fields = data[offset:offset + length].split(b"\0")
+        source = "udev"
+    else:
+        fields = data.split(b"\0")[1:]
+    props = {}
+    for field in fields:
+        key, sep, value = field.partition(b"=")
+        if sep:
+            props[key.decode(errors="replace")] = value.decode(errors="replace")
+    if "ACTION" not in props:
+        return None
+    devname = props.get("DEVNAME", "")
+    if devname and not devname.startswith("/"):
+        devname = "/dev/" + devname
+    return DeviceEvent(props["ACTION"], props.get("SUBSYSTEM", ""), devname, props, source,
+                       time.monotonic() if now is None else now)
+
+
+def usb_vendor(path: str) -> str:
+    """``idVendor`` of a ``/dev/bus/usb`` node as 4 hex digits ("" if unreadable)."""
+
+    try:
+        with open(path, "rb") as f:
+            descriptor = f.read(18)
+    except OSError:
+        return ""
+    return f"{struct.unpack_from('<H', descriptor, 8)[0]:04x}" if len(descriptor) >= 10 else ""
+
+
+def inotify_event(path: str, mask: int, now: Optional[float] = None) -> DeviceEvent:
+    """The :class:`DeviceEvent` for an inotify change of ``path``."""
+
+    action = "add" if mask & (IN_CREATE | IN_MOVED_TO) else (
+        "remove" if mask & IN_DELETE else "change")
+    props: Dict[str, str] = {}
+    name = os.path.basename(path)
+    if path.startswith("/dev/bus/usb/"):
+        subsystem = "usb"
+        if action != "remove":
+            props["ID_VENDOR_ID"] = usb_vendor(path)
+    elif name.startswith("tty") or path.startswith("/dev/serial/"):
+        subsystem = "tty"
+    else:
+        subsystem = ""
+    return DeviceEvent(action, subsystem, path, props, "inotify",
+                       time.monotonic() if now is None else now)
+
+
+class Subscription:
+    """Queue of the events of some subsystems, for one consumer."""
+
+    def __init__(self, watch: "DeviceWatch", subsystems: Iterable[str], maxlen: int = 64) -> None:
+        self.watch = watch
+        self.subsystems = frozenset(subsystems)
+        self._events: Deque[DeviceEvent] = collections.deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+
+    @property
+    def live(self) -> bool:
+        """``True`` when events can arrive at all (the watch has a source)."""
+        return self.watch.source != "none"
+
+    def offer(self, event: DeviceEvent) -> None:
+        if self.subsystems and event.subsystem not in self.subsystems:
+            return
+        with self._cond:
+            self._events.append(event)
+            self._cond.notify_all()
+
+    def wait(self, timeout_s: float,
+             match: Optional[Callable[[DeviceEvent], bool]] = None) -> Optional[DeviceEvent]:
+        """Next (matching) event, or ``None`` after ``timeout_s``."""
+
+        deadline = time.monotonic() + timeout_s
+        with self._cond:
+            while True:
+                while self._events:
+                    event = self._events.popleft()
+                    if match is None or match(event):
+                        return event
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def clear(self) -> None:
+        """Forget queued events, e.g. those caused by opening the device."""
+        with self._cond:
+            self._events.clear()
+
+    def close(self) -> None:
+        self.watch.unsubscribe(self)
+
+
+def _inotify_libc():
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        raise OSError("inotify is not available")
+    return libc
+
+
+class DeviceWatch:
+    """Background reader of hotplug events, fanned out to :class:`Subscription` s."""
+
+    def __init__(self, source: Optional[str] = None,
+                 watch_dirs: Tuple[str, ...] = WATCH_DIRS,
+                 log: Callable[[str], None] = print) -> None:
+        self.requested = source or os.environ.get(ENV_SOURCE, "auto")
+        self.watch_dirs = watch_dirs
+        self.log = log
+        self.source = "none"
+        self._subs: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._fd = -1
+        self._libc = None
+        self._dirs: Dict[int, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Metrics
+        self.events = 0
+
+    def start(self) -> "DeviceWatch":
+        order = {"auto": ("netlink", "inotify"), "netlink": ("netlink",),
+                 "inotify": ("inotify",)}.get(self.requested, ())
+        for source in order:
+            try:
+                getattr(self, f"_open_{source}")()
+            except (OSError, AttributeError) as e:
+                self.log(f"⚠️ Cihaz izleme kaynağı '{source}' açılamadı: {e}")
+                continue
+            self.source = source
+            break
+        if self.source != "none":
+            self._thread = threading.Thread(target=self._run, name="devwatch", daemon=True)
+            self._thread.start()
+        return self
+
+    def _open_netlink(self) -> None:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+            sock.bind((0, GROUP_KERNEL | GROUP_UDEV))
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+
+    def _open_inotify(self) -> None:
+        self._libc = _inotify_libc()
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self._fd = fd
+        for path in self.watch_dirs:
+            self._add_watch(path)
+        bus = "/dev/bus/usb"
+        if bus in self.watch_dirs and os.path.isdir(bus):
+            for name in sorted(os.listdir(bus)):
+                self._add_watch(os.path.join(bus, name))
+
+    def _add_watch(self, path: str) -> None:
+        if not os.path.isdir(path):
+            return
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd >= 0:
+            self._dirs[wd] = path
+
+    def _read_inotify(self, buf: bytes) -> List[DeviceEvent]:
+        events = []
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(buf):
+            wd, mask, _cookie, length = INOTIFY_EVENT.unpack_from(buf, offset)
+            name = buf[offset + INOTIFY_EVENT.size:offset + INOTIFY_EVENT.size + length]
+            offset += INOTIFY_EVENT.size + length
+            parent = self._dirs.get(wd)
+            if parent is None:
+                continue
+            path = os.path.join(parent, os.fsdecode(name.rstrip(b"\0")))
+            if mask & IN_ISDIR:
+                # /dev/serial, /dev/serial/by-id and USB bus directories come and go.
+                if mask & (IN_CREATE | IN_MOVED_TO) and (
+                    path in self.watch_dirs or parent == "/dev/bus/usb"
+                ):
+                    self._add_watch(path)
+                continue
+            events.append(inotify_event(path, mask))
+        return events
+
+    def _run(self) -> None:
+        fd = self._sock.fileno() if self._sock is not None else self._fd
+        while not self._stop.is_set():
+            try:
+                ready, _, _ = select.select([fd], [], [], 1.0)
+                if not ready:
+                    continue
+                if self._sock is not None:
+                    event = parse_uevent(self._sock.recv(1 << 16))
+                    events = [event] if event is not None else []
+                else:
+                    events = self._read_inotify(os.read(fd, 1 << 16))
+            except BlockingIOError:
+                continue
+            except OSError as e:   # ENOBUFS after an event storm: events lost, not fatal
+                self.log(f"⚠️ Cihaz olayları okunamadı: {e}")
+                continue
+            for event in events:
+                self.feed(event)
+
+    def feed(self, event: DeviceEvent) -> None:
+        """Hand ``event`` to every subscription."""
+        self.events += 1
+        with self._lock:
+            subs = list(self._subs)
+        for sub in subs:
+            sub.offer(event)
+
+    def subscribe(self, subsystems: Iterable[str] = ()) -> Subscription:
+        """Events of ``subsystems`` (all when empty) from now on."""
+        sub = Subscription(self, subsystems)
+        with self._lock:
+            self._subs.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            if sub in self._subs:
+                self._subs.remove(sub)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(2.0)
+        if self._sock is not None:
+            self._sock.close()
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def stats(self) -> Dict[str, object]:
+        return {"source": self.source, "events": self.events, "subscribers": len(self._subs)}
+
+
+_shared: Optional[DeviceWatch] = None
+_shared_lock = threading.Lock()
+
+
+def shared() -> DeviceWatch:
+    """The process-wide watch, started on first use."""
+
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            from robot_common import instrumentation as instr
+
+            _shared = DeviceWatch().start()
+            instr.gauge("devwatch", _shared.stats)
+        return _shared
+
+
+def stable_path(port: str, by_id_dir: str = BY_ID_DIR) -> str:
+    """The ``/dev/serial/by-id`` link of ``port``, or ``port`` when it has none.
+
+    ``/dev/ttyUSB0`` can come back as ``ttyUSB1`` after a glitch (the old
+    number is still held open); the by-id link follows the adapter itself.
+    """
+
+    if os.path.dirname(port) == by_id_dir or not os.path.isdir(by_id_dir):
+        return port
+    real = os.path.realpath(port)
+    for name in sorted(os.listdir(by_id_dir)):
+        link = os.path.join(by_id_dir, name)
+        if os.path.realpath(link) == real:
+            return link
+    return port
+
+
+def same_device(fd: int, path: str) -> bool:
+    """``True`` when the open ``fd`` is still the device node ``path`` names."""
+
+    try:
+        return os.fstat(fd).st_rdev == os.stat(path).st_rdev
+    except OSError:
+        return False
+
+
+class ReconnectTimer:
+    """Time from a device reappearing to its first good sample or frame.
+
+    :meth:`lost` when the device fails, :meth:`appeared` on the hotplug event
+    that brings it back, :meth:`recovered` on the first good sample.  When no
+    event was seen (no watch source, or the device came back before the loss
+    was noticed), the reconnect is timed from :meth:`lost`.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self.lost_at: Optional[float] = None
+        self.appeared_at: Optional[float] = None
+        # Metrics
+        self.reconnects = 0
+        self.last_ms: Optional[float] = None
+        self.max_ms = 0.0
+        self.outage_ms: Optional[float] = None
+
+    @property
+    def down(self) -> bool:
+        return self.lost_at is not None
+
+    def lost(self) -> None:
+        if self.lost_at is None:
+            self.lost_at = self.clock()
+            self.appeared_at = None
+
+    def appeared(self, t: Optional[float] = None) -> None:
+        if self.lost_at is not None and self.appeared_at is None:
+            self.appeared_at = self.clock() if t is None else t
+
+    def recovered(self) -> Optional[float]:
+        """Reconnect time in ms, or ``None`` when nothing was lost."""
+
+        if self.lost_at is None:
+            return None
+        now = self.clock()
+        since = self.lost_at if self.appeared_at is None else self.appeared_at
+        self.last_ms = round((now - since) * 1000, 1)
+        self.outage_ms = round((now - self.lost_at) * 1000, 1)
+        self.max_ms = max(self.max_ms, self.last_ms)
+        self.reconnects += 1
+        self.lost_at = self.appeared_at = None
+        return self.last_ms
+
+    def stats(self) -> Dict[str, object]:
+        return {"down": self.down, "reconnects": self.reconnects, "last_ms": self.last_ms,
+                "max_ms": self.max_ms, "outage_ms": self.outage_ms}
@@ -0,0 +1,339 @@
+"""Hot-path timing spans and an on-demand profiler for the robot nodes.
+
+Usage inside a node::
+
+    from robot_common import instrumentation as instr
+
+    instr.install("oak_streamer")          # once, at start-up
+    with instr.span("detect"):
+        boxes = detect_humans(frame)
+
+While instrumentation is disabled (the default) :func:`span` returns a shared
+do-nothing context manager, so a span costs one function call.  It is enabled
+with ``ROBOT_INSTRUMENT=1`` or at runtime over the control socket.
+
+:func:`install` starts a control server on the Unix socket
+``/tmp/robot-instr-<node>.sock`` that understands one command per
+connection and answers with JSON::
+
+    enable | disable | reset | stats
+    profile [stacks|cprofile] [seconds]
+
+``stats`` also reports the gauges registered with :func:`gauge` (derived
+counters such as the motion gate's skip ratio), whether or not spans are
+enabled.
+
+``profile stacks`` samples the stacks of all threads and writes collapsed
+stacks (``frame;frame;frame count``, flamegraph input); ``profile cprofile``
+runs :mod:`cProfile` on the main thread and writes ``.pstats``.  Both write to
+``ROBOT_PROFILE_DIR`` (default ``/tmp/robot_profiles``) after the window
+ends.  ``SIGUSR1`` starts a profile with the defaults from
+``ROBOT_PROFILE_MODE``/``ROBOT_PROFILE_SECONDS``.  From a shell::
+
+    python3 -m robot_common.instrumentation oak_streamer profile stacks 10
+"""
+
+import cProfile
+import collections
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from array import array
+from typing import Callable, Dict, Optional
+
+SOCKET_TEMPLATE = "/tmp/robot-instr-{}.sock"
+_RING = 1024  # recent samples kept per span for percentiles
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullSpan()
+
+
+class SpanStats:
+    """Count, total, max and a ring of recent durations for one span name."""
+
+    __slots__ = ("count", "total_ns", "max_ns", "_ring")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self._ring = array("q", bytes(8 * _RING))
+
+    def add(self, ns: int) -> None:
+        self._ring[self.count % _RING] = ns
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def summary(self) -> Dict[str, float]:
+        n = min(self.count, _RING)
+        recent = sorted(self._ring[:n])
+
+        def pct(p: float) -> float:
+            return recent[min(n - 1, int(p * n))] / 1000 if n else 0.0
+
+        return {
+            "count": self.count,
+            "mean_us": round(self.total_ns / self.count / 1000, 1) if self.count else 0.0,
+            "p50_us": round(pct(0.50), 1),
+            "p99_us": round(pct(0.99), 1),
+            "max_us": round(self.max_ns / 1000, 1),
+        }
+
+
+_stats: Dict[str, SpanStats] = {}
+
+
+class _Span:
+    __slots__ = ("_stat", "_t0")
+
+    def __init__(self, stat: SpanStats) -> None:
+        self._stat = stat
+
+    def __enter__(self):
+        self._t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self._stat.add(time.perf_counter_ns() - self._t0)
+        return False
+
+
+def _null_span(name: str) -> _NullSpan:
+    return _NULL
+
+
+def _timed_span(name: str) -> _Span:
+    stat = _stats.get(name)
+    if stat is None:
+        stat = _stats.setdefault(name, SpanStats())
+    return _Span(stat)
+
+
+# Rebound by enable()/disable(); call sites must use ``instr.span``.
+span = _null_span
+
+
+def enabled() -> bool:
+    return span is _timed_span
+
+
+def enable() -> None:
+    global span
+    span = _timed_span
+
+
+def disable() -> None:
+    global span
+    span = _null_span
+
+
+def reset() -> None:
+    _stats.clear()
+
+
+def stats() -> Dict[str, Dict[str, float]]:
+    return {name: s.summary() for name, s in list(_stats.items())}
+
+
+_gauges: Dict[str, Callable[[], object]] = {}
+
+
+def gauge(name: str, read: Callable[[], object]) -> None:
+    """Report ``read()`` under ``name`` in :func:`gauges`; replaces an earlier one."""
+    _gauges[name] = read
+
+
+def gauges() -> Dict[str, object]:
+    out = {}
+    for name, read in list(_gauges.items()):
+        try:
+            out[name] = read()
+        except Exception as e:  # a broken gauge must not break ``stats``
+            out[name] = {"error": str(e)}
+    return out
+
+
+# -- profiler ------------------------------------------------------------------
+
+class Profiler:
+    """Run one profiling window at a time and dump the result to disk."""
+
+    def __init__(self, node: str, out_dir: str) -> None:
+        self.node = node
+        self.out_dir = out_dir
+        self._busy = threading.Lock()
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._cprofile_path = ""
+        self.signal_hooks = False  # set by install() on the main thread
+
+    def _path(self, suffix: str) -> str:
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return os.path.join(self.out_dir, f"{self.node}-{stamp}.{suffix}")
+
+    def start(self, mode: str = "stacks", seconds: float = 10.0,
+              interval_s: float = 0.005) -> str:
+        if mode not in ("stacks", "cprofile"):
+            raise ValueError(f"unknown profile mode {mode!r}")
+        if not self._busy.acquire(blocking=False):
+            raise RuntimeError("a profile is already running")
+        if mode == "stacks":
+            path = self._path("collapsed")
+            threading.Thread(target=self._sample_stacks, args=(path, seconds, interval_s),
+                             name="instr-sampler", daemon=True).start()
+            return path
+        if not self.signal_hooks:
+            self._busy.release()
+            raise RuntimeError("cprofile needs install() to run on the main thread")
+        # cProfile only profiles the thread that enables it, so both ends of the
+        # window are handed to the main thread through SIGUSR2.
+        self._cprofile_path = self._path("pstats")
+        os.kill(os.getpid(), signal.SIGUSR2)
+        threading.Timer(seconds, os.kill, args=(os.getpid(), signal.SIGUSR2)).start()
+        return self._cprofile_path
+
+    def on_sigusr2(self, signum=None, frame=None) -> None:
+        if self._cprofile is None:
+            if self._busy.locked() and self._cprofile_path:
+                self._cprofile = cProfile.Profile()
+                self._cprofile.enable()
+            return
+        self._cprofile.disable()
+        self._cprofile.dump_stats(self._cprofile_path)
+        self._cprofile = None
+        self._cprofile_path = ""
+        self._busy.release()
+
+    def _sample_stacks(self, path: str, seconds: float, interval_s: float) -> None:
+        counts: Dict[str, int] = collections.Counter()
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        deadline = time.monotonic() + seconds
+        try:
+            while time.monotonic() < deadline:
+                for ident, frame in sys._current_frames().items():
+                    if ident == me:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}"
+                                     f":{code.co_firstlineno})")
+                        frame = frame.f_back
+                    stack.append(names.get(ident, str(ident)))
+                    counts[";".join(reversed(stack))] += 1
+                time.sleep(interval_s)
+            with open(path, "w") as f:
+                for stack, n in counts.most_common():
+                    f.write(f"{stack} {n}\n")
+        finally:
+            self._busy.release()
+
+
+_profiler: Optional[Profiler] = None
+
+
+def _handle_command(line: str) -> Dict[str, object]:
+    words = line.split()
+    cmd = words[0] if words else "stats"
+    if cmd == "enable":
+        enable()
+    elif cmd == "disable":
+        disable()
+    elif cmd == "reset":
+        reset()
+    elif cmd == "profile":
+        mode = words[1] if len(words) > 1 else "stacks"
+        seconds = float(words[2]) if len(words) > 2 else 10.0
+        return {"ok": True, "path": _profiler.start(mode, seconds)}
+    elif cmd != "stats":
+        return {"ok": False, "error": f"unknown command {cmd!r}"}
+    return {"ok": True, "enabled": enabled(), "spans": stats(), "gauges": gauges()}
+
+
+def _serve(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    srv.bind(path)
+    srv.listen(2)
+    while True:
+        conn, _ = srv.accept()
+        with conn:
+            try:
+                conn.settimeout(1.0)
+                reply = _handle_command(conn.recv(256).decode(errors="ignore"))
+            except Exception as e:
+                reply = {"ok": False, "error": str(e)}
+            try:
+                conn.sendall(json.dumps(reply).encode())
+            except OSError:
+                pass
+
+
+def install(node: str, *, control_socket: bool = True) -> None:
+    """Configure instrumentation for ``node`` from the environment.
+
+    Enables spans when ``ROBOT_INSTRUMENT=1``, starts the control socket and,
+    when called from the main thread, binds ``SIGUSR1`` to a profile window.
+    """
+
+    global _profiler
+    if os.environ.get("ROBOT_INSTRUMENT") == "1":
+        enable()
+    _profiler = Profiler(node, os.environ.get("ROBOT_PROFILE_DIR", "/tmp/robot_profiles"))
+    if control_socket and os.environ.get("ROBOT_INSTR_SOCKET", "1") != "0":
+        threading.Thread(target=_serve, args=(SOCKET_TEMPLATE.format(node),),
+                         name="instr-control", daemon=True).start()
+    if threading.current_thread() is threading.main_thread():
+        mode = os.environ.get("ROBOT_PROFILE_MODE", "stacks")
+        seconds = float(os.environ.get("ROBOT_PROFILE_SECONDS", "10"))
+
+        def on_signal(signum, frame):
+            try:
+                print(f"🔬 Profil başladı: {_profiler.start(mode, seconds)}")
+            except RuntimeError:
+                pass
+
+        signal.signal(signal.SIGUSR1, on_signal)
+        signal.signal(signal.SIGUSR2, _profiler.on_sigusr2)
+        _profiler.signal_hooks = True
+
+
+def send_command(node: str, command: str, timeout_s: float = 5.0) -> Dict[str, object]:
+    """Send ``command`` to the control socket of ``node`` and return the reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout_s)
+        s.connect(SOCKET_TEMPLATE.format(node))
+        s.sendall(command.encode())
+        chunks = []
+        while True:
+            data = s.recv(65536)
+            if not data:
+                break
+            chunks.append(data)
+    return json.loads(b"".join(chunks))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python3 -m robot_common.instrumentation <node> [command ...]")
+    print(json.dumps(send_command(sys.argv[1], " ".join(sys.argv[2:]) or "stats"), indent=2))
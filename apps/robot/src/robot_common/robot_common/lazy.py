@@ -0,0 +1,101 @@
+"""Deferred imports and one-shot initialisers for faster node start-up.
+
+Heavy modules (``cv2``, ``depthai``, ``pymodbus``) and objects that are
+expensive to build (the HOG people detector) are only needed once a client
+connects or tracking is switched on.  :class:`LazyModule` defers the import to
+the first attribute access and :class:`Lazy` defers a factory call to the
+first :meth:`Lazy.get`.  Both can be warmed up on a background thread with
+:func:`warm_up` so that the first frame does not pay the cost either.
+"""
+
+import importlib
+import importlib.util
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def module_available(name: str) -> bool:
+    """Return ``True`` if ``name`` can be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule:
+    """Module proxy that imports ``name`` on first attribute access."""
+
+    def __init__(self, name: str) -> None:
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with self.__dict__["_lock"]:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_name"])
+                    self.__dict__["_module"] = module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["_module"] is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self.load(), attr)
+
+    def __setattr__(self, attr: str, value) -> None:
+        setattr(self.load(), attr, value)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModule {self.__dict__['_name']!r} ({state})>"
+
+
+class Lazy(Generic[T]):
+    """Thread-safe value built by ``factory`` on first :meth:`get`."""
+
+    def __init__(self, factory: Callable[[], T]) -> None:
+        self._factory = factory
+        self._value: Optional[T] = None
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    self._value = self._factory()
+                    self._ready = True
+        return self._value  # type: ignore[return-value]
+
+    def load(self) -> T:
+        return self.get()
+
+    @property
+    def loaded(self) -> bool:
+        return self._ready
+
+
+def warm_up(*items, name: str = "warm-up") -> threading.Thread:
+    """Load ``items`` (:class:`LazyModule` or :class:`Lazy`) on a daemon thread.
+
+    Failures are swallowed here; the same error is raised again at the first
+    real use where the caller already handles it.
+    """
+
+    def run() -> None:
+        for item in items:
+            try:
+                item.load()
+            except Exception:
+                pass
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
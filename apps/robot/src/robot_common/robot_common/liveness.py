@@ -0,0 +1,95 @@
+"""Liveness beats towards :mod:`robot_bringup.supervisor`.
+
+The supervisor hands every node the write end of a pipe through the
+``ROBOT_SUPERVISOR_FD`` environment variable.  Nodes call :func:`beat` from
+their main loop; a node that stops beating is considered hung and restarted.
+Outside the supervisor the variable is unset and :func:`beat` is a cheap no-op.
+
+A loop that makes blocking calls with long timeouts (Modbus to an unreachable
+PLC) cannot beat from the loop itself without a liveness timeout above its
+worst case.  :class:`LoopMonitor` beats from its own thread instead, while
+the loop keeps progressing or is inside a blocking call that is still within
+the limit the caller declared for it.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+ENV_FD = "ROBOT_SUPERVISOR_FD"
+
+# Beats are rate limited so that a 30 fps loop does not flood the pipe.
+MIN_INTERVAL_S = 0.2
+
+_fd = int(os.environ.get(ENV_FD, "-1"))
+_last = 0.0
+
+
+def beat() -> None:
+    """Signal the supervisor that the calling loop is making progress."""
+    global _fd, _last
+    if _fd < 0:
+        return
+    now = time.monotonic()
+    if now - _last < MIN_INTERVAL_S:
+        return
+    _last = now
+    try:
+        os.write(_fd, b".")
+    except BlockingIOError:
+        pass  # Supervisor is behind on reading; the next beat will do.
+    except OSError:
+        _fd = -1  # Supervisor went away; stop trying.
+
+
+class LoopMonitor:
+    """Beat on behalf of a loop that may block in bounded I/O.
+
+    The loop calls :meth:`progress` every iteration and wraps each blocking
+    call in :meth:`blocking` with the longest time the call can take.  The
+    thread started by :meth:`start` beats while the loop progressed within
+    ``stall_s`` or a blocking call is within its limit; a call that outlives
+    its limit, or a loop stuck anywhere else, stops the beats.
+    """
+
+    def __init__(self, stall_s: float = 1.0, clock=time.monotonic) -> None:
+        self.stall_s = stall_s
+        self.clock = clock
+        self.last = clock()
+        self.deadline: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def progress(self) -> None:
+        self.last = self.clock()
+
+    @contextmanager
+    def blocking(self, limit_s: float) -> Iterator[None]:
+        outer = self.deadline
+        self.deadline = self.clock() + limit_s
+        try:
+            yield
+        finally:
+            self.deadline = outer
+            self.progress()
+
+    def alive(self, now: Optional[float] = None) -> bool:
+        now = self.clock() if now is None else now
+        deadline = self.deadline
+        return now - self.last <= self.stall_s or (deadline is not None and now <= deadline)
+
+    def _run(self) -> None:
+        while not self._stop.wait(MIN_INTERVAL_S):
+            if self.alive():
+                beat()
+
+    def start(self) -> "LoopMonitor":
+        if _fd >= 0:   # nothing to beat to outside the supervisor
+            self._thread = threading.Thread(target=self._run, name="liveness", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,120 @@
+"""Local channel carrying the tracked person from the camera to the PLC node.
+
+The camera node sends one fixed-size datagram per processed frame over the
+Unix socket ``/tmp/robot-target.sock``; the PLC node binds it and keeps only
+the newest message.  Datagrams are atomic, never block the sender (a full
+queue or a missing reader drops the message) and cost a few microseconds, so
+the camera loop is not slowed down by a slow or absent consumer.
+
+Message (``TARGET``, native byte order, same host only)::
+
+    seq        I   frame sequence number
+    capture_us q   time.monotonic() of the frame capture in µs (shared on one host)
+    state      B   protocol.TRACK_* of the frame
+    cx, cy     f   box centre, -1 (left/top) … 1 (right/bottom); 0 without a box
+    height     f   box height / frame height; 0 without a box
+    distance   f   metres, NaN when unknown
+    stop       B   1 when closer than the configured stop distance
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import socket
+import struct
+import time
+from typing import NamedTuple, Optional
+
+SOCKET_PATH = "/tmp/robot-target.sock"
+TARGET = struct.Struct("=IqBffffB")
+
+# Same values as oak_streamer.protocol.TRACK_*.
+TRACK_OFF, TRACK_SEARCHING, TRACK_LOCKED, TRACK_LOST = range(4)
+
+
+class Target(NamedTuple):
+    seq: int
+    capture_us: int
+    state: int
+    cx: float
+    cy: float
+    height: float
+    distance_m: Optional[float]
+    stop: bool
+
+    def age_s(self, now: Optional[float] = None) -> float:
+        return (time.monotonic() if now is None else now) - self.capture_us / 1e6
+
+
+def pack(target: Target) -> bytes:
+    distance = math.nan if target.distance_m is None else target.distance_m
+    return TARGET.pack(target.seq, target.capture_us, target.state, target.cx, target.cy,
+                       target.height, distance, int(target.stop))
+
+
+def unpack(data: bytes) -> Optional[Target]:
+    if len(data) != TARGET.size:
+        return None
+    seq, capture_us, state, cx, cy, height, distance, stop = TARGET.unpack(data)
+    return Target(seq, capture_us, state, cx, cy, height,
+                  None if math.isnan(distance) else distance, bool(stop))
+
+
+class TargetSender:
+    """Fire-and-forget sender used by the camera node."""
+
+    def __init__(self, path: str = SOCKET_PATH) -> None:
+        self.path = path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.sent = 0
+        self.dropped = 0
+
+    def send(self, target: Target) -> bool:
+        try:
+            self.sock.sendto(pack(target), self.path)
+        except OSError:  # no reader (ENOENT/ECONNREFUSED) or its queue is full
+            self.dropped += 1
+            return False
+        self.sent += 1
+        return True
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+class TargetReceiver:
+    """Non-blocking receiver that keeps the newest :class:`Target`."""
+
+    def __init__(self, path: str = SOCKET_PATH) -> None:
+        self.path = path
+        try:
+            os.unlink(path)  # left over by a previous run
+        except FileNotFoundError:
+            pass
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(path)
+        self.sock.setblocking(False)
+        self.latest: Optional[Target] = None
+        self.received = 0
+
+    def poll(self) -> Optional[Target]:
+        """Drain pending messages and return the newest one received so far."""
+
+        while True:
+            try:
+                data = self.sock.recv(TARGET.size + 1)
+            except (BlockingIOError, InterruptedError):
+                return self.latest
+            target = unpack(data)
+            if target is not None:
+                self.received += 1
+                self.latest = target
+
+    def close(self) -> None:
+        self.sock.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
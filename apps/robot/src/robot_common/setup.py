@@ -0,0 +1,21 @@
+from setuptools import setup
+
+package_name = 'robot_common'
+
+setup(
+    name=package_name,
+    version='0.0.0',
+    packages=[package_name],
+    data_files=[
+        ('share/ament_index/resource_index/packages',
+            ['resource/' + package_name]),
+        ('share/' + package_name, ['package.xml']),
+    ],
+    install_requires=['setuptools'],
+    zip_safe=True,
+    maintainer='kaanjetson',
+    maintainer_email='kaanjetson@todo.todo',
+    description='Robot düğümlerinin ortak yardımcı modülleri',
+    license='MIT',
+    tests_require=['pytest'],
+)
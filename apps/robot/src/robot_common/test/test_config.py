@@ -0,0 +1,56 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from robot_common.config import ConfigWatcher  # noqa: E402
+
+
+def _write(path, data, tick):
+    path.write_text(json.dumps(data))
+    os.utime(path, ns=(tick * 10**9, tick * 10**9))  # distinct mtime per write
+
+
+def test_reload_applies_whole_section_and_rejects_invalid_files(tmp_path):
+    path = tmp_path / "config.json"
+    _write(path, {"plc": {"max_latency_ms": 2000}}, 1)
+    applied = []
+    watcher = ConfigWatcher("plc", lambda old, new: applied.append(new.changed(old)),
+                            path=str(path), interval_s=0, log=lambda msg: None)
+    assert watcher.current.max_latency_ms == 2000 and watcher.current.port == 502
+
+    assert watcher.poll() == []                       # unchanged file: nothing to do
+    _write(path, {"plc": {"max_latency_ms": 1500, "ip": "10.0.0.7"}}, 2)
+    assert sorted(watcher.poll()) == ["ip", "max_latency_ms"]
+    assert applied == [["ip", "max_latency_ms"]]
+
+    # One bad value rejects the whole change, as does a file that doesn't parse.
+    _write(path, {"plc": {"max_latency_ms": 1000, "port": 70000}}, 3)
+    assert watcher.poll() == []
+    path.write_text("{not json")
+    assert watcher.poll() == []
+    assert watcher.current.max_latency_ms == 1500 and watcher.rejected == 2
+    assert watcher._file_values == {"max_latency_ms": 1500, "ip": "10.0.0.7"}
+    # The rejected edit is not the baseline: a valid write of its good value applies.
+    _write(path, {"plc": {"max_latency_ms": 1000, "ip": "10.0.0.7"}}, 4)
+    assert watcher.poll() == ["max_latency_ms"] and watcher.current.max_latency_ms == 1000
+
+
+def test_failed_apply_is_undone(tmp_path):
+    path = tmp_path / "config.json"
+    calls = []
+
+    def apply(old, new):
+        calls.append((old.udp_port, new.udp_port))
+        if new.udp_port == 9999:
+            raise OSError("address in use")
+
+    watcher = ConfigWatcher("plc", apply, path=str(path), overrides={"ip": "127.0.0.1"},
+                            interval_s=0, log=lambda msg: None)
+    _write(path, {"plc": {"udp_port": 9999, "ip": "10.0.0.7"}}, 1)
+
+    assert watcher.poll() == []
+    assert calls == [(8888, 9999), (9999, 8888)]
+    assert watcher.current.udp_port == 8888 and watcher.current.ip == "127.0.0.1"
+    assert watcher.rolled_back == 1
@@ -0,0 +1,70 @@
+import os
+import struct
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from robot_common import devwatch  # noqa: E402
+
+
+def _udev_message(props):
+    body = b"".join(f"{k}={v}".encode() + b"\0" for k, v in props.items())
+    header = devwatch.UDEV_PREFIX + struct.pack(">I", devwatch.UDEV_MAGIC) + struct.pack(
+        "=7I", 40, 40, len(body), 0, 0, 0, 0)
+    return header + body
+
+
+def test_uevents_inotify_and_reconnect_time(tmp_path):
+    kernel = devwatch.parse_uevent(
+        b"add@/devices/usb1/1-1/ttyUSB0\0ACTION=add\0SUBSYSTEM=tty\0DEVNAME=ttyUSB0\0SEQNUM=7\0",
+        now=1.0)
+    assert kernel == ("add", "tty", "/dev/ttyUSB0", kernel.props, "kernel", 1.0)
+    udev = devwatch.parse_uevent(_udev_message({
+        "ACTION": "add", "SUBSYSTEM": "usb", "DEVNAME": "/dev/bus/usb/001/007",
+        "ID_VENDOR_ID": "03e7"}))
+    assert udev.source == "udev" and udev.props["ID_VENDOR_ID"] == "03e7"
+    assert devwatch.parse_uevent(b"libudev\0garbage") is None
+
+    # inotify fallback: a node appearing in a watched directory wakes the subscriber.
+    watch = devwatch.DeviceWatch("inotify", watch_dirs=(str(tmp_path),),
+                                 log=lambda msg: None).start()
+    try:
+        assert watch.source == "inotify"
+        sub = watch.subscribe(("tty",))
+        (tmp_path / "ttyUSB1").touch()
+        event = sub.wait(2.0)
+        assert event.action == "add" and event.devname == str(tmp_path / "ttyUSB1")
+        (tmp_path / "ttyUSB1").unlink()
+        assert sub.wait(2.0, match=lambda e: e.action == "remove") is not None
+    finally:
+        watch.close()
+
+    now = [10.0]
+    timer = devwatch.ReconnectTimer(clock=lambda: now[0])
+    assert timer.recovered() is None            # nothing was lost
+    timer.lost()
+    now[0] = 13.0
+    timer.appeared(12.5)
+    now[0] = 12.9 + 0.35
+    assert timer.recovered() == 750.0 and timer.outage_ms == 3250.0
+    assert not timer.down and timer.reconnects == 1
+
+
+def test_stable_path_prefers_the_by_id_link(tmp_path):
+    by_id = tmp_path / "by-id"
+    by_id.mkdir()
+    tty = tmp_path / "ttyUSB0"
+    tty.touch()
+    (by_id / "usb-FTDI_BMS_A1-if00-port0").symlink_to(tty)
+
+    assert devwatch.stable_path(str(tty), str(by_id)) == str(by_id / "usb-FTDI_BMS_A1-if00-port0")
+    assert devwatch.stable_path(str(tmp_path / "ttyUSB3"), str(by_id)) == str(
+        tmp_path / "ttyUSB3")
+    assert devwatch.stable_path(str(tty), str(tmp_path / "missing")) == str(tty)
+
+    fd = os.open(tty, os.O_RDONLY)
+    try:
+        assert devwatch.same_device(fd, str(tty))
+        assert not devwatch.same_device(fd, str(tmp_path / "gone"))
+    finally:
+        os.close(fd)
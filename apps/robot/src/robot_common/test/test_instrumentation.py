@@ -0,0 +1,38 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from robot_common import instrumentation as instr  # noqa: E402
+
+
+def test_disabled_span_records_nothing():
+    instr.disable()
+    instr.reset()
+    with instr.span("detect"):
+        pass
+    assert instr.stats() == {}
+
+
+def test_enabled_span_collects_timings():
+    instr.enable()
+    instr.reset()
+    try:
+        for _ in range(3):
+            with instr.span("encode"):
+                time.sleep(0.001)
+        summary = instr.stats()["encode"]
+        assert summary["count"] == 3
+        assert summary["p50_us"] >= 1000
+        assert summary["max_us"] >= summary["p50_us"]
+    finally:
+        instr.disable()
+
+
+def test_stacks_profile_writes_collapsed_file(tmp_path):
+    profiler = instr.Profiler("test", str(tmp_path))
+    path = profiler.start("stacks", seconds=0.1, interval_s=0.01)
+    time.sleep(0.3)
+    lines = Path(path).read_text().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert "MainThread" in lines[0]
@@ -0,0 +1,27 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from robot_common import lazy  # noqa: E402
+
+
+def test_lazy_module_imports_on_first_attribute_access():
+    sys.modules.pop("colorsys", None)
+    mod = lazy.LazyModule("colorsys")
+    assert not mod.loaded and "colorsys" not in sys.modules
+    assert mod.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert mod.loaded
+
+
+def test_lazy_value_is_built_once_and_can_be_warmed_up():
+    calls = []
+    value = lazy.Lazy(lambda: calls.append(1) or "hog")
+    lazy.warm_up(value).join()
+    assert value.loaded
+    assert value.get() == "hog" and value.get() == "hog"
+    assert calls == [1]
+
+
+def test_module_available_does_not_import():
+    assert lazy.module_available("json")
+    assert not lazy.module_available("surely_not_a_module_xyz")
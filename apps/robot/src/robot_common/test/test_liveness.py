@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from robot_common.liveness import LoopMonitor  # noqa: E402
+
+
+def test_monitor_stays_alive_inside_bounded_blocking_calls():
+    now = [0.0]
+    monitor = LoopMonitor(stall_s=1.0, clock=lambda: now[0])
+    now[0] = 0.9
+    assert monitor.alive()
+    now[0] = 1.5
+    assert not monitor.alive()                  # loop stalled outside any I/O
+
+    monitor.progress()
+    with monitor.blocking(4.5):                 # e.g. Modbus to an unreachable PLC
+        now[0] = 5.5
+        assert monitor.alive()
+        with monitor.blocking(0.1):             # nested call keeps the outer limit
+            now[0] = 5.9
+        assert monitor.alive()
+        now[0] = 7.0
+        assert not monitor.alive()              # outlived its limit: hung
+    assert monitor.alive() and monitor.deadline is None
@@ -1,35 +1,126 @@
 import 'dart:async';
+import 'dart:convert';
 import 'dart:io';
 import 'dart:typed_data';
 import 'package:flutter/material.dart';
 
+/// A detection box received in the frame header, in frame pixels.
+class CameraBox {
+  final Rect rect;
+  final int trackId;
+  final int score;
+
+  const CameraBox(this.rect, this.trackId, this.score);
+}
+
+/// Track state values of the frame header (see oak_streamer/protocol.py).
+class TrackState {
+  static const int off = 0;
+  static const int searching = 1;
+  static const int locked = 2;
+  static const int lost = 3;
+}
+
 /// A global service that maintains a single camera TCP connection and
 /// exposes the latest frame along with FPS and latency information.
 ///
 /// Having a shared service prevents multiple pages from opening their own
 /// sockets which previously caused the camera stream to fail when several
 /// widgets tried to access it simultaneously.
+///
+/// On connect the service asks for frame protocol version 2 (`PROTO=2`):
+/// every JPEG is then preceded by a header with the sequence number, capture
+/// and encode timestamps and the detection boxes, which are drawn on the
+/// phone instead of into the pixels.  Older servers ignore the command and
+/// keep sending bare JPEGs; both formats are accepted.
+///
+/// A robot started with `OAK_STREAMS` also offers the right mono and RGB
+/// cameras.  [subscribe] selects the streams to receive (`SUB=left,rgb`);
+/// frames of the left stream update [imageBytes] and the header fields, the
+/// others only [streamImage].
+///
+/// With [useUdp] the frames come as UDP fragments instead (`UDP=<port>`, see
+/// oak_streamer/udp_transport.py); the TCP connection then only carries the
+/// commands.  A frame that is not complete when a newer one is, is dropped.
 class CameraService extends ChangeNotifier {
   static const String _cameraIp = '192.168.1.130';
   static const int _cameraPort = 5000;
+  static const int _protocolVersion = 2;
+  static const int _flagStream = 0x04;
+  static const int _udpPort = 5010;
+
+  /// Receive frames over UDP; TCP stays the default.
+  static bool useUdp = false;
+
+  /// Stream ids of the frame header (see oak_streamer/streams.py).
+  static const Map<String, int> streamIds = {'left': 0, 'right': 1, 'rgb': 2};
 
   Socket? _socket;
+  RawDatagramSocket? _udp;
+  final _FrameAssembler _assembler = _FrameAssembler();
   bool _connected = false;
   final List<int> _buffer = [];
 
   Uint8List? _imageBytes;
   int _fps = 0;
   int _latencyMs = 0;
+  int _robotLatencyMs = 0;
 
   int _frameCounter = 0;
   int _lastFrameTime = 0;
   Timer? _fpsTimer;
 
+  // Version 2 header fields of the latest frame.
+  int _version = 1;
+  int _seq = 0;
+  int _droppedFrames = 0;
+  Size? _frameSize;
+  List<CameraBox> _boxes = const [];
+  int _trackState = TrackState.off;
+  double? _distanceM;
+
+  Set<String> _subscriptions = {'left'};
+  final Map<int, Uint8List> _streamImages = {};
+
   bool get connected => _connected;
   Uint8List? get imageBytes => _imageBytes;
   int get fps => _fps;
+
+  /// Glass-to-glass latency (capture on the robot to arrival here) for
+  /// version 2 streams, the inter-frame interval for legacy streams.
   int get latencyMs => _latencyMs;
 
+  /// Capture-to-encode time on the robot; 0 for legacy streams.
+  int get robotLatencyMs => _robotLatencyMs;
+  int get protocolVersion => _version;
+  int get seq => _seq;
+
+  /// Frames skipped by the server or dropped here because a newer one had
+  /// already arrived.
+  int get droppedFrames => _droppedFrames;
+  Size? get frameSize => _frameSize;
+  List<CameraBox> get boxes => _boxes;
+  int get trackState => _trackState;
+  double? get distanceM => _distanceM;
+  Set<String> get subscriptions => _subscriptions;
+
+  /// Latest JPEG of the stream [name] ('left', 'right' or 'rgb').
+  Uint8List? streamImage(String name) => _streamImages[streamIds[name]];
+
+  /// Receive the camera streams in [names]; kept across reconnects.
+  void subscribe(Set<String> names) {
+    if (names.isEmpty) return;
+    _subscriptions = names;
+    if (_connected) _socket?.add(utf8.encode('SUB=${names.join(',')}\n'));
+  }
+
+  /// Follow the person with [trackId] (`LOCK=<id>`); 0 goes back to the
+  /// robot's automatic choice.  Ids are per connection and not kept across
+  /// reconnects.
+  void lockTarget(int trackId) {
+    if (_connected) _socket?.add(utf8.encode('LOCK=$trackId\n'));
+  }
+
   CameraService() {
     _connect();
     _startFpsTimer();
@@ -46,7 +137,15 @@ class CameraService extends ChangeNotifier {
   void _connect() async {
     try {
       _socket = await Socket.connect(_cameraIp, _cameraPort);
+      _socket!.setOption(SocketOption.tcpNoDelay, true);
       _connected = true;
+      _buffer.clear();
+      _seq = 0;
+      _socket!.add(utf8.encode('PROTO=$_protocolVersion\n'));
+      if (useUdp) await _startUdp();
+      if (_subscriptions.length != 1 || !_subscriptions.contains('left')) {
+        _socket!.add(utf8.encode('SUB=${_subscriptions.join(',')}\n'));
+      }
       _socket!.listen(_onData,
           onDone: _handleDisconnect,
           onError: (error) => _handleDisconnect());
@@ -58,7 +157,22 @@ class CameraService extends ChangeNotifier {
     }
   }
 
+  Future<void> _startUdp() async {
+    _udp ??= await RawDatagramSocket.bind(InternetAddress.anyIPv4, _udpPort);
+    _udp!.readEventsEnabled = true;
+    _udp!.listen((event) {
+      if (event != RawSocketEvent.read) return;
+      final datagram = _udp!.receive();
+      if (datagram == null) return;
+      final body = _assembler.add(datagram.data);
+      if (body != null) _onBody(body);
+    });
+    _socket!.add(utf8.encode('UDP=$_udpPort\n'));
+  }
+
   void _handleDisconnect() {
+    _udp?.close();
+    _udp = null;
     _socket?.destroy();
     _connected = false;
     notifyListeners();
@@ -67,27 +181,207 @@ class CameraService extends ChangeNotifier {
 
   void _onData(Uint8List data) {
     _buffer.addAll(data);
+    Uint8List? latest;
     while (_buffer.length >= 4) {
-      final length = ByteData.sublistView(Uint8List.fromList(_buffer))
-          .getUint32(0, Endian.big);
+      final length = (_buffer[0] << 24) |
+          (_buffer[1] << 16) |
+          (_buffer[2] << 8) |
+          _buffer[3];
       if (_buffer.length < 4 + length) break;
-      final frame = _buffer.sublist(4, 4 + length);
+      final body = Uint8List.fromList(_buffer.sublist(4, 4 + length));
       _buffer.removeRange(0, 4 + length);
+      final stream = _streamOf(body);
+      if (stream != 0) {
+        // Extra streams carry no tracking data; keep only the newest JPEG.
+        final headerLen = ByteData.sublistView(body).getUint16(4);
+        _streamImages[stream] = Uint8List.sublistView(body, headerLen);
+        continue;
+      }
+      if (latest != null) _droppedFrames++; // stale: a newer frame follows
+      latest = body;
+    }
+    if (latest == null) {
+      if (_streamImages.isNotEmpty) notifyListeners();
+      return;
+    }
+    _showFrame(latest);
+  }
+
+  /// A complete frame body received over UDP.
+  void _onBody(Uint8List body) {
+    final stream = _streamOf(body);
+    if (stream != 0) {
+      final headerLen = ByteData.sublistView(body).getUint16(4);
+      _streamImages[stream] = Uint8List.sublistView(body, headerLen);
+      notifyListeners();
+      return;
+    }
+    _showFrame(body);
+  }
 
-      final now = DateTime.now().millisecondsSinceEpoch;
+  void _showFrame(Uint8List latest) {
+    final now = DateTime.now().millisecondsSinceEpoch;
+    final jpeg = _parseHeader(latest, now);
+    if (_version == 1) {
       _latencyMs = _lastFrameTime == 0 ? 0 : now - _lastFrameTime;
-      _lastFrameTime = now;
+    }
+    _lastFrameTime = now;
 
-      _imageBytes = Uint8List.fromList(frame);
-      _frameCounter++;
-      notifyListeners();
+    _imageBytes = jpeg;
+    _streamImages[0] = jpeg;
+    _frameCounter++;
+    notifyListeners();
+  }
+
+  /// Stream id of a packet body; 0 (left) for legacy bodies and old servers.
+  int _streamOf(Uint8List body) {
+    if (body.length < 36 || body[0] != 0x4F || body[1] != 0x46) return 0;
+    if ((body[3] & _flagStream) == 0) return 0;
+    final offset = 36 + body[35] * 11;
+    return offset < body.length ? body[offset] : 0;
+  }
+
+  /// Read the version 2 header of [body] if present and return the JPEG.
+  Uint8List _parseHeader(Uint8List body, int nowMs) {
+    // 'O' 'F' magic; a legacy body starts with the JPEG SOI marker FF D8.
+    if (body.length < 36 || body[0] != 0x4F || body[1] != 0x46) {
+      _version = 1;
+      _boxes = const [];
+      _robotLatencyMs = 0;
+      return body;
     }
+    final h = ByteData.sublistView(body);
+    _version = h.getUint8(2);
+    final headerLen = h.getUint16(4);
+    final seq = h.getUint32(6);
+    final captureUs = h.getInt64(10);
+    final encodeUs = h.getInt64(18);
+    _frameSize = Size(h.getUint16(26).toDouble(), h.getUint16(28).toDouble());
+    final distance = h.getFloat32(30);
+    _distanceM = distance.isNaN ? null : distance;
+    _trackState = h.getUint8(34);
+    final count = h.getUint8(35);
+
+    final boxes = <CameraBox>[];
+    for (var i = 0; i < count; i++) {
+      final o = 36 + i * 11;
+      boxes.add(CameraBox(
+        Rect.fromLTWH(h.getUint16(o).toDouble(), h.getUint16(o + 2).toDouble(),
+            h.getUint16(o + 4).toDouble(), h.getUint16(o + 6).toDouble()),
+        h.getUint16(o + 8),
+        h.getUint8(o + 10),
+      ));
+    }
+    _boxes = boxes;
+
+    if (_seq != 0 && seq > _seq + 1) _droppedFrames += seq - _seq - 1;
+    _seq = seq;
+    _robotLatencyMs = (encodeUs - captureUs) ~/ 1000;
+    // Assumes the phone and robot clocks are synchronised (NTP).
+    _latencyMs = nowMs - captureUs ~/ 1000;
+    return Uint8List.sublistView(body, headerLen);
   }
 
   @override
   void dispose() {
+    _udp?.close();
     _socket?.destroy();
     _fpsTimer?.cancel();
     super.dispose();
   }
 }
+
+/// Reassembles frame bodies from UDP fragments (oak_streamer/udp_transport.py).
+///
+/// Header: magic 'OU', version, parity group, frame id, index, count,
+/// frame length, fragment size (18 bytes, big endian).  One lost fragment per
+/// parity group is rebuilt; frames older than the last delivered one are
+/// ignored and partial frames are dropped once a newer frame completes.
+class _FrameAssembler {
+  static const int _headerSize = 18;
+  final Map<int, _PartialFrame> _pending = {};
+  int? _lastId;
+
+  Uint8List? add(Uint8List d) {
+    if (d.length < _headerSize || d[0] != 0x4F || d[1] != 0x55 || d[2] != 1) {
+      return null;
+    }
+    final h = ByteData.sublistView(d);
+    final group = d[3];
+    final id = h.getUint32(4);
+    final index = h.getUint16(8);
+    final count = h.getUint16(10);
+    final frameLen = h.getUint32(12);
+    final fragSize = h.getUint16(16);
+    final last = _lastId;
+    if (count == 0) return null;
+    if (last != null && id <= last && last - id < 1024) return null; // late
+    final partial = _pending.putIfAbsent(
+        id, () => _PartialFrame(count, group, frameLen, fragSize));
+    if (_pending.length > 4) {
+      _pending.remove(_pending.keys.reduce((a, b) => a < b ? a : b));
+      if (!_pending.containsKey(id)) return null;
+    }
+    partial.add(index, Uint8List.sublistView(d, _headerSize));
+    if (!partial.complete) return null;
+    _pending.removeWhere((key, _) => key <= id);
+    _lastId = id;
+    return partial.body();
+  }
+}
+
+class _PartialFrame {
+  final int count;
+  final int group;
+  final int frameLen;
+  final int fragSize;
+  final List<Uint8List?> data;
+  final Map<int, Uint8List> parity = {};
+  int have = 0;
+
+  _PartialFrame(this.count, this.group, this.frameLen, this.fragSize)
+      : data = List.filled(count, null);
+
+  bool get complete => have == count;
+
+  void add(int index, Uint8List payload) {
+    if (index < count) {
+      if (data[index] == null) {
+        data[index] = payload;
+        have++;
+      }
+    } else {
+      parity[index - count] = payload;
+    }
+    if (!complete && group > 0) _recover();
+  }
+
+  void _recover() {
+    parity.forEach((g, p) {
+      final start = g * group;
+      final end = start + group < count ? start + group : count;
+      final missing = [for (var i = start; i < end; i++) if (data[i] == null) i];
+      if (missing.length != 1) return;
+      final i = missing.first;
+      final rebuilt = Uint8List.fromList(p);
+      for (var j = start; j < end; j++) {
+        final part = data[j];
+        if (part == null) continue;
+        for (var k = 0; k < part.length; k++) {
+          rebuilt[k] ^= part[k];
+        }
+      }
+      final length = frameLen - i * fragSize < fragSize ? frameLen - i * fragSize : fragSize;
+      data[i] = Uint8List.sublistView(rebuilt, 0, length);
+      have++;
+    });
+  }
+
+  Uint8List body() {
+    final out = BytesBuilder(copy: false);
+    for (final part in data) {
+      out.add(part!);
+    }
+    return out.takeBytes();
+  }
+}
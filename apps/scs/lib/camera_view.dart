@@ -0,0 +1,136 @@
+import 'package:flutter/material.dart';
+
+import 'camera_service.dart';
+
+/// Camera image with the detection overlay of [CameraService] drawn on top.
+///
+/// With frame protocol version 2 the robot no longer burns the boxes into the
+/// JPEG; they are painted here, mapped through the same [fit] as the image.
+/// Each box is labelled with its track id; tapping a box locks the robot onto
+/// that person, tapping elsewhere releases the lock.
+class CameraView extends StatelessWidget {
+  final CameraService service;
+  final BoxFit fit;
+  final double? width;
+  final double? height;
+
+  const CameraView({
+    super.key,
+    required this.service,
+    this.fit = BoxFit.contain,
+    this.width,
+    this.height,
+  });
+
+  @override
+  Widget build(BuildContext context) {
+    return SizedBox(
+      width: width,
+      height: height,
+      child: Stack(
+        fit: StackFit.expand,
+        children: [
+          Image.memory(
+            service.imageBytes!,
+            gaplessPlayback: true,
+            fit: fit,
+          ),
+          if (service.frameSize != null && service.boxes.isNotEmpty)
+            LayoutBuilder(
+              builder: (context, constraints) => GestureDetector(
+                onTapUp: (details) => _lockAt(details.localPosition, constraints.biggest),
+                child: CustomPaint(
+                  painter: _OverlayPainter(
+                    boxes: service.boxes,
+                    frameSize: service.frameSize!,
+                    fit: fit,
+                    trackState: service.trackState,
+                    distanceM: service.distanceM,
+                  ),
+                ),
+              ),
+            ),
+        ],
+      ),
+    );
+  }
+
+  void _lockAt(Offset position, Size size) {
+    final toScreen = _frameToScreen(fit, service.frameSize!, size);
+    final hit = service.boxes.where(
+        (b) => b.trackId != 0 && toScreen(b.rect).contains(position));
+    service.lockTarget(hit.isEmpty ? 0 : hit.first.trackId);
+  }
+}
+
+/// Maps frame pixel rects to widget coordinates for an image drawn with [fit].
+Rect Function(Rect) _frameToScreen(BoxFit fit, Size frameSize, Size size) {
+  final fitted = applyBoxFit(fit, frameSize, size);
+  final dest = Alignment.center.inscribe(fitted.destination, Offset.zero & size);
+  final sx = dest.width / fitted.source.width;
+  final sy = dest.height / fitted.source.height;
+  final src = Alignment.center.inscribe(fitted.source, Offset.zero & frameSize);
+  return (r) => Rect.fromLTRB(
+        dest.left + (r.left - src.left) * sx,
+        dest.top + (r.top - src.top) * sy,
+        dest.left + (r.right - src.left) * sx,
+        dest.top + (r.bottom - src.top) * sy,
+      );
+}
+
+class _OverlayPainter extends CustomPainter {
+  final List<CameraBox> boxes;
+  final Size frameSize;
+  final BoxFit fit;
+  final int trackState;
+  final double? distanceM;
+
+  _OverlayPainter({
+    required this.boxes,
+    required this.frameSize,
+    required this.fit,
+    required this.trackState,
+    required this.distanceM,
+  });
+
+  @override
+  void paint(Canvas canvas, Size size) {
+    final dest = Alignment.center
+        .inscribe(applyBoxFit(fit, frameSize, size).destination, Offset.zero & size);
+    final map = _frameToScreen(fit, frameSize, size);
+
+    canvas.save();
+    canvas.clipRect(dest);
+    for (var i = 0; i < boxes.length; i++) {
+      // The first box is the tracked target.
+      final target = i == 0 && trackState == TrackState.locked;
+      final paint = Paint()
+        ..style = PaintingStyle.stroke
+        ..strokeWidth = target ? 3 : 1.5
+        ..color = target ? Colors.greenAccent : Colors.yellowAccent;
+      final rect = map(boxes[i].rect);
+      canvas.drawRect(rect, paint);
+      final id = boxes[i].trackId;
+      final text = [
+        if (id != 0) '#$id',
+        if (target && distanceM != null) '${distanceM!.toStringAsFixed(1)} m',
+      ].join('  ');
+      if (text.isNotEmpty) {
+        final label = TextPainter(
+          text: TextSpan(
+            text: text,
+            style: TextStyle(
+                color: paint.color, fontSize: 14, backgroundColor: Colors.black54),
+          ),
+          textDirection: TextDirection.ltr,
+        )..layout();
+        label.paint(canvas, rect.topLeft.translate(0, -label.height));
+      }
+    }
+    canvas.restore();
+  }
+
+  @override
+  bool shouldRepaint(_OverlayPainter old) =>
+      old.boxes != boxes || old.frameSize != frameSize || old.distanceM != distanceM;
+}
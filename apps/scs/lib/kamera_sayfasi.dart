@@ -1,12 +1,14 @@
 import 'dart:async';
 import 'dart:convert';
 import 'dart:io';
+import 'dart:math';
 
 import 'package:flutter/material.dart';
 import 'package:flutter/services.dart';
 import 'package:provider/provider.dart';
 
 import 'camera_service.dart';
+import 'camera_view.dart';
 
 class KameraSayfasi extends StatefulWidget {
   const KameraSayfasi({super.key});
@@ -34,6 +36,11 @@ class _KameraSayfasiState extends State<KameraSayfasi> {
   bool _w = false, _s = false, _a = false, _d = false;
   bool _up = false, _down = false, _left = false, _right = false;
 
+  // Oturum kimliği ve sıra numarası: robot eski/yinelenen paketleri atar.
+  final String _sid = List.generate(
+      8, (_) => Random.secure().nextInt(16).toRadixString(16)).join();
+  int _seq = 0;
+
   // Fırçalar
   bool _brush1 = false;
   bool _brush2 = false;
@@ -97,6 +104,8 @@ class _KameraSayfasiState extends State<KameraSayfasi> {
       'joystick_turn': turnInt,
       'brush1': _brush1 ? 1 : 0,
       'brush2': _brush2 ? 1 : 0,
+      'sid': _sid,
+      'seq': ++_seq,
     };
 
     final bytes = utf8.encode(jsonEncode(payload));
@@ -167,9 +176,8 @@ class _KameraSayfasiState extends State<KameraSayfasi> {
               child: Center(
                 child: cameraService.connected
                     ? (cameraService.imageBytes != null
-                        ? Image.memory(
-                            cameraService.imageBytes!,
-                            gaplessPlayback: true,
+                        ? CameraView(
+                            service: cameraService,
                             fit: BoxFit.contain,
                             width: MediaQuery.of(context).size.width * 0.9,
                             height: MediaQuery.of(context).size.height * 0.6,
@@ -6,6 +6,7 @@ import 'package:flutter/material.dart';
 import 'package:provider/provider.dart';
 
 import 'camera_service.dart';
+import 'camera_view.dart';
 
 class ManuelKontrol extends StatefulWidget {
   const ManuelKontrol({super.key});
@@ -29,6 +30,20 @@ class _ManuelKontrolState extends State<ManuelKontrol> {
 
   bool _isBrush1On = false;
   bool _isBrush2On = false;
+  // Takip modu: robot kameranın kilitlendiği kişiyi izler, joystick önceliklidir.
+  bool _follow = false;
+  // Robotun 5 Hz'de geri okuyup gönderdiği PLC durumu (D10/D11, bobinler).
+  Map<String, dynamic>? _plcState;
+
+  // Operatör oturumu: robot sürüşü tek bir tablete (kira sahibi) verir.
+  final String _sid = List.generate(
+      8, (_) => Random.secure().nextInt(16).toRadixString(16)).join();
+  int _seq = 0;
+  bool _inControl = false;
+  bool _observe = false;          // kontrolü bıraktıktan sonra yalnızca izle
+  bool _requestTakeover = false;  // "takeover" bayrağını kira gelene kadar gönder
+  bool _releaseNext = false;      // bir sonraki pakette kontrolü bırak
+  String _sessionText = 'Oturum: -';
 
   @override
   void initState() {
@@ -40,6 +55,55 @@ class _ManuelKontrolState extends State<ManuelKontrol> {
 
   void _initUdp() async {
     _udpSocket = await RawDatagramSocket.bind(InternetAddress.anyIPv4, 0);
+    _udpSocket!.listen((event) {
+      if (event != RawSocketEvent.read) return;
+      final datagram = _udpSocket!.receive();
+      if (datagram == null) return;
+      try {
+        final msg = jsonDecode(utf8.decode(datagram.data));
+        if (msg is! Map<String, dynamic> || !mounted) return;
+        if (msg['type'] == 'plc_state') {
+          setState(() => _plcState = msg);
+        } else if (msg['type'] == 'session') {
+          _onSessionEvent(msg);
+        }
+      } catch (_) {
+        // Bozuk paket: yok say.
+      }
+    });
+  }
+
+  void _onSessionEvent(Map<String, dynamic> msg) {
+    switch (msg['event']) {
+      case 'granted':
+        setState(() {
+          _inControl = true;
+          _observe = false;
+          _requestTakeover = false;
+          _sessionText = 'Oturum: kontrol sizde';
+        });
+        break;
+      case 'pending':
+        setState(() => _sessionText = 'Oturum: devir isteği gönderildi');
+        break;
+      case 'released':
+      case 'revoked':
+        setState(() {
+          _inControl = false;
+          _observe = msg['event'] == 'released';
+          _sessionText = 'Oturum: izleyici (kontrol ${msg['holder'] ?? '-'})';
+        });
+        break;
+      case 'takeover_request':
+        ScaffoldMessenger.of(context).showSnackBar(SnackBar(
+          content: Text('${msg['by']} kontrolü istiyor'),
+          action: SnackBarAction(
+            label: 'Bırak',
+            onPressed: () => setState(() => _releaseNext = true),
+          ),
+        ));
+        break;
+    }
   }
 
   // Responsive yerleşim (sol/orta/sağ şeritler)
@@ -110,8 +174,15 @@ class _ManuelKontrolState extends State<ManuelKontrol> {
       "joystick_turn": validTouchExists ? scaledLeftRight : 0,
       "brush1": _isBrush1On ? 1 : 0,
       "brush2": _isBrush2On ? 1 : 0,
+      "follow": _follow ? 1 : 0,
       "ts": DateTime.now().millisecondsSinceEpoch,
+      "sid": _sid,
+      "seq": ++_seq,
+      if (_requestTakeover) "takeover": 1,
+      if (_releaseNext) "release": 1,
+      if (_observe || _releaseNext) "observe": 1,
     };
+    _releaseNext = false;
     final message = jsonEncode(messageMap);
     _udpSocket!.send(utf8.encode(message), InternetAddress(_targetIP), _targetPort);
   }
@@ -140,11 +211,7 @@ class _ManuelKontrolState extends State<ManuelKontrol> {
                   top: _cameraArea!.top,
                   width: _cameraArea!.width,
                   height: _cameraArea!.height,
-                  child: Image.memory(
-                    cameraService.imageBytes!,
-                    fit: BoxFit.contain,
-                    gaplessPlayback: true,
-                  ),
+                  child: CameraView(service: cameraService, fit: BoxFit.contain),
                 ),
               _buildJoystickLayer(area),
             ],
@@ -193,6 +260,33 @@ class _ManuelKontrolState extends State<ManuelKontrol> {
                           style: const TextStyle(fontSize: 12)),
                     ],
                   ),
+                  Row(
+                    mainAxisSize: MainAxisSize.min,
+                    children: [
+                      const Text('Takip', style: TextStyle(fontSize: 12)),
+                      Switch(value: _follow, onChanged: (v) => setState(() => _follow = v)),
+                    ],
+                  ),
+                  Row(
+                    mainAxisSize: MainAxisSize.min,
+                    children: [
+                      Text(_sessionText, style: const TextStyle(fontSize: 12)),
+                      if (!_inControl)
+                        TextButton(
+                          onPressed: () => setState(() {
+                            _requestTakeover = true;
+                            _observe = false;
+                          }),
+                          child: const Text('Kontrolü Al'),
+                        ),
+                    ],
+                  ),
+                  if (_plcState != null)
+                    Text(
+                      'PLC: D10=${_plcState!['D10']} D11=${_plcState!['D11']} '
+                      '${_plcState!['confirmed'] == true ? '✓' : '⚠'}',
+                      style: const TextStyle(fontSize: 12),
+                    ),
                 ],
               ),
               Column(
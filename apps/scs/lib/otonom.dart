@@ -6,6 +6,7 @@ import 'package:http/http.dart' as http;
 import 'package:provider/provider.dart';
 
 import 'camera_service.dart';
+import 'camera_view.dart';
 
 /// Otonom sayfası artık harita yerine insan takibiyle ilgili kamera
 /// görüntüsünü gösterir. Gelen JSON içinde insanın konumu ve robotun mevcut
@@ -100,9 +101,8 @@ class _OtonomPageState extends State<OtonomPage> {
                         return Stack(
                           children: [
                             Positioned.fill(
-                              child: Image.memory(
-                                cameraService.imageBytes!,
-                                gaplessPlayback: true,
+                              child: CameraView(
+                                service: cameraService,
                                 fit: BoxFit.contain,
                               ),
                             ),
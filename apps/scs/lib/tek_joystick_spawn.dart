@@ -6,7 +6,7 @@ import 'package:flutter/material.dart';
 
 /// Jetson'daki udp_listener_node ile uyumlu tek-joystick sayfası.
 /// - 20 Hz UDP heartbeat
-/// - JSON: ts, joystick_forward, joystick_turn, brush1, brush2
+/// - JSON: ts, joystick_forward, joystick_turn, brush1, brush2, sid, seq
 /// - Joystick: basılan noktada spawn; bırakınca F=0, T=0
 /// - İleri (+F): yukarı; Dönüş (+T): sağa
 /// - Eksene yapışma (±15°): saf ileri/saf dönüş kolaylığı
@@ -31,6 +31,10 @@ class _TekJoystickSpawnPageState extends State<TekJoystickSpawnPage> {
   int _turn = 0;    // [-100..100]
   int _brush1 = 0;  // 0/1
   int _brush2 = 0;  // 0/1
+  // Oturum kimliği ve sıra numarası: robot eski/yinelenen paketleri atar.
+  final String _sid = List.generate(
+      8, (_) => Random.secure().nextInt(16).toRadixString(16)).join();
+  int _seq = 0;
 
   // ===== Joystick Durumu =====
   bool _active = false;     // parmak basılı mı
@@ -188,6 +192,8 @@ class _TekJoystickSpawnPageState extends State<TekJoystickSpawnPage> {
       "joystick_turn": _turn,
       "brush1": _brush1,
       "brush2": _brush2,
+      "sid": _sid,
+      "seq": ++_seq,
     };
 
     try {